@@ -0,0 +1,596 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for Chess LLM Arena
+
+Plays many games in-process (no server, no network) against a pluggable fake
+model and reports games/sec, plies/sec, LLM calls per game, move latency
+percentiles, Flask route latency and peak RSS. Results are written as JSON
+so runs can be diffed to catch regressions in the hot path. The storage
+suite times saving moves and finished games, cold reads by id and searches
+by player for the in-memory dict, the gzip archive and SQLite. The prompts
+suite compares prompt encodings by tokens and latency per move, and the
+streaming suite compares waiting for whole replies with streaming them and
+stopping at the move.
+
+    python benchmark.py --levels 1,10,100 --out results.json
+    python benchmark.py --baseline results.json --fail-on-regression 20
+    python benchmark.py --suite storage --storage-games 5000
+    python benchmark.py --suite prompts --prompt-positions 500 --latency-ms 300
+    python benchmark.py --suite streaming --ramble-rate 0.5 --output-token-ms 20
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import resource
+import sys
+import tempfile
+import threading
+import time
+import types
+from datetime import datetime
+
+import chess
+
+FEN_RE = re.compile(r"([pnbrqkPNBRQK1-8]+(?:/[pnbrqkPNBRQK1-8]+){7} [wb] (?:[KQkq]+|-) (?:[a-h][36]|-) \d+ \d+)")
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+RAMBLE = " because it improves my position and keeps the initiative in the centre."
+
+
+class FakeStream:
+    """Streamed reply of FakeChatModel: one chunk per 4 characters (about a token), each after a delay"""
+
+    def __init__(self, text, token_latency):
+        self.text = text
+        self.token_latency = token_latency
+        self.closed = False
+
+    def __iter__(self):
+        for start in range(0, len(self.text), 4):
+            if self.closed:
+                return
+            time.sleep(self.token_latency)
+            delta = types.SimpleNamespace(content=self.text[start:start + 4])
+            yield types.SimpleNamespace(choices=[types.SimpleNamespace(index=0, delta=delta, finish_reason=None)])
+
+    def close(self):
+        self.closed = True
+
+
+class FakeChatModel:
+    """Drop-in for openai_client that answers move prompts with a legal move after a simulated delay"""
+
+    def __init__(self, latency=0.0, jitter=0.0, seed=None, token_latency=0.0, output_latency=0.0, ramble_rate=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.token_latency = token_latency  # extra seconds per prompt token, like a real model reading its input
+        self.output_latency = output_latency  # seconds per completion token
+        self.ramble_rate = ramble_rate  # chance a move is followed by an explanation
+        self.random = random.Random(seed)
+        self.chat = types.SimpleNamespace(completions=self)
+
+    def create(self, messages, n=1, stream=False, max_tokens=None, **kwargs):
+        prompt_tokens = sum(len(message["content"]) // 4 + 1 for message in messages)
+        if self.latency or self.jitter or self.token_latency:
+            time.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)
+                           + self.token_latency * prompt_tokens))
+
+        moves = []
+        for fen in FEN_RE.findall(messages[-1]["content"]):
+            board = chess.Board(fen)
+            captures = [move for move in board.legal_moves if board.is_capture(move)]
+            moves.append(self.random.choice(captures or list(board.legal_moves)).uci())
+        text = moves[0] if len(moves) == 1 else "\n".join(f"{i}: {m}" for i, m in enumerate(moves, 1))
+        if self.ramble_rate and self.random.random() < self.ramble_rate:
+            text += RAMBLE
+        if max_tokens:
+            text = text[:max_tokens * 4]
+
+        if stream:
+            return FakeStream(text, self.output_latency)
+        if self.output_latency:
+            time.sleep(self.output_latency * (len(text) // 4 + 1))
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(index=i, finish_reason="stop",
+                                           message=types.SimpleNamespace(role="assistant", content=text))
+                     for i in range(n or 1)],
+            usage=types.SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=len(text) // 4 + 1,
+                                        total_tokens=prompt_tokens + len(text) // 4 + 1))
+
+
+class CountingClient:
+    """Wraps any chat client and counts calls"""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = types.SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+        return self.client.chat.completions.create(**kwargs)
+
+
+class MoveTimer:
+    """Records the time each game waited for every move it played"""
+
+    def __init__(self, game_class):
+        self.game_class = game_class
+        self.original = game_class.make_move
+        self.last_move_at = {}
+        self.latencies = []
+        self._lock = threading.Lock()
+
+    def install(self):
+        timer = self
+
+        def timed_make_move(game, move_str):
+            now = time.perf_counter()
+            played = timer.original(game, move_str)
+            if played:
+                with timer._lock:
+                    started = timer.last_move_at.get(game.id)
+                    if started is not None:
+                        timer.latencies.append(now - started)
+                    timer.last_move_at[game.id] = time.perf_counter()
+            return played
+
+        self.game_class.make_move = timed_make_move
+
+    def start_game(self, game_id):
+        with self._lock:
+            self.last_move_at[game_id] = time.perf_counter()
+
+    def reset(self):
+        with self._lock:
+            self.last_move_at.clear()
+            self.latencies = []
+
+    def uninstall(self):
+        self.game_class.make_move = self.original
+
+
+def time_route(client, path, samples=20):
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        client.get(path)
+        timings.append(time.perf_counter() - started)
+    return {
+        "p50_ms": round(percentile(timings, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(timings, 0.95) * 1000, 2),
+    }
+
+
+def run_arena_level(main, counter, timer, concurrency, timeout):
+    """Start `concurrency` games through /start_game and wait for all of them to finish"""
+    main.games.clear()
+    timer.reset()
+    client = main.app.test_client()
+    calls_before = counter.calls
+
+    started = time.perf_counter()
+    game_ids = []
+    for number in range(concurrency):
+        response = client.post('/start_game', json={"white_player": f"Bench-W{number % 4}",
+                                                     "black_player": f"Bench-B{number % 4}"})
+        game_id = response.get_json()["game_id"]
+        timer.start_game(game_id)
+        game_ids.append(game_id)
+
+    # Poll the in-memory state rather than the route so polling doesn't skew the numbers
+    deadline = started + timeout
+    while time.perf_counter() < deadline:
+        if not any(getattr(main.games.get(game_id), 'status', None) == 'active' for game_id in game_ids):
+            break
+        time.sleep(0.05)
+    wall = time.perf_counter() - started
+
+    finished = [client.get(f'/game/{game_id}').get_json() for game_id in game_ids]
+    completed = [game for game in finished if game.get('status') != 'active']
+    plies = sum(len(game.get('moves', [])) for game in finished)
+    latencies = timer.latencies
+
+    return {
+        "concurrency": concurrency,
+        "completed_games": len(completed),
+        "timed_out": len(completed) < concurrency,
+        "wall_seconds": round(wall, 3),
+        "games_per_sec": round(len(completed) / wall, 3),
+        "plies_per_sec": round(plies / wall, 1),
+        "avg_plies_per_game": round(plies / concurrency, 1),
+        "llm_calls_per_game": round((counter.calls - calls_before) / concurrency, 2),
+        "move_latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+        },
+        "routes": {
+            "game": time_route(client, f'/game/{game_ids[0]}'),
+            "leaderboard": time_route(client, '/leaderboard'),
+            "home": time_route(client, '/', samples=5),
+        },
+        "scheduler": main.scheduler.stats(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_arena_benchmark(args):
+    # main reads its settings at import time, so configure it first
+    os.environ.setdefault("AZURE_OPENAI_API_KEY", "benchmark")
+    os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "http://localhost")
+    os.environ["CHESS_MOVE_DELAY"] = "0"
+    os.environ["CHESS_LOG_MOVES"] = "0"
+    os.environ.setdefault("CHESS_ARCHIVE_PATH", os.path.join(tempfile.mkdtemp(prefix="chess-bench-"), "games.jsonl.gz"))
+    if args.no_cache:
+        os.environ["CHESS_MOVE_CACHE_SIZE"] = "0"
+    if args.no_book:
+        os.environ["CHESS_OPENING_BOOK"] = ""
+    if args.batch_window_ms:
+        os.environ["CHESS_BATCH_WINDOW_MS"] = str(args.batch_window_ms)
+
+    import main
+
+    if args.model == "fake":
+        model = FakeChatModel(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000, seed=args.seed)
+    else:
+        model = main.openai_client  # uses AZURE_OPENAI_ENDPOINT, e.g. the mock server
+    counter = CountingClient(model)
+    main.openai_client = counter
+
+    timer = MoveTimer(main.ChessGame)
+    timer.install()
+    try:
+        results = []
+        for concurrency in args.levels:
+            print(f"⏱️  {concurrency} concurrent games...")
+            result = run_arena_level(main, counter, timer, concurrency, args.timeout)
+            results.append(result)
+            print(f"   {result['games_per_sec']} games/s, {result['plies_per_sec']} plies/s, "
+                  f"p95 move {result['move_latency_ms']['p95']} ms, peak RSS {result['peak_rss_mb']} MB")
+    finally:
+        timer.uninstall()
+    return results
+
+
+def random_games(count, players, seed):
+    """Finished games of random legal moves, played before any timing starts"""
+    from chess_game import ChessGame
+    rng = random.Random(seed)
+    finished = []
+    for number in range(count):
+        white, black = rng.sample(players, 2)
+        game = ChessGame(f"bench-{number:06d}", white, black)
+        game.start_time -= count - number  # distinct start times, oldest first
+        while game.status == "active" and game.ply_count < 120:
+            game.make_move(rng.choice(game.get_legal_moves()))
+        if game.status == "active":
+            game.finish("draw", "move_limit")
+        finished.append(game)
+    return finished
+
+
+def time_reads(backend, finished, players, rng, samples=200):
+    """Mean ms per get by id and per newest-50 search by player"""
+    started = time.perf_counter()
+    for game in rng.sample(finished, min(samples, len(finished))):
+        backend.get(game.id)
+    get_ms = (time.perf_counter() - started) / min(samples, len(finished)) * 1000
+    started = time.perf_counter()
+    for _ in range(samples):
+        backend.find(player=rng.choice(players), limit=50)
+    find_ms = (time.perf_counter() - started) / samples * 1000
+    return round(get_ms, 3), round(find_ms, 3)
+
+
+class DictBackend:
+    """The baseline: finished games in a dict, searched by scanning it"""
+
+    def __init__(self):
+        self.games = {}
+
+    def add(self, game):
+        self.games[game.id] = game
+
+    def get(self, game_id):
+        return self.games.get(game_id)
+
+    def find(self, player=None, limit=50):
+        matches = [game for game in self.games.values() if player in (game.white_player, game.black_player)]
+        matches.sort(key=lambda game: game.start_time, reverse=True)
+        return [game.id for game in matches[:limit]]
+
+
+def run_storage_benchmark(args):
+    from game_archive import GameArchive
+    from storage_sqlite import SQLiteStore
+
+    players = [f"GPT-{number}" for number in range(50)]
+    print(f"🎲 Playing {args.storage_games} random games to store...")
+    finished = random_games(args.storage_games, players, args.seed)
+    plies = sum(game.ply_count for game in finished)
+    directory = tempfile.mkdtemp(prefix="chess-storage-")
+
+    results = []
+    for name in ("dict", "archive", "sqlite"):
+        rng = random.Random(args.seed)
+        path = os.path.join(directory, "games.jsonl.gz" if name == "archive" else "arena.db")
+        if name == "dict":
+            backend = DictBackend()
+        elif name == "archive":
+            backend = GameArchive(path, hot_size=100)
+        else:
+            backend = SQLiteStore(path, commit_interval_ms=args.commit_ms, hot_size=100)
+
+        # Every move as it is played (only SQLite keeps moves of running games), then each finished game
+        started = time.perf_counter()
+        for game in finished:
+            if name == "sqlite":
+                backend.start_game(game)
+                for ply, code in enumerate(game.packed_moves, 1):
+                    backend.append_move(game.id, ply, code)
+            backend.add(game)
+        if name == "sqlite":
+            backend.flush()
+        write_seconds = time.perf_counter() - started
+        batching = backend.stats()["statements_per_commit"] if name == "sqlite" else None
+
+        # Reopen so reads come from disk instead of the hot LRU
+        if name != "dict":
+            backend.close()
+            backend = GameArchive(path, hot_size=100) if name == "archive" else \
+                SQLiteStore(path, commit_interval_ms=args.commit_ms, hot_size=100)
+        get_ms, find_ms = time_reads(backend, finished, players, rng)
+
+        result = {
+            "backend": name,
+            "games": len(finished),
+            "plies": plies,
+            "write_seconds": round(write_seconds, 3),
+            "games_per_sec": round(len(finished) / write_seconds) if write_seconds else None,
+            "moves_per_sec": round(plies / write_seconds) if name == "sqlite" else None,
+            "statements_per_commit": batching,
+            "get_cold_ms": get_ms,
+            "find_player_ms": find_ms,
+            "bytes": sum(os.path.getsize(os.path.join(directory, file)) for file in os.listdir(directory)
+                         if file.startswith(os.path.basename(path))) if name != "dict" else None,
+        }
+        if name != "dict":
+            backend.close()
+        results.append(result)
+        print(f"   {name:<8} wrote {len(finished)} games in {result['write_seconds']} s, "
+              f"get {get_ms} ms, find by player {find_ms} ms")
+    return results
+
+
+def random_positions(count, seed):
+    """Positions from random games, spread over the opening, middlegame and endgame"""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = chess.Board()
+        for _ in range(rng.randrange(0, 100)):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            board.push(rng.choice(moves))
+        if not board.is_game_over():
+            positions.append(board)
+    return positions
+
+
+def run_prompt_benchmark(args):
+    from prompts import PromptBuilder, count_tokens, parse_move
+
+    print(f"🧾 Prompting {args.prompt_positions} positions with each encoding...")
+    positions = random_positions(args.prompt_positions, args.seed)
+    model = chat_model(args, token_latency=args.token_latency_ms / 1000)
+
+    results = []
+    # (name, encoding, legal list): "full" is the original prompt every other row is measured against
+    for name, encoding, legal_list in (("full", "full", True), ("uci", "uci", True), ("san", "san", True),
+                                       ("san-no-list", "san", False)):
+        builder = PromptBuilder(encoding=encoding)
+        tokens, build_times, latencies, legal = [], [], [], 0
+        for board in positions:
+            started = time.perf_counter()
+            prompt = builder.build("GPT-Balanced", board, legal_list=legal_list)
+            build_times.append(time.perf_counter() - started)
+            tokens.append(count_tokens(prompt.messages))
+
+            started = time.perf_counter()
+            response = model.chat.completions.create(model="gpt-35-turbo", messages=prompt.messages, max_tokens=20,
+                                                     temperature=0.7)
+            latencies.append(time.perf_counter() - started)
+            legal += parse_move(board, response.choices[0].message.content) is not None
+
+        result = {
+            "encoding": name,
+            "positions": len(positions),
+            "prompt_tokens": {"mean": round(sum(tokens) / len(tokens), 1), "p95": percentile(tokens, 0.95),
+                              "max": max(tokens)},
+            "build_us": round(sum(build_times) / len(build_times) * 1e6, 1),
+            "move_latency_ms": {"p50": round(percentile(latencies, 0.50) * 1000, 2),
+                                "p95": round(percentile(latencies, 0.95) * 1000, 2)},
+            "legal_rate": round(legal / len(positions), 3),
+            "tokenizer": builder.stats()["tokenizer"],
+        }
+        results.append(result)
+        print(f"   {name:<12} {result['prompt_tokens']['mean']:>6} tokens/move (p95 {result['prompt_tokens']['p95']}), "
+              f"p50 move {result['move_latency_ms']['p50']} ms, legal {result['legal_rate']:.0%}")
+
+    baseline = results[0]["prompt_tokens"]["mean"]
+    for result in results:
+        result["tokens_vs_full"] = round(result["prompt_tokens"]["mean"] / baseline, 3)
+    return results
+
+
+def chat_model(args, **options):
+    """The model the prompt and streaming suites talk to"""
+    if args.model == "fake":
+        return FakeChatModel(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000, seed=args.seed, **options)
+    from openai import AzureOpenAI
+    return AzureOpenAI(api_key=os.getenv("AZURE_OPENAI_API_KEY", "benchmark"),
+                       azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"), api_version="2024-05-01-preview")
+
+
+def run_stream_benchmark(args):
+    from move_stream import MoveStreamer
+    from prompts import PromptBuilder, parse_move
+
+    print(f"🌊 Asking for {args.prompt_positions} moves with whole and streamed replies...")
+    positions = random_positions(args.prompt_positions, args.seed)
+    model = chat_model(args, output_latency=args.output_token_ms / 1000, ramble_rate=args.ramble_rate)
+    builder = PromptBuilder()
+
+    # "streamed" never reads a stream to the end, so whole - streamed is the measured saving. "sampled"
+    # reads every other stream to the end, as control samples for the estimate GET /streaming reports
+    results = []
+    for mode, sample_every in (("whole", 0), ("streamed", 0), ("sampled", 2)):
+        streamer = MoveStreamer(sample_every=sample_every)
+        latencies, legal = [], 0
+        for board in positions:
+            prompt = builder.build("GPT-Balanced", board, legal_list=True)
+            started = time.perf_counter()
+            if mode != "whole":
+                reply = streamer.read(model.chat.completions.create(
+                    model="gpt-35-turbo", messages=prompt.messages, max_tokens=20, temperature=0.7, stream=True), board)[0]
+                move = parse_move(board, reply)
+            else:
+                response = model.chat.completions.create(model="gpt-35-turbo", messages=prompt.messages, max_tokens=20,
+                                                         temperature=0.7)
+                move = parse_move(board, response.choices[0].message.content)
+            latencies.append(time.perf_counter() - started)
+            legal += move is not None
+
+        result = {
+            "mode": mode,
+            "positions": len(positions),
+            "move_latency_ms": {"mean": round(sum(latencies) / len(latencies) * 1000, 2),
+                                "p50": round(percentile(latencies, 0.50) * 1000, 2),
+                                "p95": round(percentile(latencies, 0.95) * 1000, 2)},
+            "legal_rate": round(legal / len(positions), 3),
+        }
+        if mode != "whole":
+            result["streamer"] = streamer.stats()
+        results.append(result)
+        print(f"   {mode:<9} mean move {result['move_latency_ms']['mean']} ms, p95 {result['move_latency_ms']['p95']} ms, "
+              f"legal {result['legal_rate']:.0%}")
+    measured = results[0]["move_latency_ms"]["mean"] - results[1]["move_latency_ms"]["mean"]
+    sampled = results[2]["streamer"]
+    print(f"   measured saving {measured:.1f} ms per move")
+    # The estimate only counts streams that were cut short, so scale it up to a stream that is never sampled
+    cut_share = sampled["cut_short"] / sampled["streams"] if sampled["streams"] else 0
+    estimate = sampled["est_ms_saved_per_move"] / cut_share \
+        if sampled["est_ms_saved_per_move"] is not None and cut_share else None
+    print(f"   estimate from {sampled['control_streams']} control streams: "
+          f"{round(estimate, 1) if estimate is not None else None} ms per move"
+          f"{' (too few samples to trust)' if sampled['control_streams'] < 30 else ''}")
+    results.append({"measured_ms_saved_per_move": round(measured, 1),
+                    "estimated_ms_saved_per_move": round(estimate, 1) if estimate is not None else None})
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    """Print the change against a previous run; returns True if any level regressed beyond threshold %"""
+    with open(baseline_path) as baseline_file:
+        baseline = {level["concurrency"]: level for level in json.load(baseline_file)["arena"]}
+
+    regressed = False
+    print(f"\n📈 Compared with {baseline_path}")
+    for level in results:
+        before = baseline.get(level["concurrency"])
+        if not before:
+            continue
+        checks = [
+            ("games/s", before["games_per_sec"], level["games_per_sec"], True),
+            ("plies/s", before["plies_per_sec"], level["plies_per_sec"], True),
+            ("p95 move ms", before["move_latency_ms"]["p95"], level["move_latency_ms"]["p95"], False),
+            ("LLM calls/game", before["llm_calls_per_game"], level["llm_calls_per_game"], False),
+        ]
+        for name, old, new, higher_is_better in checks:
+            if not old:
+                continue
+            change = (new - old) / old * 100
+            worse = -change if higher_is_better else change
+            flag = "❌" if worse > threshold else "✅"
+            regressed = regressed or worse > threshold
+            print(f"   {flag} {level['concurrency']:>5} games  {name:<15} {old:>10} -> {new:<10} ({change:+.1f}%)")
+    return regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Chess LLM Arena benchmark suite')
+    parser.add_argument('--suite', default='arena', help='Comma-separated suites to run: arena, storage, prompts, streaming')
+    parser.add_argument('--levels', default='1,10,100,1000', help='Comma-separated numbers of concurrent games')
+    parser.add_argument('--model', choices=['fake', 'endpoint'], default='fake',
+                        help='fake = in-process model, endpoint = AZURE_OPENAI_ENDPOINT (e.g. the mock server)')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Fake model latency per call')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Fake model latency jitter (+/-)')
+    parser.add_argument('--seed', type=int, default=1, help='Fake model random seed')
+    parser.add_argument('--timeout', type=float, default=600, help='Seconds to wait for each level')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the move cache')
+    parser.add_argument('--no-book', action='store_true', help='Disable the opening book')
+    parser.add_argument('--batch-window-ms', type=int, default=0, help='Enable cross-game batching')
+    parser.add_argument('--storage-games', type=int, default=2000, help='Games written by the storage suite')
+    parser.add_argument('--commit-ms', type=int, default=50, help='SQLite group commit interval for the storage suite')
+    parser.add_argument('--prompt-positions', type=int, default=200, help='Positions prompted by the prompts suite')
+    parser.add_argument('--token-latency-ms', type=float, default=0.2,
+                        help='Fake model time per prompt token in the prompts suite')
+    parser.add_argument('--output-token-ms', type=float, default=20,
+                        help='Fake model time per completion token in the streaming suite')
+    parser.add_argument('--ramble-rate', type=float, default=0.5,
+                        help='Chance a fake model move comes with an explanation in the streaming suite')
+    parser.add_argument('--out', default='benchmark_results.json', help='Where to write the JSON results')
+    parser.add_argument('--baseline', help='Previous results JSON to compare against')
+    parser.add_argument('--fail-on-regression', type=float, default=None,
+                        help='Exit with an error if any metric is this many percent worse than the baseline')
+
+    args = parser.parse_args()
+    args.levels = [int(level) for level in args.levels.split(',')]
+    suites = args.suite.split(',')
+
+    print("🏁 Chess LLM Arena Benchmark")
+    print("=" * 50)
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ('out', 'baseline')},
+    }
+    if "arena" in suites:
+        report["arena"] = run_arena_benchmark(args)
+    if "storage" in suites:
+        report["storage"] = run_storage_benchmark(args)
+    if "prompts" in suites:
+        report["prompts"] = run_prompt_benchmark(args)
+    if "streaming" in suites:
+        report["streaming"] = run_stream_benchmark(args)
+
+    with open(args.out, 'w') as out_file:
+        json.dump(report, out_file, indent=2)
+    print(f"\n💾 Results written to {args.out}")
+
+    if args.baseline and "arena" in report:
+        regressed = compare(report["arena"], args.baseline, args.fail_on_regression or 0)
+        if args.fail_on_regression is not None and regressed:
+            sys.exit(1)
@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, request, jsonify, render_template_string, Response
 from markupsafe import Markup
 from openai import AzureOpenAI
 import os
@@ -10,6 +10,9 @@ import threading
 import time
 from datetime import datetime
 import uuid
+from events import EventBus
+from ratings import RatingEngine
+from rate_limiter import RateLimiter, estimate_tokens
 
 # Load environment variables
 dotenv.load_dotenv()
@@ -17,6 +20,8 @@ dotenv.load_dotenv()
 AOAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AOAI_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 MODEL_NAME = "gpt-35-turbo"
+AOAI_RPM = int(os.getenv("CHESS_AOAI_RPM", "0"))  # 0 = no limit
+AOAI_TPM = int(os.getenv("CHESS_AOAI_TPM", "0"))
 
 app = Flask(__name__)
 
@@ -24,14 +29,23 @@ openai_client = AzureOpenAI(
     api_key=AOAI_KEY,
     azure_endpoint=AOAI_ENDPOINT,
     api_version="2024-05-01-preview",
+    max_retries=0,  # llm_limiter retries, so it sees every 429
 )
 
+# Model calls wait here for quota and back off on 429s
+llm_limiter = RateLimiter(rpm=AOAI_RPM, tpm=AOAI_TPM)
+
 # Global game state
 games = {}
 tournaments = {}
-leaderboard = {}
 active_games = []
 
+# Moves, results and leaderboard changes pushed to browsers over /events
+events = EventBus()
+
+# Win/loss records and Elo ratings, updated atomically when a game ends
+ratings = RatingEngine()
+
 class ChessGame:
     def __init__(self, game_id, white_player, black_player):
         self.id = game_id
@@ -88,16 +102,19 @@ Please respond with ONLY the move in UCI format (e.g., e2e4, g1f3, etc.).
 Choose a good strategic move from the legal moves list.
 Do not include any explanation, just the move."""
 
+    messages = [
+        {"role": "system", "content": "You are a chess grandmaster. Always respond with only a valid UCI move."},
+        {"role": "user", "content": prompt}
+    ]
     try:
-        response = openai_client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": "You are a chess grandmaster. Always respond with only a valid UCI move."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=20,
-            temperature=0.7
-        )
+        response = llm_limiter.call(
+            lambda: openai_client.chat.completions.create(
+                model=MODEL_NAME,
+                messages=messages,
+                max_tokens=20,
+                temperature=0.7
+            ),
+            tokens=estimate_tokens(messages, 20))
         
         move = response.choices[0].message.content.strip()
         
@@ -127,6 +144,8 @@ def play_game_auto(game_id):
         
         # Make the move
         if game.make_move(move):
+            events.publish('move', {'id': game.id, 'ply': len(game.moves), 'move': move,
+                                    'fen': game.get_fen(), 'turn': game.current_turn})
             print(f"Game {game_id}: {current_player} played {move}")
             time.sleep(1)  # Small delay between moves
         else:
@@ -135,30 +154,34 @@ def play_game_auto(game_id):
     
     # Update leaderboard
     if game.result:
-        if game.result == "white":
-            update_leaderboard(game.white_player, "win")
-            update_leaderboard(game.black_player, "loss")
-        elif game.result == "black":
-            update_leaderboard(game.black_player, "win")
-            update_leaderboard(game.white_player, "loss")
-        else:
-            update_leaderboard(game.white_player, "draw")
-            update_leaderboard(game.black_player, "draw")
+        score = {"white": 1, "black": 0}.get(game.result, 0.5)
+        changed = ratings.record_game(game.white_player, game.black_player, score)
+        events.publish('game_finished', {'id': game.id, 'result': game.result})
+        events.publish('leaderboard', changed)
 
-def update_leaderboard(player, result):
-    """Update player stats in leaderboard"""
-    if player not in leaderboard:
-        leaderboard[player] = {"wins": 0, "losses": 0, "draws": 0, "games": 0}
+# HTML Templates
+GAME_CARD_TEMPLATE = """
+<div class="game-card" data-game-id="{{ game.id }}" data-status="{{ game.status }}">
+    <h3>⚔️ Game {{ game.id[:8] }}</h3>
+    <p><strong>White:</strong> {{ game.white_player }}</p>
+    <p><strong>Black:</strong> {{ game.black_player }}</p>
+    <p><strong>Status:</strong> <span class="js-status status-{{ game.status }}">{{ game.status.upper() }}</span></p>
+    <p><strong>Turn:</strong> <span class="js-turn">{{ game.current_turn.upper() }}</span></p>
+    <p class="js-result-line"{% if not game.result %} style="display: none"{% endif %}><strong>Result:</strong> <span class="js-result">{{ (game.result or '').upper() }}</span></p>
+    <p><strong>Moves:</strong> <span class="js-ply">{{ game.moves|length }}</span></p>
+    
+    <div class="move-list">
+        {% for move in game.moves[-10:] %}
+        <div>{{ loop.index0 + 1 + (game.moves|length - 10 if game.moves|length > 10 else 0) }}. {{ move }}</div>
+        {% endfor %}
+    </div>
     
-    leaderboard[player]["games"] += 1
-    if result == "win":
-        leaderboard[player]["wins"] += 1
-    elif result == "loss":
-        leaderboard[player]["losses"] += 1
-    else:
-        leaderboard[player]["draws"] += 1
+    <div class="chess-board">
+        {{ render_board(game.board)|safe }}
+    </div>
+</div>
+"""
 
-# HTML Templates
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
@@ -319,16 +342,15 @@ HTML_TEMPLATE = """
             .then(data => {
                 if (data.success) {
                     alert('Game started! Game ID: ' + data.game_id);
-                    refreshPage();
                 } else {
                     alert('Error starting game: ' + data.error);
                 }
             });
         }
-        
-        // Auto-refresh every 5 seconds
-        setInterval(refreshPage, 5000);
     </script>
+    <!-- Moves and results arrive over /events, so there is no timed reload -->
+    <script src="/static/board.js" defer></script>
+    <script src="/static/live.js" defer></script>
 </head>
 <body>
     <div class="container">
@@ -359,27 +381,7 @@ HTML_TEMPLATE = """
             </div>
             
             {% for game_id, game in games.items() %}
-            <div class="game-card">
-                <h3>⚔️ Game {{ game_id[:8] }}</h3>
-                <p><strong>White:</strong> {{ game.white_player }}</p>
-                <p><strong>Black:</strong> {{ game.black_player }}</p>
-                <p><strong>Status:</strong> <span class="status-{{ game.status }}">{{ game.status.upper() }}</span></p>
-                <p><strong>Turn:</strong> {{ game.current_turn.upper() }}</p>
-                {% if game.result %}
-                <p><strong>Result:</strong> {{ game.result.upper() }}</p>
-                {% endif %}
-                <p><strong>Moves:</strong> {{ game.moves|length }}</p>
-                
-                <div class="move-list">
-                    {% for move in game.moves[-10:] %}
-                    <div>{{ loop.index0 + 1 + (game.moves|length - 10 if game.moves|length > 10 else 0) }}. {{ move }}</div>
-                    {% endfor %}
-                </div>
-                
-                <div class="chess-board">
-                    {{ render_board(game.board)|safe }}
-                </div>
-            </div>
+            {{ render_game_card(game) }}
             {% endfor %}
         </div>
         
@@ -388,23 +390,23 @@ HTML_TEMPLATE = """
             <table>
                 <thead>
                     <tr>
-                        <th>Player</th>
-                        <th>Games</th>
-                        <th>Wins</th>
-                        <th>Losses</th>
-                        <th>Draws</th>
-                        <th>Win Rate</th>
+                        <th data-field="player">Player</th>
+                        <th data-field="games">Games</th>
+                        <th data-field="wins">Wins</th>
+                        <th data-field="losses">Losses</th>
+                        <th data-field="draws">Draws</th>
+                        <th data-field="win_rate">Win Rate</th>
                     </tr>
                 </thead>
                 <tbody>
                     {% for player, stats in leaderboard.items() %}
-                    <tr>
-                        <td>{{ player }}</td>
-                        <td>{{ stats.games }}</td>
-                        <td>{{ stats.wins }}</td>
-                        <td>{{ stats.losses }}</td>
-                        <td>{{ stats.draws }}</td>
-                        <td>{{ "%.1f%%" % (stats.wins / stats.games * 100 if stats.games > 0 else 0) }}</td>
+                    <tr data-player="{{ player }}">
+                        <td data-field="player">{{ player }}</td>
+                        <td data-field="games">{{ stats.games }}</td>
+                        <td data-field="wins">{{ stats.wins }}</td>
+                        <td data-field="losses">{{ stats.losses }}</td>
+                        <td data-field="draws">{{ stats.draws }}</td>
+                        <td data-field="win_rate">{{ "%.1f%%" % (stats.wins / stats.games * 100 if stats.games > 0 else 0) }}</td>
                     </tr>
                     {% endfor %}
                 </tbody>
@@ -438,9 +440,13 @@ def render_board(board):
     
     return Markup(board_html)
 
+def render_game_card(game):
+    """HTML for one game card; static/live.js patches the js-* fields as moves arrive"""
+    return Markup(render_template_string(GAME_CARD_TEMPLATE, game=game, render_board=render_board))
+
 @app.route('/')
 def home():
-    return render_template_string(HTML_TEMPLATE, games=games, leaderboard=leaderboard, render_board=render_board)
+    return render_template_string(HTML_TEMPLATE, games=games, leaderboard=ratings.leaderboard(), render_game_card=render_game_card)
 
 @app.route('/start_game', methods=['POST'])
 def start_game():
@@ -452,6 +458,7 @@ def start_game():
         game_id = str(uuid.uuid4())
         game = ChessGame(game_id, white_player, black_player)
         games[game_id] = game
+        events.publish('game_started', {'id': game_id, 'white_player': white_player, 'black_player': black_player})
         
         # Start the game in a separate thread
         game_thread = threading.Thread(target=play_game_auto, args=(game_id,))
@@ -479,9 +486,23 @@ def get_game(game_id):
         })
     return jsonify({'error': 'Game not found'}), 404
 
+@app.route('/game/<game_id>/card')
+def get_game_card(game_id):
+    """One game card, fetched by the live page when a game starts"""
+    if game_id in games:
+        return render_game_card(games[game_id])
+    return "Game not found", 404
+
+@app.route('/events')
+def stream_events():
+    """Server-Sent Events: moves, game starts/finishes and leaderboard changes"""
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    return Response(events.stream(last_event_id), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/leaderboard')
 def get_leaderboard():
-    return jsonify(leaderboard)
+    return jsonify(ratings.leaderboard())
 
 @app.route('/tournament', methods=['POST'])
 def start_tournament():
@@ -500,6 +521,7 @@ def start_tournament():
                     game = ChessGame(game_id, white, black)
                     games[game_id] = game
                     tournament_games.append(game_id)
+                    events.publish('game_started', {'id': game_id, 'white_player': white, 'black_player': black})
                     
                     # Start each game
                     game_thread = threading.Thread(target=play_game_auto, args=(game_id,))
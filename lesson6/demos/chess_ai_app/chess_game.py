@@ -0,0 +1,191 @@
+"""
+Chess Game records for Chess LLM Arena
+
+ChessGame keeps each game small enough to hold 100k+ of them in one process:
+__slots__ instead of a per-instance dict, moves packed into an array of
+16-bit codes (from | to << 6 | promotion << 12) instead of a list of UCI
+strings, and a timestamp float instead of a datetime. Only active games keep
+a live chess.Board; finished games keep their final FEN and rebuild a board
+from the packed moves when one is asked for.
+"""
+import os
+import sys
+import time
+from array import array
+
+import chess
+
+from termination import TerminationTracker
+
+MAX_PLIES = int(os.getenv("CHESS_MAX_PLIES", "300"))  # 0 removes the cap
+ADJUDICATE_MATERIAL = int(os.getenv("CHESS_ADJUDICATE_MATERIAL", "0"))  # pawns ahead to win on material; 0 disables
+ADJUDICATE_PLIES = int(os.getenv("CHESS_ADJUDICATE_PLIES", "10"))  # ...held for this many plies
+
+
+def pack_move(move):
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def unpack_move(code):
+    return chess.Move(code & 0x3f, (code >> 6) & 0x3f, (code >> 12) or None)
+
+
+UCI_BY_CODE = {}  # a few thousand possible codes, so listing moves is a dict lookup per ply
+
+
+def code_to_uci(code):
+    uci = UCI_BY_CODE.get(code)
+    if uci is None:
+        uci = UCI_BY_CODE[code] = unpack_move(code).uci()
+    return uci
+
+
+class ChessGame:
+    __slots__ = ("id", "white_player", "black_player", "status", "result", "termination",
+                 "start_time", "end_time", "_moves", "_board", "_fen", "tracker")
+
+    def __init__(self, game_id, white_player, black_player):
+        self.id = game_id
+        self.white_player = sys.intern(white_player)
+        self.black_player = sys.intern(black_player)
+        self.status = "active"
+        self.result = None
+        self.termination = None
+        self.start_time = time.time()
+        self.end_time = None
+        self._moves = array('H')
+        self._board = chess.Board()
+        self._fen = None
+        self.tracker = TerminationTracker(self._board, max_plies=MAX_PLIES,
+                                          material_threshold=ADJUDICATE_MATERIAL,
+                                          material_plies=ADJUDICATE_PLIES)
+
+    @property
+    def moves(self):
+        """Moves played so far as UCI strings"""
+        return [code_to_uci(code) for code in self._moves]
+
+    @property
+    def packed_moves(self):
+        """Moves played so far as the packed array('H') codes"""
+        return self._moves
+
+    @property
+    def ply_count(self):
+        return len(self._moves)
+
+    @property
+    def last_move(self):
+        return code_to_uci(self._moves[-1]) if self._moves else None
+
+    @property
+    def current_turn(self):
+        return "white" if len(self._moves) % 2 == 0 else "black"
+
+    @property
+    def board(self):
+        """The live board while the game runs, otherwise a board rebuilt from the packed moves"""
+        if self._board is not None:
+            return self._board
+        board = chess.Board()
+        for code in self._moves:
+            board.push(unpack_move(code))
+        return board
+
+    def make_move(self, move_str):
+        try:
+            move = chess.Move.from_uci(move_str)
+        except (ValueError, TypeError):
+            return False
+        if self.status != "active" or move not in self._board.legal_moves:
+            return False
+
+        self.tracker.push(self._board, move)
+        self._moves.append(pack_move(move))
+        self._fen = None
+        # The tracker handles repetition, so the board's undo stack is dead weight
+        self._board.clear_stack()
+
+        # Check game status
+        if self._board.is_checkmate():
+            self.finish("white" if self._board.turn == chess.BLACK else "black", "checkmate")
+        elif self._board.is_stalemate():
+            self.finish("draw", "stalemate")
+        elif self._board.is_insufficient_material():
+            self.finish("draw", "insufficient_material")
+        else:
+            # Repetition, fifty-move rule and adjudication keep games from running forever
+            ending = self.tracker.check(self._board)
+            if ending:
+                self.finish(*ending)
+
+        return True
+
+    def finish(self, result, reason):
+        """End the game and drop the live board and tracker"""
+        self.status = "finished"
+        self.result = result
+        self.termination = reason
+        self.end_time = time.time()
+        if self._board is not None:
+            self._fen = self.get_fen()
+            self._board = None
+            self.tracker = None
+
+    def to_record(self):
+        """Plain dict of a game for the archive"""
+        return {
+            "id": self.id,
+            "white_player": self.white_player,
+            "black_player": self.black_player,
+            "status": self.status,
+            "result": self.result,
+            "termination": self.termination,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "moves": self.moves,
+            "fen": self.get_fen(),
+        }
+
+    @classmethod
+    def from_record(cls, record):
+        """Rebuild a finished game from to_record() output (moves may also be an already packed array)"""
+        game = cls.__new__(cls)
+        game.id = record["id"]
+        game.white_player = sys.intern(record["white_player"])
+        game.black_player = sys.intern(record["black_player"])
+        game.status = record["status"]
+        game.result = record["result"]
+        game.termination = record["termination"]
+        game.start_time = record["start_time"]
+        game.end_time = record["end_time"]
+        moves = record["moves"]
+        game._moves = moves if isinstance(moves, array) else array('H', (pack_move(chess.Move.from_uci(move))
+                                                                          for move in moves))
+        game._board = None
+        game._fen = record["fen"]
+        game.tracker = None
+        return game
+
+    @classmethod
+    def replay(cls, game_id, white_player, black_player, start_time, codes):
+        """Rebuild a game in progress by playing its packed moves again"""
+        game = cls(game_id, white_player, black_player)
+        game.start_time = start_time
+        for code in codes:
+            game.make_move(code_to_uci(code))
+        return game
+
+    def is_repeated_position(self):
+        """True if the current position has already occurred in this game"""
+        return self.tracker is not None and self.tracker.repetitions.get(self.tracker.key, 0) >= 2
+
+    def get_fen(self):
+        # board.fen() is slow and the prompt, cache key and live event all want it each ply
+        if self._fen is None:
+            self._fen = self._board.fen()
+        return self._fen
+
+    def get_legal_moves(self):
+        board = self._board if self._board is not None else self.board
+        return [move.uci() for move in board.legal_moves]
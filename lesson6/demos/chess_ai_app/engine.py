@@ -0,0 +1,290 @@
+"""
+Search Engine for Chess LLM Arena
+
+A small alpha-beta engine on top of python-chess. It plays as its own player
+("Engine", or e.g. "Engine-50ms" for a weaker one) to give LLM players a
+fixed baseline to be rated against. It also replaces the random move when
+the model gives no usable answer.
+
+Search is iterative deepening negamax with alpha-beta, quiescence search on
+captures, a transposition table, and move ordering by table move, captures
+(MVV-LVA: most valuable victim, least valuable attacker), promotions and
+killer moves. The evaluation is material plus piece-square tables. Every
+search stops at its time budget and returns the best move of the deepest
+finished iteration, so a move never takes much longer than the budget.
+"""
+import re
+import threading
+import time
+
+import chess
+
+MATE = 100000
+PIECE_VALUES = [0, 100, 320, 330, 500, 900, 0]  # by piece type; the king is never traded
+
+# Piece-square tables from White's side, rank 8 first (the "simplified evaluation function")
+TABLES = {
+    chess.PAWN: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0],
+    chess.KNIGHT: [
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50],
+    chess.BISHOP: [
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20],
+    chess.ROOK: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0],
+    chess.QUEEN: [
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20],
+    chess.KING: [
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20, 20, 0, 0, 0, 0, 20, 20,
+        20, 30, 10, 0, 0, 10, 30, 20],
+}
+
+# SQUARE_SCORES[colour][piece_type][square]: material plus placement, a1 = square 0
+SQUARE_SCORES = {
+    chess.WHITE: {piece_type: [PIECE_VALUES[piece_type] + table[(7 - chess.square_rank(square)) * 8
+                                                                + chess.square_file(square)]
+                               for square in chess.SQUARES]
+                  for piece_type, table in TABLES.items()},
+}
+SQUARE_SCORES[chess.BLACK] = {piece_type: [scores[chess.square_mirror(square)] for square in chess.SQUARES]
+                              for piece_type, scores in SQUARE_SCORES[chess.WHITE].items()}
+
+EXACT, LOWER, UPPER = 0, 1, 2
+ENGINE_NAME_RE = re.compile(r"^Engine(?:-(\d+)ms)?$")
+
+
+def engine_budget(player_name, default):
+    """Seconds per move if `player_name` is an engine player ("Engine" or "Engine-<ms>ms"), else None"""
+    match = ENGINE_NAME_RE.match(player_name or "")
+    if match is None:
+        return None
+    return int(match.group(1)) / 1000 if match.group(1) else default
+
+
+def evaluate(board):
+    """Material and placement in centipawns, from the side to move's point of view"""
+    score = 0
+    for piece_type in range(chess.PAWN, chess.KING + 1):
+        white = SQUARE_SCORES[chess.WHITE][piece_type]
+        black = SQUARE_SCORES[chess.BLACK][piece_type]
+        for square in chess.scan_forward(board.pieces_mask(piece_type, chess.WHITE)):
+            score += white[square]
+        for square in chess.scan_forward(board.pieces_mask(piece_type, chess.BLACK)):
+            score -= black[square]
+    return score if board.turn == chess.WHITE else -score
+
+
+def move_gain(board, move):
+    """How much `move` changes evaluate() for the side making it, without playing it"""
+    own, other = SQUARE_SCORES[board.turn], SQUARE_SCORES[not board.turn]
+    piece_type = board.piece_type_at(move.from_square)
+    gain = own[move.promotion or piece_type][move.to_square] - own[piece_type][move.from_square]
+    if board.is_en_passant(move):
+        captured_square = move.to_square + (-8 if board.turn == chess.WHITE else 8)
+        gain += other[chess.PAWN][captured_square]
+    else:
+        captured = board.piece_type_at(move.to_square)
+        if captured:
+            gain += other[captured][move.to_square]
+        elif piece_type == chess.KING and abs(move.to_square - move.from_square) == 2:
+            rank = move.from_square & ~7  # castling: the rook moves too
+            rook_from, rook_to = (rank + 7, rank + 5) if move.to_square > move.from_square else (rank, rank + 3)
+            gain += own[chess.ROOK][rook_to] - own[chess.ROOK][rook_from]
+    return gain
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Search:
+    """State of one move's search; not shared between threads"""
+
+    def __init__(self, board, deadline, max_depth, table_size):
+        self.board = board
+        self.deadline = deadline
+        self.max_depth = max_depth
+        self.table_size = table_size
+        self.table = {}  # position key -> (depth, score, bound, move)
+        self.killers = [[None, None] for _ in range(max_depth + 64)]
+        self.nodes = 0
+        self.depth = 0
+        self.root_move = None
+
+    def ordered(self, moves, table_move, ply):
+        board = self.board
+        killers = self.killers[ply]
+
+        def key(move):
+            if move == table_move:
+                return -100000
+            if board.is_capture(move):
+                victim = board.piece_type_at(move.to_square) or chess.PAWN  # en passant
+                return -10000 - 10 * PIECE_VALUES[victim] + PIECE_VALUES[board.piece_type_at(move.from_square)]
+            if move.promotion:
+                return -9000
+            if move in killers:
+                return -8000
+            return 0
+        return sorted(moves, key=key)
+
+    def tick(self):
+        self.nodes += 1
+        if self.nodes & 1023 == 0 and self.depth > 1 and time.monotonic() > self.deadline:
+            raise SearchTimeout
+
+    # `score` is evaluate(board), updated move by move with move_gain() rather than recomputed
+    def quiesce(self, alpha, beta, ply, score):
+        self.tick()
+        stand_pat = score
+        if stand_pat >= beta:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+        board = self.board
+        for move in self.ordered(list(board.generate_legal_captures()), None, ply):
+            child = -(score + move_gain(board, move))
+            board.push(move)
+            value = -self.quiesce(-beta, -alpha, ply + 1, child)
+            board.pop()
+            if value >= beta:
+                return value
+            alpha = max(alpha, value)
+        return alpha
+
+    def negamax(self, depth, alpha, beta, ply, score):
+        board = self.board
+        self.tick()
+        if ply and (board.halfmove_clock >= 100 or board.is_repetition(2)):
+            return 0
+
+        # python-chess's own position key is about 15x cheaper than computing a Zobrist hash
+        key = board._transposition_key()
+        entry = self.table.get(key)
+        table_move = None
+        if entry is not None:
+            entry_depth, entry_score, bound, table_move = entry
+            if ply and entry_depth >= depth and (bound == EXACT or
+                                                 (bound == LOWER and entry_score >= beta) or
+                                                 (bound == UPPER and entry_score <= alpha)):
+                return entry_score
+
+        moves = list(board.legal_moves)
+        if not moves:
+            return -MATE + ply if board.is_check() else 0
+        if depth <= 0:
+            return self.quiesce(alpha, beta, ply, score)
+
+        original_alpha = alpha
+        best_score, best_move = -MATE - 1, None
+        for move in self.ordered(moves, table_move, ply):
+            child = -(score + move_gain(board, move))
+            board.push(move)
+            value = -self.negamax(depth - 1, -beta, -alpha, ply + 1, child)
+            board.pop()
+            if value > best_score:
+                best_score, best_move = value, move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                if not board.is_capture(move) and move not in self.killers[ply]:
+                    self.killers[ply] = [move, self.killers[ply][0]]
+                break
+
+        if ply == 0:
+            self.root_move = best_move
+        bound = UPPER if best_score <= original_alpha else LOWER if best_score >= beta else EXACT
+        if len(self.table) < self.table_size or key in self.table:
+            self.table[key] = (depth, best_score, bound, best_move)
+        return best_score
+
+    def run(self):
+        """(best move, score, depth) of the deepest iteration finished before the deadline"""
+        best = (None, 0, 0)
+        score = evaluate(self.board)
+        for depth in range(1, self.max_depth + 1):
+            self.depth = depth
+            try:
+                value = self.negamax(depth, -MATE - 1, MATE + 1, 0, score)
+            except SearchTimeout:
+                break
+            best = (self.root_move, value, depth)
+            if abs(value) >= MATE - self.max_depth or time.monotonic() > self.deadline:
+                break  # a forced mate won't change, and another iteration would overrun
+        return best
+
+
+class Engine:
+    def __init__(self, time_limit=0.2, max_depth=32, table_size=200000):
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.table_size = table_size
+        self._lock = threading.Lock()
+
+        # Counters exposed through stats()
+        self.searches = 0
+        self.nodes = 0
+        self.depths = 0
+        self.seconds = 0.0
+
+    def choose(self, board, time_limit=None):
+        """Best move for the side to move in UCI format, within `time_limit` seconds (None if there is none)"""
+        started = time.monotonic()
+        search = Search(board.copy(stack=False), started + (time_limit or self.time_limit), self.max_depth,
+                        self.table_size)
+        move, _, depth = search.run()
+        with self._lock:
+            self.searches += 1
+            self.nodes += search.nodes
+            self.depths += depth
+            self.seconds += time.monotonic() - started
+        return move.uci() if move else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "searches": self.searches,
+                "avg_depth": round(self.depths / self.searches, 1) if self.searches else None,
+                "avg_nodes": round(self.nodes / self.searches) if self.searches else None,
+                "avg_ms": round(self.seconds / self.searches * 1000, 1) if self.searches else None,
+                "nodes_per_sec": round(self.nodes / self.seconds) if self.seconds else None,
+            }
@@ -0,0 +1,93 @@
+"""
+Live Events for Chess LLM Arena
+
+A small publish/subscribe hub for Server-Sent Events. Games publish a
+`move` event per ply (plus `game_started`, `game_finished` and
+`leaderboard`) and every open browser gets just that delta over
+`GET /events`, instead of reloading the whole page on a timer. Recent events
+are kept in a ring buffer so a reconnecting browser (EventSource sends
+Last-Event-ID) catches up on what it missed; one that fell too far behind,
+or that still has an id from before a restart, is told to reload.
+"""
+import json
+import queue
+import threading
+from collections import deque
+
+
+class EventBus:
+    def __init__(self, history=1000, client_queue_size=500):
+        self.client_queue_size = client_queue_size
+        self._history = deque(maxlen=history)  # (event_id, kind, payload) for replay
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._next_id = 1
+
+        self.published = 0
+        self.dropped_clients = 0
+
+    def publish(self, kind, data):
+        """Send an event to every connected client; safe to call from any thread"""
+        with self._lock:
+            event = (self._next_id, kind, json.dumps(data, separators=(',', ':')))
+            self._next_id += 1
+            self.published += 1
+            self._history.append(event)
+            for subscriber in list(self._subscribers):
+                if subscriber.qsize() >= self.client_queue_size:
+                    # A client this far behind is better off reloading; the spare slot holds the signal
+                    self._subscribers.discard(subscriber)
+                    self.dropped_clients += 1
+                    subscriber.put_nowait(None)
+                else:
+                    subscriber.put_nowait(event)
+
+    def subscribe(self, last_event_id=None):
+        """Register a client queue, pre-filled with anything it missed since last_event_id"""
+        subscriber = queue.Queue(maxsize=self.client_queue_size + 1)
+        with self._lock:
+            if last_event_id is not None:
+                missed = [event for event in self._history if event[0] > last_event_id]
+                gap = self._history and self._history[0][0] > last_event_id + 1
+                # An id we never handed out is from before a restart, when ids started over
+                ahead = last_event_id >= self._next_id
+                if gap or ahead or len(missed) > self.client_queue_size:
+                    missed = [(self._next_id - 1, "reload", "{}")]
+                for event in missed:
+                    subscriber.put_nowait(event)
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def stream(self, last_event_id=None, heartbeat=15):
+        """Generator of SSE-formatted text for one client"""
+        subscriber = self.subscribe(last_event_id)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"  # also notices clients that went away
+                    continue
+                if event is None:
+                    yield "event: reload\ndata: {}\n\n"
+                    return
+                event_id, kind, payload = event
+                yield f"id: {event_id}\nevent: {kind}\ndata: {payload}\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self):
+        """Connected clients and event counters"""
+        with self._lock:
+            return {
+                "clients": len(self._subscribers),
+                "published": self.published,
+                "last_event_id": self._next_id - 1,
+                "history": len(self._history),
+                "dropped_clients": self.dropped_clients,
+            }
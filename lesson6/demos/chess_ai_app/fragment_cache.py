@@ -0,0 +1,52 @@
+"""
+Fragment Cache for Chess LLM Arena
+
+Keeps rendered HTML fragments (one per game card) keyed by something that
+changes whenever the fragment would, e.g. (game_id, ply_count, status). A
+page render then only rebuilds the cards for games that moved since the last
+render; everything else is a dictionary lookup. Least-recently-used entries
+are evicted once the cache is full.
+"""
+import threading
+from collections import OrderedDict
+
+
+class FragmentCache:
+    def __init__(self, max_entries=2000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> html
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key, render):
+        """Return the cached fragment for key, calling render() to build it on a miss"""
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return html
+            self.misses += 1
+
+        # Render outside the lock; two threads racing on the same key just both render it
+        html = render()
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return html
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
@@ -0,0 +1,177 @@
+"""
+Game Archive for Chess LLM Arena
+
+Finished games move out of memory into an append-only archive on disk. Each
+game is one JSON line compressed as its own gzip member, so the whole file
+still reads with `zcat games.jsonl.gz` while any single game can be read by
+seeking to its offset. A plain-text sidecar index (`<path>.idx`) records the
+offset, length, players and date of every game and is loaded at startup. The
+files are only created when the first game is archived. The most recently
+finished or viewed games stay hot in a small LRU.
+"""
+import gzip
+import json
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+
+from chess_game import ChessGame
+
+
+class GameArchive:
+    def __init__(self, path, hot_size=100):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.hot_size = hot_size
+        self._hot = OrderedDict()  # game_id -> ChessGame, most recently used last
+        self._lock = threading.Lock()
+
+        # Row n of the index is the n-th archived game; the arrays keep it small per game
+        self._ids = []
+        self._rows = {}
+        self._offsets = array('Q')
+        self._lengths = array('I')
+        self._by_player = {}
+        self._by_date = {}
+
+        self.hot_hits = 0
+        self.disk_reads = 0
+
+        self._writer = None  # opened with _open() on first use
+        self._reader = None
+        self._index_writer = None
+        self._load_index()
+
+    def _open(self):
+        """Open (and create) the archive and index files; call with the lock held"""
+        if self._writer is None:
+            self._writer = open(self.path, 'ab')
+            self._reader = open(self.path, 'rb')
+            self._index_writer = open(self.index_path, 'a')
+
+    def _load_index(self):
+        """Read the sidecar index and cut off anything a crash left half-written"""
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        end = 0
+        kept = []
+        dropped = False
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as index_file:
+                for line in index_file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        entry = None
+                    if entry is None or entry["offset"] + entry["length"] > size:
+                        dropped = True
+                        break
+                    self._add_row(entry)
+                    kept.append(line)
+                    end = entry["offset"] + entry["length"]
+        if dropped:
+            with open(self.index_path, 'w') as index_file:
+                index_file.writelines(kept)
+        if size > end:
+            with open(self.path, 'r+b') as data_file:
+                data_file.truncate(end)
+
+    def _add_row(self, entry):
+        row = len(self._ids)
+        self._ids.append(entry["id"])
+        self._rows[entry["id"]] = row
+        self._offsets.append(entry["offset"])
+        self._lengths.append(entry["length"])
+        for player in {entry["white"], entry["black"]}:
+            self._by_player.setdefault(player, array('I')).append(row)
+        self._by_date.setdefault(entry["date"], array('I')).append(row)
+
+    def add(self, game):
+        """Append a finished game to the archive and keep it hot"""
+        record = game.to_record()
+        data = gzip.compress((json.dumps(record, separators=(',', ':')) + "\n").encode())
+        with self._lock:
+            if game.id in self._rows:
+                return
+            self._open()
+            offset = self._writer.tell()
+            self._writer.write(data)
+            self._writer.flush()
+            entry = {"id": game.id, "offset": offset, "length": len(data),
+                     "white": game.white_player, "black": game.black_player,
+                     "date": datetime.fromtimestamp(game.start_time).strftime('%Y-%m-%d')}
+            self._index_writer.write(json.dumps(entry) + "\n")
+            self._index_writer.flush()
+            self._add_row(entry)
+            self._keep_hot(game)
+
+    def get(self, game_id):
+        """Return an archived game from the LRU or disk, or None"""
+        with self._lock:
+            game = self._hot.get(game_id)
+            if game is not None:
+                self._hot.move_to_end(game_id)
+                self.hot_hits += 1
+                return game
+
+            row = self._rows.get(game_id)
+            if row is None:
+                return None
+            self._open()
+            self._reader.seek(self._offsets[row])
+            data = self._reader.read(self._lengths[row])
+            self.disk_reads += 1
+            game = ChessGame.from_record(json.loads(gzip.decompress(data)))
+            self._keep_hot(game)
+            return game
+
+    def _keep_hot(self, game):
+        self._hot[game.id] = game
+        self._hot.move_to_end(game.id)
+        while len(self._hot) > self.hot_size:
+            self._hot.popitem(last=False)
+
+    def find(self, player=None, date=None, limit=50, offset=0):
+        """IDs of archived games, newest first, optionally filtered by player and/or date (YYYY-MM-DD)"""
+        with self._lock:
+            rows = None
+            if player is not None:
+                rows = set(self._by_player.get(player, ()))
+            if date is not None:
+                dated = set(self._by_date.get(date, ()))
+                rows = dated if rows is None else rows & dated
+            if rows is None:
+                newest = len(self._ids) - 1 - offset
+                ordered = range(newest, max(-1, newest - limit), -1)
+            else:
+                ordered = sorted(rows, reverse=True)[offset:offset + limit]
+            return [self._ids[row] for row in ordered]
+
+    def count(self):
+        return len(self._ids)
+
+    def __contains__(self, game_id):
+        return game_id in self._rows
+
+    def stats(self):
+        """Archive size and LRU hit counters"""
+        with self._lock:
+            return {
+                "path": self.path,
+                "archived_games": len(self._ids),
+                "archive_bytes": self._writer.tell() if self._writer else
+                (os.path.getsize(self.path) if os.path.exists(self.path) else 0),
+                "hot_games": len(self._hot),
+                "hot_size": self.hot_size,
+                "hot_hits": self.hot_hits,
+                "disk_reads": self.disk_reads,
+                "players": len(self._by_player),
+            }
+
+    def close(self):
+        with self._lock:
+            for open_file in (self._writer, self._reader, self._index_writer):
+                if open_file:
+                    open_file.close()
+            self._writer = self._reader = self._index_writer = None
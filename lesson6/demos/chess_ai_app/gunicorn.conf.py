@@ -0,0 +1,26 @@
+"""
+Gunicorn settings for running Chess LLM Arena on several worker processes
+
+    pip install gunicorn
+    gunicorn main:app
+
+Workers share games, moves, ratings and tournaments through the SQLite store
+and split the running games between them with leases (leases.py), so any
+worker can answer any request. Each worker imports main.py itself: the
+scheduler's event loop, the SQLite writer and the lease keeper are threads,
+and threads don't survive a fork, so the app must not be preloaded.
+"""
+import multiprocessing
+import os
+
+# Every worker must see the same games; the gzip archive is single-process only
+os.environ.setdefault("CHESS_STORAGE", "sqlite")
+if os.environ["CHESS_STORAGE"] != "sqlite":
+    raise SystemExit("Several workers need CHESS_STORAGE=sqlite")
+
+bind = os.getenv("CHESS_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = int(os.getenv("CHESS_WORKER_THREADS", "16"))  # every open /events stream holds a thread
+preload_app = False
+graceful_timeout = 10  # workers hand their games back on the way out
@@ -0,0 +1,108 @@
+"""
+Game Leases for Chess LLM Arena
+
+Lets several worker processes (e.g. gunicorn workers) share one SQLite store
+without playing the same game twice. Every running game has a lease row
+naming the worker that plays it and when the lease runs out. Each worker's
+LeaseKeeper renews its leases every ttl/3 seconds. A worker that dies or
+hangs stops renewing, and once its leases expire, the first other worker to
+notice claims those games, replays them from their saved moves and plays
+on. If a worker finds it lost a lease (it stalled past the ttl), it stops
+playing that game and leaves it to the new owner.
+"""
+import atexit
+import os
+import socket
+import threading
+
+
+class LeaseKeeper:
+    def __init__(self, store, ttl=15, worker_id=None, adopt=None, lost=None, on_beat=None):
+        self.store = store
+        self.ttl = ttl
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.adopt = adopt  # adopt(game_id) -> True if the game is now running here
+        self.lost = lost  # lost(game_id): another worker took the game over
+        self.on_beat = on_beat  # called after every renewal, e.g. to pull shared state
+
+        self._owned = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Counters exposed through stats()
+        self.beats = 0
+        self.adopted = 0
+        self.lost_games = 0
+
+    def claim(self, game_id):
+        """Take a game; False if another worker holds a live lease on it"""
+        if not self.store.claim(game_id, self.worker_id, self.ttl):
+            return False
+        with self._lock:
+            self._owned.add(game_id)
+        return True
+
+    def release(self, game_id):
+        """Forget a finished game (its lease row is deleted when the game is stored)"""
+        with self._lock:
+            self._owned.discard(game_id)
+
+    def start(self):
+        """Start renewing and adopting in the background (once per process)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="lease-keeper", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Stop renewing and hand every game back so other workers pick them up at once"""
+        self._stop.set()
+        self.store.release_all(self.worker_id)
+
+    def _run(self):
+        while True:
+            try:
+                self.beat()
+            except Exception as e:
+                print(f"Lease renewal failed: {e}")
+            if self._stop.wait(self.ttl / 3):
+                return
+
+    def beat(self):
+        """Renew our leases, drop games we lost and adopt games nobody is playing"""
+        with self._lock:
+            expected = set(self._owned)
+        held = self.store.renew(self.worker_id, self.ttl)
+        for game_id in expected - held:
+            with self._lock:
+                if game_id not in self._owned:
+                    continue  # finished in the meantime
+                self._owned.discard(game_id)
+                self.lost_games += 1
+            print(f"⚠️ Lost the lease on game {game_id[:8]}")
+            if self.lost:
+                self.lost(game_id)
+
+        for game_id in self.store.orphans():
+            if self.claim(game_id):
+                if self.adopt and self.adopt(game_id):
+                    self.adopted += 1
+                else:
+                    self.release(game_id)
+        self.beats += 1
+        if self.on_beat:
+            self.on_beat()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "worker": self.worker_id,
+                "ttl_s": self.ttl,
+                "games_held": len(self._owned),
+                "beats": self.beats,
+                "adopted": self.adopted,
+                "lost": self.lost_games,
+            }
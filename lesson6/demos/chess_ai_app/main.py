@@ -1,16 +1,37 @@
-from flask import Flask, request, jsonify, render_template_string, send_file, redirect, url_for
+from flask import Flask, request, jsonify, render_template, send_file, redirect, url_for, Response
 from markupsafe import Markup
 from openai import AzureOpenAI
 import os
 import dotenv
 import chess
 import chess.pgn
+import hashlib
 import json
-import threading
+import math
+import re
+import asyncio
 import time
 import requests
 import uuid
 from datetime import datetime
+from scheduler import GameScheduler
+from move_batcher import MoveBatcher
+from move_cache import MoveCache
+from opening_book import OpeningBook
+from chess_game import ChessGame
+from game_archive import GameArchive
+from storage_sqlite import SQLiteStore
+from leases import LeaseKeeper
+from events import EventBus
+from fragment_cache import FragmentCache
+from ratings import RatingEngine
+from tournament import Tournament
+from rate_limiter import RateLimiter, estimate_tokens, INTERACTIVE, GAME, BACKGROUND
+from resilience import MovePolicy, MoveMetrics, Unavailable
+from prompts import PERSONALITIES, DEFAULT_PERSONALITY, PromptBuilder, pick_move
+from move_stream import MoveStreamer
+from engine import Engine, engine_budget
+from ponder import Ponderer
 
 # Load environment variables
 dotenv.load_dotenv()
@@ -20,6 +41,46 @@ AOAI_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 TTS_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT_BSMP24")
 TTS_KEY = os.getenv("AZURE_OPENAI_API_KEY_BSMP24")
 MODEL_NAME = "gpt-35-turbo"
+LLM_TEMPERATURE = 0.7
+MAX_INFLIGHT_LLM_CALLS = int(os.getenv("CHESS_MAX_INFLIGHT_CALLS", "8"))
+AOAI_RPM = int(os.getenv("CHESS_AOAI_RPM", "0"))  # deployment's requests-per-minute quota; 0 = no limit
+AOAI_TPM = int(os.getenv("CHESS_AOAI_TPM", "0"))  # deployment's tokens-per-minute quota; 0 = no limit
+AOAI_MAX_CONCURRENCY = int(os.getenv("CHESS_AOAI_MAX_CONCURRENCY", str(MAX_INFLIGHT_LLM_CALLS + 2)))
+MOVE_RETRIES = int(os.getenv("CHESS_MOVE_RETRIES", "2"))  # extra attempts after an error or illegal reply
+MOVE_DEADLINE = float(os.getenv("CHESS_MOVE_DEADLINE", "20"))  # seconds per move across retries and hedges
+HEDGE_PERCENTILE = float(os.getenv("CHESS_HEDGE_PERCENTILE", "0.95"))  # hedge calls slower than this; 0 disables
+BREAKER_FAILURES = int(os.getenv("CHESS_BREAKER_FAILURES", "5"))  # failures in a row that open the circuit
+BREAKER_RESET = float(os.getenv("CHESS_BREAKER_RESET", "30"))  # seconds before a probe call is let through
+PROMPT_ENCODING = os.getenv("CHESS_PROMPT_ENCODING", "san")  # san, uci or full (the original verbose prompt)
+PROMPT_TOKEN_BUDGET = int(os.getenv("CHESS_PROMPT_TOKEN_BUDGET", "250"))  # trim prompts above this; 0 = no budget
+PROMPT_OMIT_LEGAL_AFTER = int(os.getenv("CHESS_PROMPT_OMIT_LEGAL_AFTER", "20"))  # legal replies in a row before dropping the move list; 0 = never
+MOVE_CANDIDATES = int(os.getenv("CHESS_MOVE_CANDIDATES", "1"))  # candidate replies per move request (the API's n)
+STREAM_MOVES = os.getenv("CHESS_STREAM_MOVES", "0") == "1"  # stream move replies and stop reading at the move
+ENGINE_MOVE_MS = int(os.getenv("CHESS_ENGINE_MOVE_MS", "200"))  # search time per move for "Engine" and for fallbacks
+PONDER = os.getenv("CHESS_PONDER", "0") == "1"  # ask for the opponent's reply to the predicted move in advance
+PONDER_PREDICT_MS = int(os.getenv("CHESS_PONDER_PREDICT_MS", "50"))  # engine search time for that prediction
+MOVE_DELAY = float(os.getenv("CHESS_MOVE_DELAY", "1"))
+LOG_MOVES = os.getenv("CHESS_LOG_MOVES", "1") == "1"
+BATCH_WINDOW_MS = int(os.getenv("CHESS_BATCH_WINDOW_MS", "0"))  # 0 disables cross-game batching
+BATCH_MAX_GAMES = int(os.getenv("CHESS_BATCH_MAX_GAMES", "16"))
+MOVE_CACHE_SIZE = int(os.getenv("CHESS_MOVE_CACHE_SIZE", "10000"))  # 0 disables the move cache
+MOVE_CACHE_TTL = int(os.getenv("CHESS_MOVE_CACHE_TTL", "86400"))
+MOVE_CACHE_PATH = os.getenv("CHESS_MOVE_CACHE_PATH")  # e.g. move_cache.db to keep the cache across restarts
+OPENING_BOOK_PATH = os.getenv("CHESS_OPENING_BOOK",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin"))
+ARCHIVE_PATH = os.getenv("CHESS_ARCHIVE_PATH",  # "" keeps finished games in memory
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), "game_archive.jsonl.gz"))
+ARCHIVE_HOT_GAMES = int(os.getenv("CHESS_ARCHIVE_HOT_GAMES", "100"))
+STORAGE = os.getenv("CHESS_STORAGE", "archive")  # archive = finished games in the gzip archive, sqlite = everything in SQLite
+SQLITE_PATH = os.getenv("CHESS_SQLITE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "arena.db"))
+SQLITE_COMMIT_MS = int(os.getenv("CHESS_SQLITE_COMMIT_MS", "50"))  # group commit interval for SQLite writes
+LEASE_SECONDS = float(os.getenv("CHESS_LEASE_SECONDS", "15"))  # a stopped worker's games move elsewhere after this
+BOARD_RENDER = os.getenv("CHESS_BOARD_RENDER", "client")  # client = browsers draw boards from the FEN, server = HTML boards
+HOME_PAGE_SIZE = int(os.getenv("CHESS_HOME_PAGE_SIZE", "24"))  # game cards per home page
+RATING_SYSTEM = os.getenv("CHESS_RATING_SYSTEM", "elo")  # elo or glicko2
+ELO_K_FACTOR = float(os.getenv("CHESS_ELO_K", "32"))
+LEADERBOARD_SIZE = int(os.getenv("CHESS_LEADERBOARD_SIZE", "20"))  # players shown on the home page
+TOURNAMENT_MAX_GAMES = int(os.getenv("CHESS_TOURNAMENT_MAX_GAMES", "16"))  # games running at once per tournament
 
 app = Flask(__name__)
 
@@ -27,13 +88,59 @@ openai_client = AzureOpenAI(
     api_key=AOAI_KEY,
     azure_endpoint=AOAI_ENDPOINT,
     api_version="2024-05-01-preview",
+    max_retries=0,  # llm_limiter retries, so it sees every 429
 )
 
+# Every model call waits here for quota and a concurrency slot; interactive calls go first
+llm_limiter = RateLimiter(rpm=AOAI_RPM, tpm=AOAI_TPM, max_concurrency=AOAI_MAX_CONCURRENCY)
+
+# Retries, hedging, circuit breaker and deadline for move calls, and where each move came from
+move_policy = MovePolicy(retries=MOVE_RETRIES, deadline=MOVE_DEADLINE, hedge_percentile=HEDGE_PERCENTILE,
+                         failure_threshold=BREAKER_FAILURES, reset_timeout=BREAKER_RESET,
+                         max_workers=2 * MAX_INFLIGHT_LLM_CALLS)
+move_metrics = MoveMetrics()
+
+# Compact move prompts with a per-player static prefix, counted against a token budget
+prompt_builder = PromptBuilder(encoding=PROMPT_ENCODING, token_budget=PROMPT_TOKEN_BUDGET,
+                               omit_after=PROMPT_OMIT_LEGAL_AFTER)
+
+# Reads streamed move replies only as far as the move and measures what that saves
+move_streamer = MoveStreamer() if STREAM_MOVES else None
+
+# Alpha-beta search that plays as "Engine" / "Engine-<ms>ms" and stands in when the model gives no move
+engine = Engine(time_limit=ENGINE_MOVE_MS / 1000)
+
 # Global game state
 games = {}
 tournaments = {}
-leaderboard = {}
-active_games = []
+
+# All games run as coroutines on one event loop with a bounded number of LLM calls in flight
+scheduler = GameScheduler(max_inflight=MAX_INFLIGHT_LLM_CALLS)
+
+# Moves the model already chose, so repeated positions skip the network call
+move_cache = MoveCache(max_entries=MOVE_CACHE_SIZE, ttl=MOVE_CACHE_TTL,
+                       path=MOVE_CACHE_PATH) if MOVE_CACHE_SIZE > 0 else None
+
+# Memory-mapped opening book answers the first moves of a game (build it with opening_book.py)
+opening_book = OpeningBook(OPENING_BOOK_PATH) if OPENING_BOOK_PATH and os.path.exists(OPENING_BOOK_PATH) else None
+
+# Games, moves, tournaments and ratings in SQLite, written in batches by one background thread
+game_store = SQLiteStore(SQLITE_PATH, commit_interval_ms=SQLITE_COMMIT_MS,
+                         hot_size=ARCHIVE_HOT_GAMES) if STORAGE == "sqlite" else None
+
+# Finished games leave `games` for an on-disk archive with a small hot LRU in front
+game_archive = game_store or (GameArchive(ARCHIVE_PATH, hot_size=ARCHIVE_HOT_GAMES) if ARCHIVE_PATH else None)
+
+# Moves, results and leaderboard changes pushed to browsers over /events
+events = EventBus()
+
+# Ratings and win/loss records, updated atomically per game and kept in rank order
+ratings = RatingEngine(system=RATING_SYSTEM, k_factor=ELO_K_FACTOR)
+if game_store:
+    game_store.pull_ratings(ratings)
+
+# Rendered game cards, so a page view only rebuilds boards that moved since the last one
+card_cache = FragmentCache()
 
 # Demo game data - Famous game: Morphy vs Count Isouard and Duke of Brunswick (1858)
 DEMO_GAME = {
@@ -83,150 +190,376 @@ DEMO_GAME = {
     "end_time": "2024-01-15 10:02:40"
 }
 
+def update_ratings(update):
+    """Run update() on `ratings`; with SQLite it runs against the table every worker shares"""
+    return game_store.update_ratings(ratings, update) if game_store else update()
+
+def pull_shared_ratings():
+    """Load rating changes from other workers and tell this worker's browsers about them"""
+    before = ratings.version
+    if game_store.pull_ratings(ratings):
+        events.publish('leaderboard', ratings.changed_since(before)[1])
+
 # Initialize demo game in leaderboard
 def initialize_demo_leaderboard():
     """Add demo game results to leaderboard"""
-    if "GPT-Morphy" not in leaderboard:
-        leaderboard["GPT-Morphy"] = {"wins": 1, "losses": 0, "draws": 0, "games": 1}
-    if "GPT-Duke" not in leaderboard:
-        leaderboard["GPT-Duke"] = {"wins": 0, "losses": 1, "draws": 0, "games": 1}
+    def record_demo_game():
+        if "GPT-Morphy" not in ratings and "GPT-Duke" not in ratings:
+            ratings.record_game("GPT-Morphy", "GPT-Duke", 1)
+    update_ratings(record_demo_game)
 
 # Initialize demo data
 initialize_demo_leaderboard()
 
-class ChessGame:
-    def __init__(self, game_id, white_player, black_player):
-        self.id = game_id
-        self.board = chess.Board()
-        self.white_player = white_player
-        self.black_player = black_player
-        self.moves = []
-        self.status = "active"
-        self.result = None
-        self.start_time = datetime.now()
-        self.current_turn = "white"
-        
-    def make_move(self, move_str):
-        try:
-            move = chess.Move.from_uci(move_str)
-            if move in self.board.legal_moves:
-                self.board.push(move)
-                self.moves.append(move_str)
-                self.current_turn = "black" if self.current_turn == "white" else "white"
-                
-                # Check game status
-                if self.board.is_checkmate():
-                    self.status = "finished"
-                    self.result = "white" if self.board.turn == chess.BLACK else "black"
-                elif self.board.is_stalemate() or self.board.is_insufficient_material():
-                    self.status = "finished"
-                    self.result = "draw"
-                    
-                return True
-            return False
-        except:
-            return False
-    
-    def get_fen(self):
-        return self.board.fen()
-    
-    def get_legal_moves(self):
-        return [move.uci() for move in self.board.legal_moves]
-
-def get_llm_move(game, player_name):
-    """Get a chess move from the LLM"""
-    board_fen = game.get_fen()
+def get_llm_move(game, player_name, cancelled=None):
+    """Get a chess move from the LLM; with `cancelled` (an Event) it is a speculative request that may be called off"""
     legal_moves = game.get_legal_moves()
+    attempts = []
+    def ask(timeout):
+        deadline_at = time.monotonic() + timeout
+        # A retry (or hedge) always lists the legal moves, in case leaving them out caused the miss
+        prompt = prompt_builder.build(player_name, game.board, retry=bool(attempts))
+        first_try = not attempts
+        attempts.append(prompt)
+        def create(**options):
+            return openai_client.chat.completions.create(
+                model=MODEL_NAME,
+                messages=prompt.messages,
+                max_tokens=20,
+                n=MOVE_CANDIDATES,
+                temperature=LLM_TEMPERATURE,
+                timeout=max(0.1, deadline_at - time.monotonic()),  # what the limiter's wait left over
+                **options
+            )
+        # The limiter waits out 429s; errors and illegal replies are retried by move_policy
+        tokens = prompt.tokens + 20 * MOVE_CANDIDATES
+        priority = GAME if cancelled is None else BACKGROUND
+        if move_streamer:
+            # Read the stream inside the limiter so it counts as in flight until it is closed
+            replies = llm_limiter.call(lambda: move_streamer.read(create(stream=True), game.board, MOVE_CANDIDATES,
+                                                                  cancelled),
+                                       tokens=tokens, priority=priority, retry_errors=False, timeout=timeout)
+        else:
+            response = llm_limiter.call(create, tokens=tokens, priority=priority, retry_errors=False,
+                                        timeout=timeout)
+            replies = [choice.message.content for choice in sorted(response.choices, key=lambda choice: choice.index)]
+        if cancelled is not None and cancelled.is_set():
+            return None  # a stream cut off mid-reply says nothing about the model
+        # Several candidates cost one round trip; the first legal one is played
+        move, candidate, near_miss = pick_move(game.board, replies)
+        prompt_builder.record(player_name, move is not None)
+        move_metrics.record_reply(player_name, move is not None, first_try, candidate, near_miss)
+        return move or (replies[0] or "").strip()
     
-    # Different AI personalities
-    personalities = {
-        "GPT-Aggressive": "I play aggressively, looking for tactical opportunities and attacks.",
-        "GPT-Defensive": "I prioritize piece safety and solid positional play.",
-        "GPT-Balanced": "I balance tactical and positional considerations."
-    }
-    
-    personality = personalities.get(player_name, "I play solid, strategic chess.")
-    
-    prompt = f"""You are playing chess as {player_name}. {personality}
+    try:
+        move = move_policy.run(ask, validate=lambda move: move in legal_moves, deployment=MODEL_NAME,
+                               cancelled=cancelled)
+        remember_move(game, player_name, move)
+        if cancelled is None:
+            move_metrics.record("model")  # a pondered move is counted when it is played
+        return move
+    except Unavailable as e:
+        if cancelled is not None:
+            return None  # the game asks again on its turn
+        # Keep the game going, but count it so the engine's play never passes for the model's
+        print(f"No model move for {player_name} ({e}), playing the engine's move")
+        move_metrics.record("fallback", e.reason)
+        return engine.choose(game.board)
+
+def predict_move(board, time_limit):
+    """The engine's guess at the move about to be played, for pondering"""
+    return engine.choose(board, time_limit)
+
+def get_engine_move(game, time_limit):
+    """Search the position for `time_limit` seconds"""
+    move = engine.choose(game.board, time_limit)
+    move_metrics.record("engine")
+    return move
+
+def move_cache_key(game, player_name):
+    return MoveCache.make_key(game.get_fen(), player_name, MODEL_NAME, LLM_TEMPERATURE)
+
+def get_known_move(game, player_name):
+    """Answer from the opening book or move cache without calling the model, or return None"""
+    if opening_book:
+        move = opening_book.choose(game.board)
+        if move:
+            move_metrics.record("book")
+            return move
     
-Current board position (FEN): {board_fen}
-Legal moves available: {', '.join(legal_moves)}
+    # A cached move in a position this game has already seen would replay the same cycle forever
+    if move_cache and not game.is_repeated_position():
+        move = move_cache.get(move_cache_key(game, player_name))
+        if move and move in game.get_legal_moves():
+            move_metrics.record("cache")
+            return move
+    return None
 
-You are playing as {'White' if game.current_turn == 'white' else 'Black'}.
+def remember_move(game, player_name, move):
+    """Cache a legal move chosen by the model"""
+    if move_cache:
+        move_cache.put(move_cache_key(game, player_name), move)
 
-Please respond with ONLY the move in UCI format (e.g., e2e4, g1f3, etc.).
-Choose a good strategic move from the legal moves list.
-Do not include any explanation, just the move."""
+BATCH_ANSWER_RE = re.compile(r"^\s*(\d+)\s*[:.)-]\s*([a-h][1-8][a-h][1-8][qrbn]?)", re.MULTILINE)
 
+def get_llm_moves_batch(requests_batch):
+    """Ask the LLM for moves in several games with one multi-position prompt"""
+    sections = []
+    legal_by_position = []
+    for number, (game, player_name) in enumerate(requests_batch, 1):
+        legal_moves = game.get_legal_moves()
+        legal_by_position.append(legal_moves)
+        personality = PERSONALITIES.get(player_name, DEFAULT_PERSONALITY)
+        sections.append(f"""Position {number}: you are {player_name}, playing as {'White' if game.current_turn == 'white' else 'Black'}. {personality}
+FEN: {game.get_fen()}
+Legal moves: {', '.join(legal_moves)}""")
+    
+    prompt = f"""You are playing {len(requests_batch)} independent chess games at once.
+For each numbered position, choose a good strategic move from its legal moves list.
+
+{chr(10).join(sections)}
+
+Respond with exactly one line per position in the form "<position number>: <UCI move>" (e.g., 1: e2e4).
+Do not include any explanation."""
+    
+    moves = [None] * len(requests_batch)
+    messages = [
+        {"role": "system", "content": "You are a chess grandmaster. Always respond with only valid UCI moves."},
+        {"role": "user", "content": prompt}
+    ]
+    max_tokens = 12 * len(requests_batch) + 10
     try:
-        response = openai_client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": "You are a chess grandmaster. Always respond with only a valid UCI move."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=20,
-            temperature=0.7
-        )
-        
-        move = response.choices[0].message.content.strip()
-        
-        # Validate the move
-        if move in legal_moves:
-            return move
-        else:
-            # If invalid, pick a random legal move
-            import random
-            return random.choice(legal_moves)
-            
+        response = llm_limiter.call(
+            lambda: openai_client.chat.completions.create(
+                model=MODEL_NAME,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=LLM_TEMPERATURE
+            ),
+            tokens=estimate_tokens(messages, max_tokens), priority=GAME)
+        
+        # Keep only answers that are legal in their own position
+        for number, move in BATCH_ANSWER_RE.findall(response.choices[0].message.content):
+            index = int(number) - 1
+            if 0 <= index < len(moves) and move in legal_by_position[index]:
+                moves[index] = move
+                remember_move(*requests_batch[index], move)
+                move_metrics.record("model")
     except Exception as e:
-        print(f"Error getting LLM move: {e}")
-        # Return a random legal move as fallback
-        import random
-        return random.choice(legal_moves)
+        print(f"Error getting batched LLM moves: {e}")
+    
+    return moves
 
-def play_game_auto(game_id):
-    """Auto-play a game between two LLMs"""
+# Share one request between games waiting on the model at the same time
+move_batcher = MoveBatcher(scheduler, get_llm_moves_batch,
+                           window=BATCH_WINDOW_MS / 1000,
+                           max_batch=BATCH_MAX_GAMES) if BATCH_WINDOW_MS > 0 else None
+
+# While one model thinks, its opponent is asked for the reply to the engine's guess at its move
+ponderer = Ponderer(scheduler, predict_move, get_llm_move, predict_ms=PONDER_PREDICT_MS) if PONDER else None
+
+async def play_game_async(game_id):
+    """Auto-play a game on the scheduler's event loop"""
     game = games[game_id]
+    ponder = None  # the opponent's request for the predicted reply to the move being asked for
+    published_at = 0.0
     
-    while game.status == "active":
+    # The loop also stops if another worker has taken the game over
+    while game.status == "active" and games.get(game_id) is game:
         current_player = game.white_player if game.current_turn == "white" else game.black_player
-        
-        # Get move from LLM
-        move = get_llm_move(game, current_player)
-        
-        # Make the move
+        opponent = game.black_player if game.current_turn == "white" else game.white_player
+        
+        # Wait for a free LLM slot instead of blocking a thread per game
+        move = get_known_move(game, current_player)
+        if ponder:
+            # This player's request went out during the last move; it is kept if the engine guessed that move
+            if move is None:
+                move = await ponderer.collect(ponder, game)
+                if move:
+                    move_metrics.record("model")
+            else:
+                ponderer.cancel(ponder)
+            ponder = None
+        time_limit = engine_budget(current_player, engine.time_limit)
+        if move is None and time_limit is not None:
+            # The engine needs no LLM slot, only a thread to keep the search off the event loop
+            move = await asyncio.to_thread(get_engine_move, game, time_limit)
+        if move is None and ponderer and engine_budget(opponent, engine.time_limit) is None:
+            ponder = ponderer.start(game, opponent)
+        if move is None and move_batcher:
+            move = await move_batcher.request(game, current_player)
+        if move is None:
+            move = await scheduler.call(get_llm_move, game, current_player)
+        
+        # The pause between moves overlaps the next request instead of adding to it
+        await asyncio.sleep(max(0.0, published_at + MOVE_DELAY - time.monotonic()))
         if game.make_move(move):
-            print(f"Game {game_id}: {current_player} played {move}")
-            time.sleep(1)  # Small delay between moves
+            publish_move(game, move)
+            published_at = time.monotonic()
+            if LOG_MOVES:
+                print(f"Game {game_id}: {current_player} played {move}")
         else:
+            # Forfeit, as in simulate.py, so the game is still rated, archived and released
             print(f"Invalid move {move} by {current_player}")
+            game.finish("black" if game.current_turn == "white" else "white", "illegal_move")
             break
     
-    # Update leaderboard
-    if game.result:
-        if game.result == "white":
-            update_leaderboard(game.white_player, "win")
-            update_leaderboard(game.black_player, "loss")
-        elif game.result == "black":
-            update_leaderboard(game.black_player, "win")
-            update_leaderboard(game.white_player, "loss")
-        else:
-            update_leaderboard(game.white_player, "draw")
-            update_leaderboard(game.black_player, "draw")
+    if ponderer:
+        ponderer.game_over(ponder)
+    record_result(game)
+
+async def run_tournament(tournament):
+    """Play a tournament round by round, starting each round as soon as the previous one ends"""
+    slots = asyncio.Semaphore(tournament.max_concurrent_games)
+    
+    async def play_pairing(white, black):
+        async with slots:
+            while True:
+                game = ChessGame(str(uuid.uuid4()), white, black)
+                tournament.games.append(game.id)
+                register_game(game, tournament.id)
+                await asyncio.wrap_future(scheduler.submit(play_game_async, game.id))
+                # A knockout draw is replayed once with colours reversed
+                finished = tournament.record(white, black, game.result or "draw")
+                if game_store:
+                    game_store.save_tournament(tournament)
+                if finished:
+                    return
+                white, black = black, white
+    
+    while True:
+        pairings = tournament.next_round()
+        if not pairings:
+            break
+        print(f"🏆 Tournament {tournament.id[:8]} round {tournament.round}: {len(pairings)} games")
+        if game_store:
+            game_store.save_tournament(tournament)
+        await asyncio.gather(*(play_pairing(white, black) for white, black in pairings))
+    if game_store:
+        game_store.save_tournament(tournament)
+    print(f"🏁 Tournament {tournament.id[:8]} finished: {tournament.standings()[0]['player']} wins")
+
+def owns(game):
+    """False once another worker has taken the game over; nothing about it may be saved or rated here then"""
+    return games.get(game.id) is game
 
-def update_leaderboard(player, result):
-    """Update player stats in leaderboard"""
-    if player not in leaderboard:
-        leaderboard[player] = {"wins": 0, "losses": 0, "draws": 0, "games": 0}
+def record_result(game):
+    """Update the leaderboard once a game has a result and move it to the archive"""
+    if not owns(game) or game.status != "finished":
+        return
+    score = {"white": 1, "black": 0}.get(game.result, 0.5)
+    def rate():
+        return ratings.record_game(game.white_player, game.black_player, score)
     
-    leaderboard[player]["games"] += 1
-    if result == "win":
-        leaderboard[player]["wins"] += 1
-    elif result == "loss":
-        leaderboard[player]["losses"] += 1
+    if game_store:
+        # Stored and rated in one transaction, and only while this worker still holds the lease
+        stored, changed = game_store.finish_game(game, leases.worker_id, ratings, rate)
+        games.pop(game.id, None)
+        leases.release(game.id)
+        if not stored:
+            print(f"⚠️ Game {game.id[:8]} was taken over before it ended here, so it isn't saved or rated")
+            return
     else:
-        leaderboard[player]["draws"] += 1
+        changed = rate()
+        # Archive first so the game is never missing from both places
+        if game_archive:
+            game_archive.add(game)
+            games.pop(game.id, None)
+    
+    events.publish('game_finished', {'id': game.id, 'result': game.result, 'termination': game.termination})
+    events.publish('leaderboard', changed)
+
+def publish_move(game, move):
+    """Save a move and tell connected browsers about it"""
+    if not owns(game):
+        return
+    if game_store:
+        # The lease check in the INSERT also catches a takeover between owns() and the commit
+        game_store.append_move(game.id, game.ply_count, game.packed_moves[-1], leases.worker_id)
+    events.publish('move', {'id': game.id, 'ply': game.ply_count, 'move': move,
+                            'fen': game.get_fen(), 'turn': game.current_turn})
+
+def register_game(game, tournament_id=None):
+    """Track a new game in memory and in the store, and announce it"""
+    games[game.id] = game
+    if game_store:
+        leases.claim(game.id)
+        game_store.start_game(game, tournament_id)
+    publish_game_started(game)
+
+def adopt_game(game_id):
+    """Play on with a game whose worker stopped, or that a restart interrupted"""
+    game = game_store.get_live(game_id)
+    if game is None:
+        return False
+    games[game_id] = game
+    print(f"♻️ Resuming game {game_id[:8]} at ply {game.ply_count}")
+    scheduler.submit(play_game_async, game_id)
+    return True
+
+def drop_game(game_id):
+    """Another worker took a game over; its play loop stops at the next move"""
+    games.pop(game_id, None)
+
+# With SQLite every running game is leased to one worker process, so several workers can share the store
+leases = LeaseKeeper(game_store, ttl=LEASE_SECONDS, adopt=adopt_game, lost=drop_game,
+                     on_beat=pull_shared_ratings) if game_store else None
+
+@app.before_request
+def sync_worker():
+    """Start the lease keeper on the first request (so only serving processes, not the reloader's parent,
+    play games) and pull ratings other workers changed"""
+    if leases:
+        leases.start()
+        pull_shared_ratings()
+
+def publish_game_started(game):
+    events.publish('game_started', {'id': game.id, 'white_player': game.white_player,
+                                    'black_player': game.black_player})
+
+def find_game(game_id):
+    """Look a game up in memory, then in the archive, then among other workers' running games"""
+    game = games.get(game_id)
+    if game is None and game_archive:
+        game = game_archive.get(game_id)
+    if game is None and game_store:
+        game = game_store.get_live(game_id)
+    return game
+
+def page_of_games(status, page, per_page):
+    """One page of games (active first, then finished newest first) and the total count"""
+    if game_store:
+        return page_of_stored_games(status, page, per_page)
+    in_memory = list(games.values())[::-1]
+    active = [game for game in in_memory if game.status == "active"]
+    finished = [game for game in in_memory if game.status != "active"]
+    archived = game_archive.count() if game_archive else 0
+    if status == "active":
+        in_memory, archived = active, 0
+    elif status == "finished":
+        in_memory = finished
+    else:
+        in_memory = active + finished
+    
+    start = (page - 1) * per_page
+    shown = in_memory[start:start + per_page]
+    if len(shown) < per_page and archived:
+        game_ids = game_archive.find(offset=max(0, start - len(in_memory)), limit=per_page - len(shown))
+        shown += [game for game in map(game_archive.get, game_ids) if game]
+    return shown, len(in_memory) + archived
+
+def page_of_stored_games(status, page, per_page):
+    """page_of_games from the SQLite store, which sees the games of every worker"""
+    sections = [section for section in ("active", "finished") if status in (section, "all")]
+    counts = [game_store.count(section) for section in sections]
+    start = (page - 1) * per_page
+    shown = []
+    for section, count in zip(sections, counts):
+        if len(shown) < per_page and start < count:
+            game_ids = game_store.find(status=section, offset=start, limit=per_page - len(shown))
+            shown += [game for game in map(find_game, game_ids) if game]
+        start = max(0, start - count)
+    return shown, sum(counts)
 
 def generate_commentary(game_data):
     """Generate exciting sports commentary for a chess game"""
@@ -247,16 +580,20 @@ def generate_commentary(game_data):
     Keep it under 200 words and make it sound like a real sports broadcaster covering an epic chess battle!
     """
     
+    messages = [
+        {"role": "system", "content": "You are an enthusiastic sports commentator specializing in chess matches."},
+        {"role": "user", "content": prompt}
+    ]
     try:
-        response = openai_client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": "You are an enthusiastic sports commentator specializing in chess matches."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=200,
-            temperature=0.8
-        )
+        # Someone is waiting on this one, so it jumps ahead of queued game moves
+        response = llm_limiter.call(
+            lambda: openai_client.chat.completions.create(
+                model=MODEL_NAME,
+                messages=messages,
+                max_tokens=200,
+                temperature=0.8
+            ),
+            tokens=estimate_tokens(messages, 200), priority=INTERACTIVE)
         return response.choices[0].message.content
     except Exception as e:
         return f"What an incredible match between {game_data['white_player']} and {game_data['black_player']}! After an intense battle, {game_data['winner']} emerged victorious with brilliant tactical play!"
@@ -291,58 +628,104 @@ def generate_audio_commentary(text, filename="commentary.mp3"):
         print(f"TTS error: {e}")
         return None
 
+PIECE_SYMBOLS = {
+    'K': '♔', 'Q': '♕', 'R': '♖', 'B': '♗', 'N': '♘', 'P': '♙',
+    'k': '♚', 'q': '♛', 'r': '♜', 'b': '♝', 'n': '♞', 'p': '♟'
+}
+
 def render_chess_board(board, highlight_squares=None):
     """Render a chess board as HTML"""
     if highlight_squares is None:
         highlight_squares = []
     
-    pieces = {
-        'P': '♙', 'R': '♖', 'N': '♘', 'B': '♗', 'Q': '♕', 'K': '♔',
-        'p': '♟', 'r': '♜', 'n': '♞', 'b': '♝', 'q': '♛', 'k': '♚'
-    }
-    
-    html = '<table class="chess-board">'
-    
+    pieces = board.piece_map()
+    rows = []
     for rank in range(8):
-        html += '<tr>'
+        cells = []
         for file in range(8):
             square = chess.square(file, 7-rank)
-            piece = board.piece_at(square)
-            piece_symbol = pieces.get(piece.symbol(), '') if piece else ''
+            piece = pieces.get(square)
+            piece_symbol = PIECE_SYMBOLS[piece.symbol()] if piece else ''
             
             square_color = 'light' if (rank + file) % 2 == 0 else 'dark'
             highlight_class = ' highlight' if square in highlight_squares else ''
             
-            html += f'<td class="square {square_color}{highlight_class}">{piece_symbol}</td>'
-        html += '</tr>'
+            cells.append(f'<td class="square {square_color}{highlight_class}">{piece_symbol}</td>')
+        rows.append(f'<tr>{"".join(cells)}</tr>')
     
-    html += '</table>'
-    return Markup(html)
+    return Markup(f'<table class="chess-board">{"".join(rows)}</table>')
 
 def render_board(board):
-    """Render a simple ASCII chess board for main page"""
-    piece_symbols = {
-        'K': '♔', 'Q': '♕', 'R': '♖', 'B': '♗', 'N': '♘', 'P': '♙',
-        'k': '♚', 'q': '♛', 'r': '♜', 'b': '♝', 'n': '♞', 'p': '♟'
-    }
-    
-    board_html = ""
+    """Render a simple ASCII chess board for main page (static/board.js draws the same markup from a FEN)"""
+    pieces = board.piece_map()
+    rows = []
     for rank in range(7, -1, -1):  # Start from rank 8 down to 1
-        board_html += '<div class="board-row">'
+        cells = []
         for file in range(8):
-            square = chess.square(file, rank)
-            piece = board.piece_at(square)
-            piece_char = piece_symbols.get(piece.symbol(), ' ') if piece else '&nbsp;'
+            piece = pieces.get(chess.square(file, rank))
+            piece_char = PIECE_SYMBOLS[piece.symbol()] if piece else '&nbsp;'
             
             # Determine square color
             square_color = "light" if (file + rank) % 2 == 0 else "dark"
             
-            board_html += f'<div class="board-cell {square_color}">{piece_char}</div>'
-        board_html += '</div>'
+            cells.append(f'<div class="board-cell {square_color}">{piece_char}</div>')
+        rows.append(f'<div class="board-row">{"".join(cells)}</div>')
     
-    return Markup(board_html)
+    return Markup("".join(rows))
+
+def render_game_card(game):
+    """HTML for one game card, cached until the game moves; static/live.js patches it in the browser"""
+    return card_cache.get_or_render((game.id, game.ply_count, game.status),
+                                    lambda: Markup(GAME_CARD.render(game=game, render_board=render_board,
+                                                                    board_render=BOARD_RENDER)))
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+static_versions = {}
+
+def static_url(filename):
+    """URL for a static file with a content hash, so it can be cached for a year and still update"""
+    version = static_versions.get(filename)
+    if version is None:
+        with open(os.path.join(STATIC_DIR, filename), 'rb') as static_file:
+            version = static_versions[filename] = hashlib.md5(static_file.read()).hexdigest()[:10]
+    return f"/static/{filename}?v={version}"
+
+app.jinja_env.globals['static_url'] = static_url
+
+@app.after_request
+def cache_versioned_static(response):
+    """Let browsers keep versioned static files; a new version has a new URL"""
+    if request.path.startswith('/static/') and request.args.get('v') and response.status_code == 200:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
 
 # HTML Templates
+GAME_CARD_TEMPLATE = """
+<div class="game-card" data-game-id="{{ game.id }}" data-status="{{ game.status }}">
+    <h3>⚔️ Game {{ game.id[:8] }}</h3>
+    <p><strong>White:</strong> {{ game.white_player }}</p>
+    <p><strong>Black:</strong> {{ game.black_player }}</p>
+    <p><strong>Status:</strong> <span class="js-status status-{{ game.status }}">{{ game.status.upper() }}</span></p>
+    <p><strong>Turn:</strong> <span class="js-turn">{{ game.current_turn.upper() }}</span></p>
+    <p class="js-result-line"{% if not game.result %} style="display: none"{% endif %}><strong>Result:</strong> <span class="js-result">{% if game.result %}{{ game.result.upper() }}{% if game.termination %} ({{ game.termination.replace('_', ' ') }}){% endif %}{% endif %}</span></p>
+    <p><strong>Moves:</strong> <span class="js-ply">{{ game.ply_count }}</span></p>
+    
+    <div class="move-list">
+        {% for move in game.moves[-10:] %}
+        <div>{{ loop.index0 + 1 + (game.ply_count - 10 if game.ply_count > 10 else 0) }}. {{ move }}</div>
+        {% endfor %}
+    </div>
+    
+    {% if board_render == 'client' %}
+    <div class="chess-board" data-fen="{{ game.get_fen() }}" data-last-move="{{ game.last_move or '' }}"></div>
+    {% else %}
+    <div class="chess-board">
+        {{ render_board(game.board)|safe }}
+    </div>
+    {% endif %}
+</div>
+"""
+
 MAIN_HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
@@ -402,6 +785,19 @@ MAIN_HTML_TEMPLATE = """
         .nav a {
             text-decoration: none;
         }
+        .pager {
+            display: flex;
+            justify-content: center;
+            gap: 15px;
+            margin-bottom: 30px;
+        }
+        .pager a {
+            color: white;
+        }
+        .pager a.current {
+            color: #FFD700;
+            font-weight: bold;
+        }
         .game-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
@@ -446,6 +842,8 @@ MAIN_HTML_TEMPLATE = """
         }
         .light { background: #F0D9B5; }
         .dark { background: #B58863; }
+        .light.last-move { background: #F7EC74; }
+        .dark.last-move { background: #DAC34B; }
         .form-group {
             margin-bottom: 15px;
         }
@@ -537,7 +935,6 @@ MAIN_HTML_TEMPLATE = """
             .then(data => {
                 if (data.success) {
                     alert('Game started! Game ID: ' + data.game_id);
-                    refreshPage();
                 } else {
                     alert('Error starting game: ' + data.error);
                 }
@@ -555,17 +952,16 @@ MAIN_HTML_TEMPLATE = """
             .then(response => response.json())
             .then(data => {
                 if (data.success) {
-                    alert('Tournament started! ' + data.games + ' games created');
-                    refreshPage();
+                    alert('Tournament started! ' + (data.rounds ? data.rounds + ' rounds' : 'Knockout until one player is left'));
                 } else {
                     alert('Error starting tournament: ' + data.error);
                 }
             });
         }
-        
-        // Auto-refresh every 5 seconds
-        setInterval(refreshPage, 5000);
     </script>
+    <!-- Moves and results arrive over /events, so there is no timed reload -->
+    <script src="{{ static_url('board.js') }}" defer></script>
+    <script src="{{ static_url('live.js') }}" defer></script>
 </head>
 <body>
     <div class="container">
@@ -581,7 +977,7 @@ MAIN_HTML_TEMPLATE = """
             <a href="/demo_replay"><button>🎬 Demo Replay</button></a>
         </div>
         
-        <div class="game-grid">
+        <div class="game-grid" data-insert-new="{{ 1 if page == 1 and status != 'finished' else 0 }}">
             <div class="game-card">
                 <h3>🎯 Start New Game</h3>
                 <div class="form-group">
@@ -591,6 +987,7 @@ MAIN_HTML_TEMPLATE = """
                         <option value="GPT-Defensive">GPT-Defensive</option>
                         <option value="GPT-Balanced">GPT-Balanced</option>
                         <option value="GPT-Tactical">GPT-Tactical</option>
+                        <option value="Engine">Engine (baseline)</option>
                     </select>
                 </div>
                 <div class="form-group">
@@ -600,6 +997,7 @@ MAIN_HTML_TEMPLATE = """
                         <option value="GPT-Aggressive">GPT-Aggressive</option>
                         <option value="GPT-Balanced">GPT-Balanced</option>
                         <option value="GPT-Tactical">GPT-Tactical</option>
+                        <option value="Engine">Engine (baseline)</option>
                     </select>
                 </div>
                 <button onclick="startNewGame()" style="width: 100%; padding: 15px; background: linear-gradient(45deg, #FF6B6B, #4ECDC4); border: none; border-radius: 10px; color: white; font-weight: bold; cursor: pointer;">
@@ -626,53 +1024,47 @@ MAIN_HTML_TEMPLATE = """
                 <a href="/demo_replay" class="replay-btn">🎥 Watch Full Replay</a>
             </div>
             
-            {% for game_id, game in games.items() %}
-            <div class="game-card">
-                <h3>⚔️ Game {{ game_id[:8] }}</h3>
-                <p><strong>White:</strong> {{ game.white_player }}</p>
-                <p><strong>Black:</strong> {{ game.black_player }}</p>
-                <p><strong>Status:</strong> <span class="status-{{ game.status }}">{{ game.status.upper() }}</span></p>
-                <p><strong>Turn:</strong> {{ game.current_turn.upper() }}</p>
-                {% if game.result %}
-                <p><strong>Result:</strong> {{ game.result.upper() }}</p>
-                {% endif %}
-                <p><strong>Moves:</strong> {{ game.moves|length }}</p>
-                
-                <div class="move-list">
-                    {% for move in game.moves[-10:] %}
-                    <div>{{ loop.index0 + 1 + (game.moves|length - 10 if game.moves|length > 10 else 0) }}. {{ move }}</div>
-                    {% endfor %}
-                </div>
-                
-                <div class="chess-board">
-                    {{ render_board(game.board)|safe }}
-                </div>
-            </div>
+            {% for card in cards %}
+            {{ card }}
             {% endfor %}
         </div>
         
+        <div class="pager">
+            {% for name in ['all', 'active', 'finished'] %}
+            <a href="/?status={{ name }}" class="{{ 'current' if name == status }}">{{ name.title() }}</a>
+            {% endfor %}
+            <span>|</span>
+            {% if page > 1 %}<a href="/?status={{ status }}&page={{ page - 1 }}">← Newer</a>{% endif %}
+            <span>Page {{ page }} of {{ pages }} ({{ total }} games)</span>
+            {% if page < pages %}<a href="/?status={{ status }}&page={{ page + 1 }}">Older →</a>{% endif %}
+        </div>
+        
         <div class="leaderboard">
             <h2>🏆 Leaderboard</h2>
-            <table>
+            <table data-size="{{ leaderboard_size }}">
                 <thead>
                     <tr>
-                        <th>Player</th>
-                        <th>Games</th>
-                        <th>Wins</th>
-                        <th>Losses</th>
-                        <th>Draws</th>
-                        <th>Win Rate</th>
+                        <th data-field="rank">#</th>
+                        <th data-field="player">Player</th>
+                        <th data-field="rating">Rating</th>
+                        <th data-field="games">Games</th>
+                        <th data-field="wins">Wins</th>
+                        <th data-field="losses">Losses</th>
+                        <th data-field="draws">Draws</th>
+                        <th data-field="win_rate">Win Rate</th>
                     </tr>
                 </thead>
                 <tbody>
-                    {% for player, stats in leaderboard.items() %}
-                    <tr>
-                        <td>{{ player }} {% if player == 'GPT-Morphy' or player == 'GPT-Duke' %}<span class="demo-badge">DEMO</span>{% endif %}</td>
-                        <td>{{ stats.games }}</td>
-                        <td>{{ stats.wins }}</td>
-                        <td>{{ stats.losses }}</td>
-                        <td>{{ stats.draws }}</td>
-                        <td>{{ "%.1f%%" % (stats.wins / stats.games * 100 if stats.games > 0 else 0) }}</td>
+                    {% for stats in leaderboard %}
+                    <tr data-player="{{ stats.player }}" data-rating="{{ stats.rating }}">
+                        <td data-field="rank">{{ stats.rank }}</td>
+                        <td data-field="player">{{ stats.player }} {% if stats.player == 'GPT-Morphy' or stats.player == 'GPT-Duke' %}<span class="demo-badge">DEMO</span>{% endif %}</td>
+                        <td data-field="rating">{{ "%.0f" % stats.rating }}</td>
+                        <td data-field="games">{{ stats.games }}</td>
+                        <td data-field="wins">{{ stats.wins }}</td>
+                        <td data-field="losses">{{ stats.losses }}</td>
+                        <td data-field="draws">{{ stats.draws }}</td>
+                        <td data-field="win_rate">{{ "%.1f%%" % (stats.wins / stats.games * 100 if stats.games > 0 else 0) }}</td>
                     </tr>
                     {% endfor %}
                 </tbody>
@@ -1092,14 +1484,29 @@ DEMO_REPLAY_TEMPLATE = """
 </html>
 """
 
+# Compile the templates once instead of on every request
+HOME_TEMPLATE = app.jinja_env.from_string(MAIN_HTML_TEMPLATE)
+GAME_CARD = app.jinja_env.from_string(GAME_CARD_TEMPLATE)
+DEMO_REPLAY = app.jinja_env.from_string(DEMO_REPLAY_TEMPLATE)
+
 # Routes
 @app.route('/')
 def home():
-    return render_template_string(MAIN_HTML_TEMPLATE, 
-                                games=games, 
-                                leaderboard=leaderboard, 
-                                render_board=render_board,
-                                demo_game=DEMO_GAME)
+    status = request.args.get('status', 'all')
+    if status not in ('all', 'active', 'finished'):
+        status = 'all'
+    page = max(1, request.args.get('page', 1, type=int))
+    shown, total = page_of_games(status, page, HOME_PAGE_SIZE)
+    
+    return render_template(HOME_TEMPLATE, 
+                           cards=[render_game_card(game) for game in shown], 
+                           leaderboard=ratings.top(LEADERBOARD_SIZE),
+                           leaderboard_size=LEADERBOARD_SIZE,
+                           demo_game=DEMO_GAME,
+                           status=status,
+                           page=page,
+                           pages=max(1, math.ceil(total / HOME_PAGE_SIZE)),
+                           total=total)
 
 @app.route('/demo_replay')
 def demo_replay():
@@ -1132,11 +1539,11 @@ def demo_replay():
     
     final_board_html = render_chess_board(board)
     
-    return render_template_string(DEMO_REPLAY_TEMPLATE, 
-                                game=DEMO_GAME, 
-                                board_html=final_board_html,
-                                commentary=default_commentary,
-                                audio_file=audio_file)
+    return render_template(DEMO_REPLAY, 
+                           game=DEMO_GAME, 
+                           board_html=final_board_html,
+                           commentary=default_commentary,
+                           audio_file=audio_file)
 
 @app.route('/start_game', methods=['POST'])
 def start_game():
@@ -1147,12 +1554,10 @@ def start_game():
         
         game_id = str(uuid.uuid4())
         game = ChessGame(game_id, white_player, black_player)
-        games[game_id] = game
+        register_game(game)
         
-        # Start the game in a separate thread
-        game_thread = threading.Thread(target=play_game_auto, args=(game_id,))
-        game_thread.daemon = True
-        game_thread.start()
+        # Hand the game to the scheduler instead of starting a thread
+        scheduler.submit(play_game_async, game_id)
         
         return jsonify({'success': True, 'game_id': game_id})
         
@@ -1161,8 +1566,8 @@ def start_game():
 
 @app.route('/game/<game_id>')
 def get_game(game_id):
-    if game_id in games:
-        game = games[game_id]
+    game = find_game(game_id)
+    if game:
         return jsonify({
             'id': game.id,
             'white_player': game.white_player,
@@ -1170,14 +1575,154 @@ def get_game(game_id):
             'status': game.status,
             'current_turn': game.current_turn,
             'result': game.result,
+            'termination': game.termination,
             'moves': game.moves,
             'fen': game.get_fen()
         })
     return jsonify({'error': 'Game not found'}), 404
 
+@app.route('/game/<game_id>/card')
+def get_game_card(game_id):
+    """One game card, fetched by the live page when a game starts"""
+    game = find_game(game_id)
+    if game:
+        return render_game_card(game)
+    return "Game not found", 404
+
+@app.route('/events')
+def stream_events():
+    """Server-Sent Events: moves, game starts/finishes and leaderboard changes"""
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    return Response(events.stream(last_event_id), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/events/stats')
+def get_event_stats():
+    """Connected live clients and published events"""
+    return jsonify(events.stats())
+
+@app.route('/games')
+def list_games():
+    """Search archived games by player and/or date (YYYY-MM-DD), and with SQLite by tournament"""
+    if not game_archive:
+        return jsonify({'enabled': False})
+    limit = min(int(request.args.get('limit', 50)), 500)
+    filters = {'player': request.args.get('player'), 'date': request.args.get('date'), 'limit': limit}
+    if game_store and request.args.get('tournament'):
+        filters['tournament'] = request.args['tournament']
+    game_ids = game_archive.find(**filters)
+    summaries = []
+    for game_id in game_ids:
+        game = game_archive.get(game_id)
+        summaries.append({
+            'id': game.id,
+            'white_player': game.white_player,
+            'black_player': game.black_player,
+            'result': game.result,
+            'termination': game.termination,
+            'plies': game.ply_count,
+            'start_time': datetime.fromtimestamp(game.start_time).isoformat(),
+        })
+    return jsonify(summaries)
+
+@app.route('/leases')
+def get_lease_stats():
+    """This worker's id and the games it holds, has adopted and has lost"""
+    return jsonify(leases.stats() if leases else {'enabled': False})
+
+@app.route('/render_cache')
+def get_render_cache_stats():
+    """Game card fragment cache hit/miss counters"""
+    return jsonify(card_cache.stats())
+
+@app.route('/archive')
+def get_archive_stats():
+    """Archive size and hot LRU counters"""
+    return jsonify(game_archive.stats() if game_archive else {'enabled': False})
+
+def versioned(response, etag):
+    """Tag a leaderboard response and turn a matching If-None-Match into an empty 304"""
+    response.set_etag(etag)
+    response.headers['X-Leaderboard-Version'] = str(ratings.version)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
 @app.route('/leaderboard')
 def get_leaderboard():
-    return jsonify(leaderboard)
+    """Every player's stats; ?since=<version> returns only the players changed after that version"""
+    since = request.args.get('since', type=int)
+    if since is None:
+        version = ratings.version
+        return versioned(jsonify(ratings.leaderboard()), f"leaderboard-{version}")
+    version, players, full = ratings.changed_since(since)
+    return versioned(jsonify({'version': version, 'full': full, 'players': players}),
+                     f"leaderboard-{version}-since-{since}")
+
+@app.route('/leaderboard/top')
+def get_leaderboard_top():
+    """Ranked slice of the leaderboard: ?n=20&offset=0"""
+    n = min(max(1, request.args.get('n', LEADERBOARD_SIZE, type=int)), 1000)
+    offset = max(0, request.args.get('offset', 0, type=int))
+    version = ratings.version
+    return versioned(jsonify({'players': ratings.top(n, offset), 'total': ratings.count(),
+                              'system': ratings.system, 'version': version}),
+                     f"top-{version}-{n}-{offset}")
+
+@app.route('/leaderboard/player/<path:player>')
+def get_player_rating(player):
+    """Rating, rank and rating history of one player"""
+    stats = ratings.get(player)
+    if stats is None:
+        return jsonify({'error': 'Player not found'}), 404
+    return jsonify(stats)
+
+@app.route('/rate_limiter')
+def get_rate_limiter_stats():
+    """Concurrency limit, quota left, 429s and admission waits for model calls"""
+    return jsonify(llm_limiter.stats())
+
+@app.route('/metrics/moves')
+def get_move_metrics():
+    """Where moves came from (model, book, cache, fallback and why) plus retry/hedge/breaker state"""
+    return jsonify(dict(move_metrics.stats(), policy=move_policy.stats()))
+
+@app.route('/prompts')
+def get_prompt_stats():
+    """Prompt encoding, average prompt tokens, omitted move lists and how often replies were legal"""
+    return jsonify(prompt_builder.stats())
+
+@app.route('/streaming')
+def get_streaming_stats():
+    """Streamed move replies: how many were cut short and the tokens and time that saved"""
+    return jsonify(move_streamer.stats() if move_streamer else {'enabled': False})
+
+@app.route('/pondering')
+def get_pondering_stats():
+    """Speculative requests for the opponent's reply: hit rate and the time saved per hit and per game"""
+    return jsonify(ponderer.stats() if ponderer else {'enabled': False})
+
+@app.route('/engine')
+def get_engine_stats():
+    """Searches, average depth, nodes and time per move of the built-in engine"""
+    return jsonify(dict(engine.stats(), move_ms=ENGINE_MOVE_MS))
+
+@app.route('/scheduler')
+def get_scheduler_stats():
+    """Queue depth, in-flight LLM calls and wait times"""
+    stats = scheduler.stats()
+    if move_batcher:
+        stats['batching'] = move_batcher.stats()
+    return jsonify(stats)
+
+@app.route('/move_cache')
+def get_move_cache_stats():
+    """Move cache hit/miss counters"""
+    return jsonify(move_cache.stats() if move_cache else {'enabled': False})
+
+@app.route('/opening_book')
+def get_opening_book_stats():
+    """Opening book size and hit counters"""
+    return jsonify(opening_book.stats() if opening_book else {'enabled': False})
 
 @app.route('/tournament', methods=['POST'])
 def start_tournament():
@@ -1185,39 +1730,37 @@ def start_tournament():
         data = request.get_json()
         players = data.get('players', ['GPT-Aggressive', 'GPT-Defensive', 'GPT-Balanced', 'GPT-Tactical'])
         
-        tournament_id = str(uuid.uuid4())
-        tournament_games = []
-        
-        # Create round-robin tournament
-        for i, white in enumerate(players):
-            for j, black in enumerate(players):
-                if i != j:
-                    game_id = str(uuid.uuid4())
-                    game = ChessGame(game_id, white, black)
-                    games[game_id] = game
-                    tournament_games.append(game_id)
-                    
-                    # Start each game with a small delay
-                    def delayed_start(gid):
-                        time.sleep(i * 2)  # Stagger game starts
-                        play_game_auto(gid)
-                    
-                    game_thread = threading.Thread(target=delayed_start, args=(game_id,))
-                    game_thread.daemon = True
-                    game_thread.start()
+        # Seed by rating; unrated players keep their order after the rated ones
+        seeded = sorted(players, key=lambda player: ratings.rank(player) or len(players) + ratings.count())
+        tournament = Tournament(str(uuid.uuid4()), seeded,
+                                format=data.get('format', 'round_robin'),
+                                rounds=data.get('rounds'),
+                                max_concurrent_games=data.get('max_concurrent_games', TOURNAMENT_MAX_GAMES))
+        tournaments[tournament.id] = tournament
+        if game_store:
+            game_store.save_tournament(tournament)
         
-        tournaments[tournament_id] = {
-            'id': tournament_id,
-            'players': players,
-            'games': tournament_games,
-            'start_time': datetime.now().isoformat()
-        }
+        # Rounds are played one after another on the scheduler, never more than the ceiling at once
+        scheduler.spawn(run_tournament(tournament))
         
-        return jsonify({'success': True, 'tournament_id': tournament_id, 'games': len(tournament_games)})
+        return jsonify({'success': True, 'tournament_id': tournament.id, 'format': tournament.format,
+                        'rounds': tournament.rounds})
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/tournament/<tournament_id>')
+def get_tournament(tournament_id):
+    """Round, pairings and standings of a tournament"""
+    tournament = tournaments.get(tournament_id)
+    if tournament is not None:
+        return jsonify(tournament.to_dict())
+    # Tournaments from before a restart are read back from their last saved state
+    saved = game_store.get_tournament(tournament_id) if game_store else None
+    if saved is None:
+        return jsonify({'error': 'Tournament not found'}), 404
+    return jsonify(saved)
+
 @app.route('/audio/<filename>')
 def serve_audio(filename):
     """Serve audio files"""
@@ -0,0 +1,70 @@
+"""
+Move Batcher for Chess LLM Arena
+
+Collects move requests from many games for a short window (or until the
+batch is full) and sends them to the model as one multi-position request.
+The parsed moves are then handed back to each waiting game. Runs on the
+game scheduler's event loop, and each batch uses a single in-flight slot.
+"""
+import asyncio
+
+
+class MoveBatcher:
+    def __init__(self, scheduler, send_batch, window=0.05, max_batch=16):
+        self.scheduler = scheduler
+        self.send_batch = send_batch  # called with [(game, player_name), ...], returns [move or None, ...]
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = []
+        self._timer = None
+
+        self.batches_sent = 0
+        self.requests_batched = 0
+        self.unanswered = 0
+
+    async def request(self, game, player_name):
+        """Queue a move request and wait for its batch; returns None if the batch had no usable move"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((game, player_name, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._send(batch))
+
+    async def _send(self, batch):
+        try:
+            moves = await self.scheduler.call(self.send_batch, [(game, player) for game, player, _ in batch])
+        except Exception as e:
+            print(f"Error sending move batch: {e}")
+            moves = [None] * len(batch)
+
+        self.batches_sent += 1
+        self.requests_batched += len(batch)
+        for (_, _, future), move in zip(batch, moves):
+            if move is None:
+                self.unanswered += 1
+            if not future.cancelled():
+                future.set_result(move)
+
+    def stats(self):
+        """Batch counts and average batch size"""
+        return {
+            'window_ms': round(self.window * 1000),
+            'max_batch': self.max_batch,
+            'batches_sent': self.batches_sent,
+            'requests_batched': self.requests_batched,
+            'avg_batch_size': round(self.requests_batched / self.batches_sent, 2) if self.batches_sent else 0.0,
+            'unanswered': self.unanswered,
+        }
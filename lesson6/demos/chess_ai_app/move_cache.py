@@ -0,0 +1,90 @@
+"""
+Move Cache for Chess LLM Arena
+
+Remembers the move a player chose in a position so repeated positions skip
+the model call. Entries are keyed on the normalized FEN, player, model and
+temperature bucket, evicted least-recently-used first and expired after a
+TTL. An optional SQLite file keeps the cache across restarts.
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class MoveCache:
+    def __init__(self, max_entries=10000, ttl=86400, path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()  # key -> (move, stored_at)
+        self._lock = threading.Lock()
+        self._db = None
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("CREATE TABLE IF NOT EXISTS move_cache "
+                             "(key TEXT PRIMARY KEY, move TEXT NOT NULL, stored_at REAL NOT NULL)")
+            self._db.execute("DELETE FROM move_cache WHERE stored_at < ?", (time.time() - ttl,))
+
+    @staticmethod
+    def make_key(fen, player_name, model, temperature):
+        """Build a cache key; move counters are dropped so transpositions share an entry"""
+        position = " ".join(fen.split()[:4])
+        return f"{position}|{player_name}|{model}|{round(temperature, 1)}"
+
+    def get(self, key):
+        """Return the cached move for key, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[1] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry:
+                del self._entries[key]
+
+            if self._db:
+                row = self._db.execute("SELECT move, stored_at FROM move_cache WHERE key = ?", (key,)).fetchone()
+                if row and now - row[1] <= self.ttl:
+                    self._remember(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key, move):
+        """Store a move chosen by the model"""
+        now = time.time()
+        with self._lock:
+            self._remember(key, move, now)
+            if self._db:
+                self._db.execute("INSERT OR REPLACE INTO move_cache (key, move, stored_at) VALUES (?, ?, ?)",
+                                 (key, move, now))
+
+    def _remember(self, key, move, stored_at):
+        self._entries[key] = (move, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl,
+            'persistent': self._db is not None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'disk_hits': self.disk_hits,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,152 @@
+"""
+Streamed Move Replies for Chess LLM Arena
+
+With streaming on, a move reply is read chunk by chunk (about one token
+each) instead of waiting for the whole completion. MoveMatcher watches the
+first word. The stream is closed the moment that word spells one legal
+move in UCI or SAN and no other legal move starts the same way. Because of
+that check, "e7e8" waits for its promotion letter and "O-O" waits to see
+whether "-O" follows. A first word that ends without naming a legal move
+closes the stream too, since the reply can no longer be valid. With n
+candidates per request, each choice gets its own matcher. The stream
+closes once some candidate has a legal move and every candidate before it
+has been decided, so the pick is the one pick_move() would make.
+
+What that saves can't be seen directly, because a closed stream never says
+how much more the model would have written. So every `sample_every`-th
+stream is read to the end anyway. Those control streams show how many
+tokens and milliseconds usually follow the move, and the savings of the
+streams that were cut short are estimated from them.
+"""
+import threading
+import time
+
+from prompts import first_word, parse_move
+
+
+class MoveMatcher:
+    def __init__(self, board):
+        self.board = board
+        self.text = ""
+        self._notations = None  # UCI and SAN (with and without +/#) -> UCI, built on the first chunk
+
+    def notations(self):
+        if self._notations is None:
+            self._notations = {}
+            for move in self.board.legal_moves:
+                uci, san = move.uci(), self.board.san(move)
+                self._notations.update({uci: uci, san: uci, san.rstrip("+#"): uci})
+        return self._notations
+
+    def feed(self, delta):
+        """Add a chunk; returns (done, UCI move or None)"""
+        self.text += delta
+        word, complete = first_word(self.text)
+        if not word:
+            return False, None
+        if complete:
+            return True, parse_move(self.board, self.text)
+
+        notations = self.notations()
+        move = notations.get(word)
+        if move is not None and all(uci == move for notation, uci in notations.items()
+                                    if notation.startswith(word)):
+            return True, move
+        return False, None
+
+
+class MoveStreamer:
+    def __init__(self, sample_every=20):
+        self.sample_every = sample_every  # read every n-th stream to the end to measure what cutting saves; 0 = never
+        self._lock = threading.Lock()
+
+        # Counters exposed through stats()
+        self.streams = 0
+        self.cut_short = 0
+        self.tokens_read = 0
+        self.seconds_to_move = 0.0
+        self.controls = 0  # control streams whose move was known before the end
+        self.cancelled = 0  # speculative streams that were called off
+        self.control_tokens_after = 0
+        self.control_seconds_after = 0.0
+
+    def read(self, stream, board, n=1, cancelled=None):
+        """The text read of each of the `n` candidate replies, closing the stream as soon as the move is known
+        (or `cancelled` is set)"""
+        started = time.perf_counter()
+        with self._lock:
+            self.streams += 1
+            control = bool(self.sample_every) and self.streams % self.sample_every == 0
+
+        matchers = [MoveMatcher(board) for _ in range(n)]
+        decided = [False] * n
+        legal = [False] * n
+        tokens = 0
+        found_at = None
+        try:
+            for chunk in stream:
+                if cancelled is not None and cancelled.is_set():
+                    break
+                # Azure sends content filter results in chunks without choices
+                for choice in chunk.choices:
+                    index = choice.index
+                    if index >= n:
+                        continue
+                    delta = choice.delta.content
+                    tokens += bool(delta)
+                    if found_at is not None or decided[index]:
+                        continue
+                    if delta:
+                        decided[index], move = matchers[index].feed(delta)
+                    if choice.finish_reason and not decided[index]:
+                        decided[index], move = True, parse_move(board, matchers[index].text)  # that reply is over
+                    legal[index] = decided[index] and move is not None
+                    if self.settled(decided, legal):
+                        found_at = (time.perf_counter(), tokens)
+                if found_at is not None and not control:
+                    break
+        finally:
+            stream.close()
+        ended = time.perf_counter()
+        cut = found_at is not None and not control
+
+        with self._lock:
+            if cancelled is not None and cancelled.is_set():
+                self.cancelled += 1  # not a sample of how far a move is read
+                return [matcher.text for matcher in matchers]
+            self.tokens_read += found_at[1] if found_at else tokens
+            self.seconds_to_move += (found_at[0] if found_at else ended) - started
+            self.cut_short += cut
+            if control and found_at:
+                self.controls += 1
+                self.control_tokens_after += tokens - found_at[1]
+                self.control_seconds_after += ended - found_at[0]
+        return [matcher.text for matcher in matchers]
+
+    @staticmethod
+    def settled(decided, legal):
+        """True once the first candidate with a legal move is known (or every candidate failed)"""
+        for done, ok in zip(decided, legal):
+            if not done:
+                return False
+            if ok:
+                return True
+        return True
+
+    def stats(self):
+        with self._lock:
+            streams = self.streams - self.cancelled
+            tokens_after = self.control_tokens_after / self.controls if self.controls else None
+            seconds_after = self.control_seconds_after / self.controls if self.controls else None
+            return {
+                "streams": streams,
+                "cancelled": self.cancelled,
+                "cut_short": self.cut_short,
+                "control_streams": self.controls,
+                "avg_tokens_to_move": round(self.tokens_read / streams, 1) if streams else None,
+                "avg_ms_to_move": round(self.seconds_to_move / streams * 1000, 1) if streams else None,
+                "est_tokens_saved_per_move": round(tokens_after * self.cut_short / streams, 1)
+                if tokens_after is not None else None,
+                "est_ms_saved_per_move": round(seconds_after * self.cut_short / streams * 1000, 1)
+                if seconds_after is not None else None,
+            }
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Opening Book for Chess LLM Arena
+
+Builds a Polyglot opening book (16-byte entries sorted by Zobrist hash) from
+PGN files, and answers book positions with a weighted random choice. The
+book file is memory-mapped by python-chess, so lookups cost a binary search
+and no model call.
+
+Build the book offline:
+    python opening_book.py openings.pgn -o opening_book.bin
+"""
+import argparse
+import random
+import struct
+from collections import Counter
+
+import chess
+import chess.pgn
+import chess.polyglot
+
+ENTRY_STRUCT = struct.Struct(">QHHI")  # key, move, weight, learn
+MAX_WEIGHT = 0xFFFF
+
+
+def encode_move(board, move):
+    """Encode a move the Polyglot way (castling is stored as king takes rook)"""
+    to_square = move.to_square
+    if board.is_castling(move):
+        rank = chess.square_rank(move.from_square)
+        to_square = chess.square(7 if board.is_kingside_castling(move) else 0, rank)
+    promotion = move.promotion - 1 if move.promotion else 0
+    return to_square | (move.from_square << 6) | (promotion << 12)
+
+
+def build_book(pgn_paths, out_path, max_ply=16, min_count=1):
+    """Count the moves played in every position of the given PGN files and write a book"""
+    counts = Counter()
+    games_read = 0
+
+    for pgn_path in pgn_paths:
+        with open(pgn_path) as pgn_file:
+            while True:
+                game = chess.pgn.read_game(pgn_file)
+                if game is None:
+                    break
+                if game.errors:
+                    print(f"⚠️  Skipping game with errors in {pgn_path}: {game.errors[0]}")
+                    continue
+                games_read += 1
+
+                board = game.board()
+                for ply, move in enumerate(game.mainline_moves()):
+                    if ply >= max_ply:
+                        break
+                    counts[(chess.polyglot.zobrist_hash(board), encode_move(board, move))] += 1
+                    board.push(move)
+
+    # Polyglot readers binary-search on the key, so entries must be sorted by it
+    entries = sorted(((key, raw_move, min(count, MAX_WEIGHT))
+                      for (key, raw_move), count in counts.items() if count >= min_count),
+                     key=lambda entry: (entry[0], -entry[2]))
+
+    with open(out_path, "wb") as book_file:
+        for key, raw_move, weight in entries:
+            book_file.write(ENTRY_STRUCT.pack(key, raw_move, weight, 0))
+
+    return games_read, len(entries)
+
+
+class OpeningBook:
+    def __init__(self, path, seed=None):
+        self.path = path
+        self._reader = chess.polyglot.open_reader(path)
+        self._random = random.Random(seed)
+        self.lookups = 0
+        self.hits = 0
+
+    def choose(self, board):
+        """Return a weighted random book move in UCI format, or None when out of book"""
+        self.lookups += 1
+        try:
+            entry = self._reader.weighted_choice(board, random=self._random)
+        except IndexError:
+            return None
+        self.hits += 1
+        return entry.move.uci()
+
+    def reseed(self, seed):
+        """Restart the weighted choice from `seed`, e.g. to replay the same openings"""
+        self._random.seed(seed)
+
+    def close(self):
+        self._reader.close()
+
+    def stats(self):
+        """Book size and hit counters"""
+        return {
+            'path': self.path,
+            'entries': len(self._reader),
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'hit_rate': round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build a Polyglot opening book from PGN files')
+    parser.add_argument('pgn', nargs='+', help='PGN files to read')
+    parser.add_argument('-o', '--output', default='opening_book.bin', help='Book file to write')
+    parser.add_argument('--max-ply', type=int, default=16, help='Only record the first N plies of each game')
+    parser.add_argument('--min-count', type=int, default=1, help='Drop moves seen fewer than N times')
+
+    args = parser.parse_args()
+
+    print("📚 Building opening book...")
+    games_read, entries = build_book(args.pgn, args.output, args.max_ply, args.min_count)
+    print(f"✅ Read {games_read} games, wrote {entries} entries to {args.output}")
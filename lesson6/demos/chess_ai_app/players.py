@@ -0,0 +1,95 @@
+"""
+Players for Chess LLM Arena
+
+Small player objects for playing games without the Flask app (prompts come
+from prompts.py, as in the arena). A player's
+choose(board) returns (UCI move, source), where source is "model", "random",
+"engine" or "fallback". Players are named by a spec string:
+
+- random: a uniformly random legal move
+- engine or engine:<ms>: the built-in alpha-beta engine, searching 200 ms (or <ms>) per move
+- llm:<name>: the model, prompted with <name>'s personality (e.g. llm:GPT-Aggressive)
+"""
+import random
+
+from engine import Engine
+from prompts import PromptBuilder, pick_move
+from rate_limiter import GAME
+
+class RandomPlayer:
+    def __init__(self, seed=None):
+        self.name = "random"
+        self._random = random.Random(seed)
+
+    def choose(self, board):
+        return self._random.choice(list(board.legal_moves)).uci(), "random"
+
+
+class EnginePlayer:
+    def __init__(self, time_limit=0.2):
+        self.name = "engine"
+        self.engine = Engine(time_limit=time_limit)
+
+    def choose(self, board):
+        return self.engine.choose(board), "engine"
+
+
+class LLMPlayer:
+    def __init__(self, name, client, model, temperature=0.7, limiter=None, retries=2, fallback=None, prompts=None,
+                 streamer=None, candidates=1):
+        self.name = name
+        self.client = client
+        self.model = model
+        self.temperature = temperature
+        self.limiter = limiter
+        self.retries = retries  # extra attempts after an error or an illegal reply
+        self.fallback = fallback or EnginePlayer()
+        self.prompts = prompts or PromptBuilder()
+        self.streamer = streamer  # a MoveStreamer streams replies and stops reading at the move
+        self.candidates = candidates  # replies per request; the first legal one is played
+        self.first_tries = 0
+        self.legal_first_tries = 0
+
+    def ask(self, prompt, board):
+        """The text of each candidate reply"""
+        def create():
+            options = dict(model=self.model, messages=prompt.messages, max_tokens=20, n=self.candidates,
+                           temperature=self.temperature)
+            if self.streamer:
+                return self.streamer.read(self.client.chat.completions.create(stream=True, **options), board,
+                                          self.candidates)
+            response = self.client.chat.completions.create(**options)
+            return [choice.message.content for choice in sorted(response.choices, key=lambda choice: choice.index)]
+        if self.limiter is None:
+            return create()
+        return self.limiter.call(create, tokens=prompt.tokens + 20 * self.candidates, priority=GAME)
+
+    def choose(self, board):
+        for attempt in range(self.retries + 1):
+            prompt = self.prompts.build(self.name, board, retry=attempt > 0)
+            try:
+                move = pick_move(board, self.ask(prompt, board))[0]
+            except Exception as e:
+                print(f"Error getting LLM move for {self.name}: {e}")
+                continue
+            self.prompts.record(self.name, move is not None)
+            if attempt == 0:
+                self.first_tries += 1
+                self.legal_first_tries += move is not None
+            if move:
+                return move, "model"
+        return self.fallback.choose(board)[0], "fallback"
+
+
+def make_player(spec, seed=None, client=None, model="gpt-35-turbo", limiter=None, prompts=None, streamer=None,
+                candidates=1):
+    """Build a player from its spec; client() is only called for model players"""
+    kind, _, name = spec.partition(":")
+    if kind == "random":
+        return RandomPlayer(seed)
+    if kind == "engine":
+        return EnginePlayer(int(name) / 1000 if name else 0.2)
+    if kind == "llm":
+        return LLMPlayer(name or "GPT-Balanced", client(), model, limiter=limiter, prompts=prompts,
+                         streamer=streamer, candidates=candidates)
+    raise ValueError(f"Unknown player: {spec} (use random, engine[:<ms>] or llm:<name>)")
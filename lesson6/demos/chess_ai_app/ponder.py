@@ -0,0 +1,161 @@
+"""
+Pondering for Chess LLM Arena
+
+A game between two models spends most of its time waiting on one request
+after another. With pondering on, the side to move's most likely move is
+predicted by a short engine search as soon as its request goes out. The
+opponent's request for the position after that move is issued right away,
+so both players think at once.
+
+When the real move arrives, the speculative request is kept if the
+prediction was right. Its move is then ready, or on its way, when the
+opponent's turn starts. Otherwise it is cancelled. A request still queued
+for a slot never starts, and a streamed reply is closed at its next chunk.
+A whole reply already in flight can't be stopped, so its answer is just
+dropped.
+
+Pondering only fills spare capacity. It is skipped while the scheduler has
+calls queued, and its requests wait behind game moves at the rate limiter.
+stats() reports the hit rate and the wall-clock time saved per hit and per
+game.
+"""
+import asyncio
+import threading
+import time
+
+
+class Position:
+    """A game one predicted move ahead, with the parts of ChessGame a move request reads"""
+    __slots__ = ("id", "board")
+
+    def __init__(self, game_id, board):
+        self.id = game_id
+        self.board = board
+
+    def get_fen(self):
+        return self.board.fen()
+
+    def get_legal_moves(self):
+        return [move.uci() for move in self.board.legal_moves]
+
+
+class Ponder:
+    """One speculative request: the predicted move and the opponent's answer to it"""
+    __slots__ = ("move", "task", "cancelled", "started", "finished")
+
+    def __init__(self):
+        self.move = None
+        self.task = None
+        self.cancelled = threading.Event()  # tells a running request to stop
+        self.started = None  # when the request got its slot
+        self.finished = None
+
+
+class Ponderer:
+    def __init__(self, scheduler, predict, request, predict_ms=50):
+        self.scheduler = scheduler
+        self.predict = predict  # (board, seconds) -> the UCI move the side to move most likely plays, or None
+        self.request = request  # (position, player_name, cancelled) -> the player's UCI move, or None
+        self.predict_ms = predict_ms
+        self._lock = threading.Lock()
+
+        # Counters exposed through stats()
+        self.pondered = 0
+        self.skipped = 0  # not started because calls were queued
+        self.hits = 0
+        self.misses = 0
+        self.unused = 0  # the game ended, the move came from the book or cache, or the request gave no move
+        self.cancelled_queued = 0  # cancelled before the request started
+        self.seconds_saved = 0.0
+        self.games = 0
+
+    def start(self, game, opponent):
+        """Predict the side to move's move in `game` and ask `opponent` for the reply in the background"""
+        if self.scheduler.stats()['queue_depth']:
+            with self._lock:
+                self.skipped += 1
+            return None
+        ponder = Ponder()
+        # Copy now: the game's board moves on before the prediction is made
+        board = game.board.copy(stack=False)
+        ponder.task = asyncio.ensure_future(self._run(ponder, game.id, board, opponent))
+        ponder.task.add_done_callback(lambda task: task.cancelled() or task.exception())  # a dropped one may fail
+        with self._lock:
+            self.pondered += 1
+        return ponder
+
+    async def _run(self, ponder, game_id, board, opponent):
+        move = await asyncio.to_thread(self.predict, board, self.predict_ms / 1000)
+        if move is None or ponder.cancelled.is_set():
+            return None
+        ponder.move = move
+        board.push_uci(move)
+        if board.is_game_over():
+            return None  # mate or stalemate: the opponent has nothing to answer
+        return await self.scheduler.call(self._timed, ponder, Position(game_id, board), opponent)
+
+    def _timed(self, ponder, position, opponent):
+        ponder.started = time.monotonic()
+        try:
+            return self.request(position, opponent, ponder.cancelled)
+        finally:
+            ponder.finished = time.monotonic()
+
+    async def collect(self, ponder, game):
+        """The pondered move if `game`'s last move was the predicted one, otherwise None (and it is cancelled)"""
+        if ponder.move != game.last_move:
+            # No prediction (yet) isn't a miss
+            self.cancel(ponder, hit=None if ponder.move is None else False)
+            return None
+        turn_started = time.monotonic()
+        try:
+            move = await ponder.task
+        except Exception as e:
+            print(f"Pondered request failed: {e}")
+            move = None
+        with self._lock:
+            if move is None:
+                self.unused += 1
+                return None
+            self.hits += 1
+            if ponder.started is not None:
+                # What the opponent's request had already done when its turn began
+                self.seconds_saved += max(0.0, min(turn_started, ponder.finished) - ponder.started)
+        return move
+
+    def cancel(self, ponder, hit=None):
+        """Stop a speculative request: a miss (hit=False) or one that is no longer needed (hit=None)"""
+        if ponder is None:
+            return
+        ponder.cancelled.set()
+        queued = ponder.started is None and not ponder.task.done()
+        ponder.task.cancel()
+        with self._lock:
+            if hit is False:
+                self.misses += 1
+            else:
+                self.unused += 1
+            self.cancelled_queued += queued
+
+    def game_over(self, ponder):
+        """Count a finished game and drop its last speculative request"""
+        self.cancel(ponder)
+        with self._lock:
+            self.games += 1
+
+    def stats(self):
+        with self._lock:
+            decided = self.hits + self.misses
+            return {
+                "pondered": self.pondered,
+                "skipped_busy": self.skipped,
+                "hits": self.hits,
+                "misses": self.misses,
+                "unused": self.unused,
+                "cancelled_before_start": self.cancelled_queued,
+                "hit_rate": round(self.hits / decided, 3) if decided else None,
+                "ms_saved_per_hit": round(self.seconds_saved / self.hits * 1000, 1) if self.hits else None,
+                "s_saved": round(self.seconds_saved, 1),
+                "s_saved_per_game": round(self.seconds_saved / self.games, 2) if self.games else None,
+                "games": self.games,
+            }
@@ -0,0 +1,277 @@
+"""
+Move Prompts for Chess LLM Arena
+
+Builds the prompt for every model move, much smaller than the original one:
+
+- Everything that never changes for a player (role, personality, answer
+  format) comes first, in the system message, and is byte-for-byte the same
+  every ply. It is built once per player, and the provider can reuse it as
+  a cached prefix.
+- The user message holds only the position: the FEN and the legal moves.
+- Legal moves are encoded as SAN grouped by piece ("N: c3 f3 xe5; P: a3 d4")
+  instead of a comma-separated UCI list, which roughly halves them.
+- A player whose last answers were all legal gets no legal move list at
+  all. The list comes back on the retry after an illegal answer.
+- Every prompt is counted in tokens (with tiktoken if it is installed,
+  otherwise estimated). A prompt over the token budget drops the
+  personality, then the move list.
+
+Encodings: "san" (default), "uci" (compact prompt, UCI list) and "full" (the
+original verbose prompt, kept as the baseline). parse_move() reads a reply
+in UCI or SAN, and also near misses: "e2-e4", "E2E4", "nf3", "Ng1f3", a
+move number or "Move:" in front, or the move in quotes or bold.
+pick_move() takes the first legal move out of several candidate replies.
+"""
+import functools
+import re
+import threading
+
+import chess
+
+try:
+    import tiktoken
+except ImportError:  # optional; token counts are estimated without it
+    tiktoken = None
+
+ENCODINGS = ("san", "uci", "full")
+
+# Different AI personalities
+PERSONALITIES = {
+    "GPT-Aggressive": "I play aggressively, looking for tactical opportunities and attacks.",
+    "GPT-Defensive": "I prioritize piece safety and solid positional play.",
+    "GPT-Balanced": "I balance tactical and positional considerations."
+}
+DEFAULT_PERSONALITY = "I play solid, strategic chess."
+
+MESSAGE_OVERHEAD = 4  # tokens the chat format adds around every message
+PIECE_ORDER = "KQRBNP"
+UCI_RE = re.compile(r"^([a-h][1-8])[-x]?([a-h][1-8])=?([qrbn])?$")
+PREAMBLE_RE = re.compile(r"^(\d+\.+|[A-Za-z]+:)$")  # "12.", "12..." or "Move:" in front of the move
+WRAPPING = "\"'`*_()[]{}<>"
+# cl100k_base's pre-tokenizer, one token per piece (long words count as several)
+TOKEN_RE = re.compile(r"[^\r\nA-Za-z\d]?[A-Za-z]{1,6}|\d{1,3}| ?[^\sA-Za-z\d]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+")
+
+
+def move_messages(player_name, fen, legal_moves, turn):
+    """The original prompt asking `player_name` for one UCI move in the position `fen`"""
+    personality = PERSONALITIES.get(player_name, DEFAULT_PERSONALITY)
+
+    prompt = f"""You are playing chess as {player_name}. {personality}
+
+Current board position (FEN): {fen}
+Legal moves available: {', '.join(legal_moves)}
+
+You are playing as {'White' if turn == 'white' else 'Black'}.
+
+Please respond with ONLY the move in UCI format (e.g., e2e4, g1f3, etc.).
+Choose a good strategic move from the legal moves list.
+Do not include any explanation, just the move."""
+
+    return [
+        {"role": "system", "content": "You are a chess grandmaster. Always respond with only a valid UCI move."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+@functools.lru_cache(maxsize=1)
+def _tokenizer():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")  # gpt-35-turbo and gpt-4
+    except Exception as e:  # the encoding is downloaded on first use
+        print(f"tiktoken unavailable ({e}), estimating prompt tokens")
+        return None
+
+
+def count_tokens(messages):
+    """Prompt tokens of chat `messages`: exact with tiktoken, otherwise a close estimate"""
+    tokenizer = _tokenizer()
+    total = 3  # every reply is primed with a few tokens
+    for message in messages:
+        content = message["content"]
+        total += MESSAGE_OVERHEAD + (len(tokenizer.encode(content)) if tokenizer
+                                     else len(TOKEN_RE.findall(content)))
+    return total
+
+
+def san_by_piece(board):
+    """Legal moves in SAN grouped by piece, the piece letter written once per group"""
+    groups = {}
+    for move in board.legal_moves:
+        san = board.san(move)
+        if san[0] in PIECE_ORDER:
+            groups.setdefault(san[0], []).append(san[1:])
+        elif san.startswith("O-O"):
+            groups.setdefault("K", []).append(san)
+        else:
+            groups.setdefault("P", []).append(san)
+    return "; ".join(f"{piece}: {' '.join(groups[piece])}" for piece in PIECE_ORDER if piece in groups)
+
+
+def first_word(text):
+    """The word of a reply that should name the move, and whether it is complete (followed by a space)"""
+    for match in re.finditer(r"\S+", text):
+        complete = match.end() < len(text)
+        if complete and PREAMBLE_RE.match(match.group()):
+            continue
+        return match.group(), complete
+    return "", False
+
+
+def _legal(board, word):
+    """The legal move `word` spells in UCI or SAN, trying the usual slips in case and punctuation"""
+    match = UCI_RE.match(word.lower())
+    if match and match.group(1) != match.group(2):
+        move = chess.Move.from_uci("".join(part or "" for part in match.groups()))
+        if move in board.legal_moves:
+            return move
+    for spelling in (word, word[:1] + word[1:].lower(), word.lower(), word.capitalize(),
+                     word.upper().replace("0", "O")):
+        try:
+            return board.parse_san(spelling)
+        except ValueError:
+            continue
+    return None
+
+
+def read_move(board, text):
+    """(UCI move or None, near miss) for a reply; a near miss names a legal move but not in plain UCI or SAN"""
+    word = first_word(text)[0]
+    word = re.sub(r"^\d+\.+", "", word.strip(WRAPPING)).strip(WRAPPING).rstrip(".,;:!?")
+    move = _legal(board, word) if word else None
+    if move is None:
+        return None, False
+    san = board.san(move)
+    return move.uci(), word not in (move.uci(), san, san.rstrip("+#"))
+
+
+def parse_move(board, text):
+    """The legal move a reply names, as a UCI string; None if it names none"""
+    return read_move(board, text)[0]
+
+
+def pick_move(board, replies):
+    """(UCI move, index, near miss) of the first candidate reply naming a legal move; (None, None, False) if none does"""
+    for index, reply in enumerate(replies):
+        move, near_miss = read_move(board, reply or "")
+        if move:
+            return move, index, near_miss
+    return None, None, False
+
+
+class Prompt:
+    __slots__ = ("messages", "tokens", "legal_list", "trimmed")
+
+    def __init__(self, messages, tokens, legal_list, trimmed):
+        self.messages = messages
+        self.tokens = tokens
+        self.legal_list = legal_list
+        self.trimmed = trimmed
+
+
+class PromptBuilder:
+    def __init__(self, encoding="san", token_budget=0, omit_after=20):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown prompt encoding: {encoding} (use {', '.join(ENCODINGS)})")
+        self.encoding = encoding
+        self.token_budget = token_budget  # 0 = no budget
+        self.omit_after = omit_after  # legal answers in a row before the list is left out; 0 = always send it
+
+        self._streaks = {}  # player -> legal answers in a row
+        self._prefixes = {}  # (player, personality) -> system message
+        self._lock = threading.Lock()
+
+        # Counters exposed through stats()
+        self.prompts = 0
+        self.tokens = 0
+        self.lists_omitted = 0
+        self.trimmed = 0
+        self.over_budget = 0
+        self.answers = 0
+        self.legal_answers = 0
+
+    def prefix(self, player_name, personality=True):
+        """The system message, identical for every move of one player"""
+        message = self._prefixes.get((player_name, personality))
+        if message is None:
+            message = self._prefixes[player_name, personality] = self._system_message(player_name, personality)
+        return message
+
+    def _system_message(self, player_name, personality):
+        character = f" {PERSONALITIES.get(player_name, DEFAULT_PERSONALITY)}" if personality else ""
+        answer = "SAN (e.g. Nf3, exd5, O-O)" if self.encoding == "san" else "UCI (e.g. g1f3, e7e8q)"
+        return {"role": "system",
+                "content": f"You are {player_name}, a chess grandmaster.{character} "
+                           f"Reply with one legal move in {answer} and nothing else."}
+
+    def position(self, board, legal_list):
+        side = "White" if board.turn == chess.WHITE else "Black"
+        content = f"FEN: {board.fen()}\n{side} to move."
+        if legal_list:
+            moves = san_by_piece(board) if self.encoding == "san" else \
+                " ".join(move.uci() for move in board.legal_moves)
+            content += f"\nLegal: {moves}"
+        return {"role": "user", "content": content}
+
+    def build(self, player_name, board, retry=False, legal_list=None):
+        """The prompt for `player_name` to move on `board`; legal_list=None lets the player's record decide"""
+        if self.encoding == "full":
+            messages = move_messages(player_name, board.fen(), [move.uci() for move in board.legal_moves],
+                                     "white" if board.turn == chess.WHITE else "black")
+            return self._counted(Prompt(messages, count_tokens(messages), True, False))
+
+        if legal_list is None:
+            legal_list = retry or not self.reliable(player_name)
+        prompt = self._compose(player_name, board, True, legal_list)
+        if self.token_budget and prompt.tokens > self.token_budget:
+            # Trim what the model can best do without: its character first, then the move list,
+            # except on a retry, which always keeps the list
+            trims = ((False, legal_list),) if retry else ((False, legal_list), (False, False))
+            for personality, with_list in trims:
+                prompt = self._compose(player_name, board, personality, with_list)
+                prompt.trimmed = True
+                if prompt.tokens <= self.token_budget:
+                    break
+        return self._counted(prompt)
+
+    def _compose(self, player_name, board, personality, legal_list):
+        messages = [self.prefix(player_name, personality), self.position(board, legal_list)]
+        return Prompt(messages, count_tokens(messages), legal_list, False)
+
+    def _counted(self, prompt):
+        with self._lock:
+            self.prompts += 1
+            self.tokens += prompt.tokens
+            self.lists_omitted += not prompt.legal_list
+            self.trimmed += prompt.trimmed
+            self.over_budget += bool(self.token_budget and prompt.tokens > self.token_budget)
+        return prompt
+
+    def reliable(self, player_name):
+        """True once a player's recent answers were legal often enough to leave the list out"""
+        with self._lock:
+            return bool(self.omit_after) and self._streaks.get(player_name, 0) >= self.omit_after
+
+    def record(self, player_name, legal):
+        """Note whether the reply to a prompt named a legal move"""
+        with self._lock:
+            self.answers += 1
+            self.legal_answers += legal
+            self._streaks[player_name] = self._streaks.get(player_name, 0) + 1 if legal else 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "encoding": self.encoding,
+                "tokenizer": "tiktoken" if _tokenizer() else "estimate",
+                "token_budget": self.token_budget,
+                "prompts": self.prompts,
+                "avg_prompt_tokens": round(self.tokens / self.prompts, 1) if self.prompts else None,
+                "lists_omitted": self.lists_omitted,
+                "trimmed": self.trimmed,
+                "over_budget": self.over_budget,
+                "legal_rate": round(self.legal_answers / self.answers, 3) if self.answers else None,
+                "players_without_list": sum(streak >= self.omit_after for streak in self._streaks.values())
+                if self.omit_after else 0,
+            }
@@ -0,0 +1,213 @@
+"""
+Rate Limiter for Chess LLM Arena
+
+One admission gate in front of every Azure OpenAI call. A call waits until:
+
+- the requests-per-minute and tokens-per-minute buckets both have room
+  (tokens are estimated up front and corrected from `usage` afterwards),
+- fewer than `limit` calls are in flight, where `limit` grows by one per
+  window of successful calls and halves on every 429 (AIMD, like TCP), and
+- any `Retry-After` the service sent has passed.
+
+Waiting calls are admitted by priority, then arrival order, so a person
+asking for commentary goes ahead of the background game moves. A call given a
+`timeout` gives up waiting with AdmissionTimeout, before anything is sent. The
+client is built with the SDK's own retries turned off, so 429s reach the
+limiter; `call` retries those (and 5xx or connection errors) itself.
+"""
+import heapq
+import itertools
+import random
+import threading
+import time
+
+import openai
+
+INTERACTIVE = 0  # someone is waiting on the page
+GAME = 1  # moves for running games
+BACKGROUND = 2  # anything that can wait
+
+
+class AdmissionTimeout(TimeoutError):
+    """No slot within the caller's timeout; the call was never sent"""
+
+
+def throttle_delay(error):
+    """Seconds the service asked us to wait if `error` is a 429, otherwise None"""
+    if getattr(error, "status_code", None) != 429:
+        return None
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        return float(headers.get("retry-after", 1))
+    except ValueError:
+        return 1.0
+
+
+def is_transient(error):
+    """Errors worth retrying: timeouts, dropped connections and 5xx"""
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    status = getattr(error, "status_code", None)
+    return status is not None and (status >= 500 or status in (408, 409))
+
+
+def estimate_tokens(messages, max_tokens):
+    """Rough prompt + completion size (about 4 characters per token)"""
+    return sum(len(message["content"]) for message in messages) // 4 + max_tokens
+
+
+class TokenBucket:
+    def __init__(self, per_minute):
+        # Azure enforces quotas over short windows, so allow a 10-second burst, not a whole minute
+        self.capacity = max(1, per_minute / 6)
+        self.level = self.capacity
+        self.rate = per_minute / 60
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until `amount` fits (an amount over capacity only needs a full bucket)"""
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+
+class RateLimiter:
+    def __init__(self, rpm=0, tpm=0, max_concurrency=8, min_concurrency=1, retries=2):
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(max_concurrency)
+        self.retries = retries
+
+        self._waiting = []  # heap of (priority, arrival)
+        self._arrivals = itertools.count()
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+        # Counters exposed through stats()
+        self.in_flight = 0
+        self.admitted = 0
+        self.throttled = 0
+        self.retried = 0
+        self.timed_out = 0
+        self.tokens_used = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _delay(self, tokens, now):
+        """Seconds until a call of `tokens` could start (0 = now); caller holds the lock"""
+        if self.in_flight >= int(self.limit):
+            return None  # wait for a release
+        delay = self._paused_until - now
+        for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+            if bucket:
+                bucket.refill(now)
+                delay = max(delay, bucket.wait_time(amount))
+        return max(delay, 0.0)
+
+    def acquire(self, tokens=0, priority=GAME, timeout=None):
+        """Block until this call may start (at most `timeout` seconds); returns the time spent waiting"""
+        with self._cond:
+            entry = (priority, next(self._arrivals))
+            heapq.heappush(self._waiting, entry)
+            started = time.monotonic()
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = self._delay(tokens, now) if self._waiting[0] == entry else None
+                    if delay == 0:
+                        break
+                    if timeout is not None:
+                        remaining = started + timeout - now
+                        if remaining <= 0:
+                            self.timed_out += 1
+                            raise AdmissionTimeout
+                        delay = remaining if delay is None else min(delay, remaining)
+                    self._cond.wait(timeout=delay)
+            except BaseException:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                raise
+            heapq.heappop(self._waiting)
+
+            if self.requests:
+                self.requests.level -= 1
+            if self.tokens:
+                self.tokens.level -= tokens
+            self.in_flight += 1
+            self.admitted += 1
+            wait = time.monotonic() - started
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._cond.notify_all()  # the next waiter is now at the head
+            return wait
+
+    def release(self, estimated_tokens=0, used_tokens=None, retry_after=None):
+        """Finish a call: settle its token count and adjust the concurrency limit"""
+        with self._cond:
+            self.in_flight -= 1
+            if used_tokens is not None:
+                self.tokens_used += used_tokens
+                if self.tokens:
+                    self.tokens.level += estimated_tokens - used_tokens
+            if retry_after is not None:
+                # Multiplicative decrease, and nobody starts until the service says so
+                self.throttled += 1
+                self.limit = max(self.min_concurrency, self.limit / 2)
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            else:
+                # Additive increase: about +1 per `limit` successful calls
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def call(self, fn, tokens=0, priority=GAME, retry_errors=True, timeout=None):
+        """Run fn() once admitted, retrying 429s (and transient errors if retry_errors); returns fn's result
+        (with `timeout`, no admission, retries included, waits past that many seconds from now)"""
+        deadline_at = time.monotonic() + timeout if timeout is not None else None
+        for attempt in range(self.retries + 1):
+            self.acquire(tokens, priority, None if deadline_at is None else deadline_at - time.monotonic())
+            try:
+                response = fn()
+            except Exception as e:
+                retry_after = throttle_delay(e)
+                self.release(tokens, used_tokens=0, retry_after=retry_after)  # failed calls don't use quota
+                if attempt == self.retries or (retry_after is None and not (retry_errors and is_transient(e))):
+                    raise
+                self.retried += 1
+                if retry_after is None:
+                    time.sleep(random.uniform(0, 0.5 * 2 ** attempt))
+                continue
+            usage = getattr(response, "usage", None)
+            self.release(tokens, used_tokens=getattr(usage, "total_tokens", None))
+            return response
+
+    def stats(self):
+        """Current limit, queue and counters"""
+        with self._cond:
+            now = time.monotonic()
+            for bucket in (self.requests, self.tokens):
+                if bucket:
+                    bucket.refill(now)
+            return {
+                "concurrency_limit": round(self.limit, 2),
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiting),
+                "paused_for_s": round(max(0.0, self._paused_until - now), 2),
+                "requests_available": round(self.requests.level, 1) if self.requests else None,
+                "tokens_available": round(self.tokens.level) if self.tokens else None,
+                "admitted": self.admitted,
+                "throttled": self.throttled,
+                "retried": self.retried,
+                "timed_out": self.timed_out,
+                "tokens_used": self.tokens_used,
+                "avg_wait_ms": round(self.total_wait / self.admitted * 1000, 1) if self.admitted else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 1),
+            }
@@ -0,0 +1,249 @@
+"""
+Player Ratings for Chess LLM Arena
+
+RatingEngine keeps every player's record (games, wins, losses, draws) and an
+Elo or Glicko-2 rating. Both players of a game are updated together under one
+lock, so results finishing on different threads never lose an update. Players
+are also kept in a list sorted by rating, so the leaderboard is a slice of it
+and a player's rank is a binary search: nothing is re-sorted per request,
+which keeps the leaderboard fast with thousands of bots. Each player keeps a
+short history of (time, rating) points.
+
+Every rated game bumps a leaderboard version. A recent change log lets
+polling clients ask for only the players that changed since the version they
+already have.
+"""
+import math
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import deque
+
+GLICKO_SCALE = 173.7178  # Glicko-2 works on (rating - 1500) / 173.7178
+
+
+class PlayerRating:
+    __slots__ = ("player", "rating", "rd", "volatility", "games", "wins", "losses", "draws", "history")
+
+    def __init__(self, player, rating, rd, volatility, history):
+        self.player = player
+        self.rating = rating
+        self.rd = rd
+        self.volatility = volatility
+        self.games = 0
+        self.wins = 0
+        self.losses = 0
+        self.draws = 0
+        self.history = deque(maxlen=history)
+
+    @property
+    def sort_key(self):
+        return (-self.rating, self.player)
+
+    def to_dict(self):
+        return {
+            "rating": round(self.rating, 1),
+            "rd": round(self.rd, 1),
+            "games": self.games,
+            "wins": self.wins,
+            "losses": self.losses,
+            "draws": self.draws,
+        }
+
+
+def elo_update(rating, opponent, score, k_factor):
+    """New Elo rating after scoring `score` (1, 0.5 or 0) against `opponent`"""
+    expected = 1 / (1 + 10 ** ((opponent - rating) / 400))
+    return rating + k_factor * (score - expected)
+
+
+def glicko2_update(rating, rd, volatility, opponent, opponent_rd, score, tau):
+    """New (rating, rd, volatility) after one game, treating the game as its own rating period"""
+    mu = (rating - 1500) / GLICKO_SCALE
+    phi = rd / GLICKO_SCALE
+    mu_j = (opponent - 1500) / GLICKO_SCALE
+    phi_j = opponent_rd / GLICKO_SCALE
+
+    g = 1 / math.sqrt(1 + 3 * phi_j ** 2 / math.pi ** 2)
+    expected = 1 / (1 + math.exp(-g * (mu - mu_j)))
+    v = 1 / (g ** 2 * expected * (1 - expected))
+    delta = v * g * (score - expected)
+
+    # New volatility by the Illinois method (step 5 of Glickman's paper)
+    a = math.log(volatility ** 2)
+
+    def f(x):
+        ex = math.exp(x)
+        return (ex * (delta ** 2 - phi ** 2 - v - ex) / (2 * (phi ** 2 + v + ex) ** 2)
+                - (x - a) / tau ** 2)
+
+    low = a
+    if delta ** 2 > phi ** 2 + v:
+        high = math.log(delta ** 2 - phi ** 2 - v)
+    else:
+        k = 1
+        while f(a - k * tau) < 0:
+            k += 1
+        high = a - k * tau
+    f_low, f_high = f(low), f(high)
+    while abs(high - low) > 1e-6:
+        c = low + (low - high) * f_low / (f_high - f_low)
+        f_c = f(c)
+        if f_c * f_high <= 0:
+            low, f_low = high, f_high
+        else:
+            f_low /= 2
+        high, f_high = c, f_c
+    new_volatility = math.exp(low / 2)
+
+    phi_star = math.sqrt(phi ** 2 + new_volatility ** 2)
+    new_phi = 1 / math.sqrt(1 / phi_star ** 2 + 1 / v)
+    new_mu = mu + new_phi ** 2 * g * (score - expected)
+    return new_mu * GLICKO_SCALE + 1500, new_phi * GLICKO_SCALE, new_volatility
+
+
+class RatingEngine:
+    def __init__(self, system="elo", k_factor=32, initial_rating=1500, initial_rd=350,
+                 initial_volatility=0.06, tau=0.5, history=100, change_log=1000):
+        if system not in ("elo", "glicko2"):
+            raise ValueError(f"Unknown rating system: {system}")
+        self.system = system
+        self.k_factor = k_factor
+        self.initial_rating = initial_rating
+        self.initial_rd = initial_rd
+        self.initial_volatility = initial_volatility
+        self.tau = tau
+        self.history_size = history
+
+        self._players = {}  # player -> PlayerRating
+        self._order = []  # sort keys (-rating, player), best first
+        self._changes = deque(maxlen=change_log)  # (version, white_player, black_player)
+        self._lock = threading.Lock()
+
+        self.version = 0  # bumped by every rated game
+        self.games_rated = 0
+
+    def __contains__(self, player):
+        return player in self._players
+
+    def _player(self, player):
+        entry = self._players.get(player)
+        if entry is None:
+            entry = self._players[player] = PlayerRating(player, self.initial_rating, self.initial_rd,
+                                                         self.initial_volatility, self.history_size)
+            insort(self._order, entry.sort_key)
+        return entry
+
+    def _set_rating(self, entry, rating, now):
+        # Moving one player is a binary search plus a list shift, not a re-sort
+        del self._order[bisect_left(self._order, entry.sort_key)]
+        entry.rating = rating
+        insort(self._order, entry.sort_key)
+        entry.history.append((now, round(rating, 1)))
+
+    def record_game(self, white_player, black_player, score):
+        """Rate one finished game; score is white's result (1, 0.5 or 0). Returns both players' stats"""
+        with self._lock:
+            white = self._player(white_player)
+            black = self._player(black_player)
+            if self.system == "elo":
+                white_new = (elo_update(white.rating, black.rating, score, self.k_factor), white.rd, white.volatility)
+                black_new = (elo_update(black.rating, white.rating, 1 - score, self.k_factor), black.rd, black.volatility)
+            else:
+                white_new = glicko2_update(white.rating, white.rd, white.volatility,
+                                           black.rating, black.rd, score, self.tau)
+                black_new = glicko2_update(black.rating, black.rd, black.volatility,
+                                           white.rating, white.rd, 1 - score, self.tau)
+
+            now = time.time()
+            for entry, (rating, rd, volatility), points in ((white, white_new, score), (black, black_new, 1 - score)):
+                entry.rd, entry.volatility = rd, volatility
+                entry.games += 1
+                if points == 1:
+                    entry.wins += 1
+                elif points == 0:
+                    entry.losses += 1
+                else:
+                    entry.draws += 1
+                self._set_rating(entry, rating, now)
+            self.games_rated += 1
+            self.version += 1
+            self._changes.append((self.version, white_player, black_player))
+            return {white_player: white.to_dict(), black_player: black.to_dict()}
+
+    def top(self, n=20, offset=0):
+        """Players ranked offset+1 .. offset+n, best first"""
+        with self._lock:
+            return [dict(self._players[player].to_dict(), player=player, rank=rank)
+                    for rank, (_, player) in enumerate(self._order[offset:offset + n], offset + 1)]
+
+    def rank(self, player):
+        """1-based rank of a player, or None if they haven't played"""
+        with self._lock:
+            entry = self._players.get(player)
+            return bisect_left(self._order, entry.sort_key) + 1 if entry else None
+
+    def get(self, player):
+        """Stats, rank and rating history of one player, or None"""
+        with self._lock:
+            entry = self._players.get(player)
+            if entry is None:
+                return None
+            return dict(entry.to_dict(), player=player,
+                        rank=bisect_left(self._order, entry.sort_key) + 1,
+                        history=[{"time": when, "rating": rating} for when, rating in entry.history])
+
+    def leaderboard(self):
+        """Every player's stats keyed by name, in rank order"""
+        with self._lock:
+            return {player: self._players[player].to_dict() for _, player in self._order}
+
+    def changed_since(self, since):
+        """(version, stats of players changed after `since`, full) - full is True when the
+        change log no longer reaches back that far, or `since` is from before a restart
+        (ahead of our version), and every player is returned"""
+        with self._lock:
+            if since == self.version:
+                return self.version, {}, False
+            if since < 0 or since > self.version or not self._changes or self._changes[0][0] > since + 1:
+                return self.version, {player: self._players[player].to_dict() for _, player in self._order}, True
+            changed = {}
+            for version, white_player, black_player in reversed(self._changes):
+                if version <= since:
+                    break
+                for player in (white_player, black_player):
+                    if player not in changed:
+                        changed[player] = self._players[player].to_dict()
+            return self.version, changed, False
+
+    def rows(self, players):
+        """(player, rating, rd, volatility, games, wins, losses, draws) tuples for saving"""
+        with self._lock:
+            return [(entry.player, entry.rating, entry.rd, entry.volatility,
+                     entry.games, entry.wins, entry.losses, entry.draws)
+                    for entry in (self._players[player] for player in players if player in self._players)]
+
+    def load(self, rows, version=None):
+        """Restore or overwrite players from rows() tuples, e.g. saved by another process, and move
+        to `version` (default: the next one)"""
+        with self._lock:
+            self.version = self.version + 1 if version is None else version
+            for player, rating, rd, volatility, games, wins, losses, draws in rows:
+                entry = self._player(player)
+                entry.rd, entry.volatility = rd, volatility
+                entry.games, entry.wins, entry.losses, entry.draws = games, wins, losses, draws
+                if rating != entry.rating:
+                    self._set_rating(entry, rating, time.time())
+                self._changes.append((self.version, player, player))
+
+    def count(self):
+        return len(self._players)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "system": self.system,
+                "players": len(self._players),
+                "games_rated": self.games_rated,
+                "version": self.version,
+            }
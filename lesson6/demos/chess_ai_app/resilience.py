@@ -0,0 +1,299 @@
+"""
+Resilient Model Calls for Chess LLM Arena
+
+MovePolicy wraps one model call (a function taking the seconds it may still
+use) with:
+
+- retries with full-jitter exponential backoff, for errors and for replies
+  the validator rejects (e.g. an illegal move),
+- hedging: once enough latencies are known, a call that is still running at
+  the p95 gets a second identical request and the first answer wins,
+- a circuit breaker per deployment that stops calling after repeated
+  failures and lets one probe through after a cool-down,
+- a deadline for the whole move, across retries and hedges. The call is
+  given what is left of it, so it can also stop waiting for a rate-limiter
+  slot. A call that never got one was not sent and isn't held against the
+  deployment.
+
+When the policy gives up it raises Unavailable with a reason, so the caller's
+fallback is counted instead of silently standing in for the model.
+MoveMetrics counts where every move came from, and per player how often
+the first request for a move already came back legal.
+"""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from rate_limiter import AdmissionTimeout, is_transient
+
+
+class Unavailable(Exception):
+    """No usable answer; reason is circuit_open, deadline, error, invalid or cancelled"""
+
+    def __init__(self, reason, error=None):
+        super().__init__(f"{reason}: {error}" if error else reason)
+        self.reason = reason
+        self.error = error
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0  # in a row
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """May a call go out now? In half-open state only one probe at a time"""
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+            if self.state == "half_open":
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_unsent(self):
+        """The call was never sent: it says nothing about the deployment, but frees the probe"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures, "times_opened": self.times_opened}
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class MovePolicy:
+    def __init__(self, retries=2, backoff=0.25, backoff_max=4.0, deadline=20.0, hedge_percentile=0.95,
+                 hedge_min_samples=20, hedge_min_delay=0.2, failure_threshold=5, reset_timeout=30,
+                 max_workers=16):
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self.hedge_percentile = hedge_percentile  # 0 turns hedging off
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._breakers = {}  # deployment -> CircuitBreaker
+        self._latencies = deque(maxlen=500)  # seconds, successful calls only
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-call")
+        self._lock = threading.Lock()
+
+        # Counters exposed through stats()
+        self.calls = 0
+        self.retried = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.gave_up = {}
+
+    def breaker(self, deployment):
+        with self._lock:
+            breaker = self._breakers.get(deployment)
+            if breaker is None:
+                breaker = self._breakers[deployment] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def hedge_delay(self):
+        """Seconds to wait before hedging, or None until enough latencies are known"""
+        if not self.hedge_percentile or len(self._latencies) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, percentile(list(self._latencies), self.hedge_percentile))
+
+    def run(self, attempt, validate=None, deployment="default", cancelled=None):
+        """Return attempt(timeout)'s result, retrying and hedging as configured, or raise Unavailable
+        (a set `cancelled` Event stops it before the next attempt)"""
+        breaker = self.breaker(deployment)
+        deadline_at = time.monotonic() + self.deadline
+        failure = Unavailable("error")
+        for number in range(self.retries + 1):
+            if cancelled is not None and cancelled.is_set():
+                failure = Unavailable("cancelled")
+                break
+            if number:
+                # Full jitter keeps retries from many games from arriving together
+                pause = random.uniform(0, min(self.backoff_max, self.backoff * 2 ** (number - 1)))
+                if time.monotonic() + pause >= deadline_at:
+                    failure = Unavailable("deadline")
+                    break
+                time.sleep(pause)
+                with self._lock:
+                    self.retried += 1
+            if not breaker.allow():
+                failure = Unavailable("circuit_open")
+                break
+
+            try:
+                result = self._hedged(attempt, deadline_at)
+            except AdmissionTimeout:
+                # Still waiting for a rate-limiter slot at the deadline
+                breaker.record_unsent()
+                failure = Unavailable("deadline")
+                break
+            except TimeoutError:
+                breaker.record_failure()
+                failure = Unavailable("deadline")
+                break
+            except Exception as e:
+                breaker.record_failure()
+                failure = Unavailable("error", e)
+                if not is_transient(e) and getattr(e, "status_code", None) != 429:
+                    break
+                continue
+
+            # The deployment answered, even if the answer is no good
+            breaker.record_success()
+            if cancelled is not None and cancelled.is_set():
+                failure = Unavailable("cancelled")
+                break
+            if validate is None or validate(result):
+                return result
+            failure = Unavailable("invalid")
+
+        if failure.reason != "cancelled":  # the caller no longer wanted an answer
+            with self._lock:
+                self.gave_up[failure.reason] = self.gave_up.get(failure.reason, 0) + 1
+        raise failure
+
+    def _timed(self, attempt, timeout):
+        started = time.monotonic()
+        result = attempt(timeout)
+        with self._lock:
+            self._latencies.append(time.monotonic() - started)
+        return result
+
+    def _hedged(self, attempt, deadline_at):
+        with self._lock:
+            self.calls += 1
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError
+        first = self._executor.submit(self._timed, attempt, remaining)
+        running = {first}
+
+        delay = self.hedge_delay()
+        if delay is not None and delay < remaining:
+            done, _ = wait(running, timeout=delay)
+            if not done:
+                with self._lock:
+                    self.hedged += 1
+                running.add(self._executor.submit(self._timed, attempt, deadline_at - time.monotonic()))
+
+        error = None
+        while running:
+            done, running = wait(running, timeout=max(0.0, deadline_at - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                # A call still waiting for a limiter slot gives up at about the same moment
+                done, running = wait(running, timeout=0.1)
+                if running or not all(isinstance(future.exception(), AdmissionTimeout) for future in done):
+                    raise TimeoutError  # the losers finish in the background and are ignored
+                raise AdmissionTimeout
+            for future in done:
+                if future.exception() is None:
+                    if future is not first:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                if error is None or isinstance(error, AdmissionTimeout):
+                    error = future.exception()  # a request that was sent tells more than one that wasn't
+        raise error
+
+    def stats(self):
+        """Retry, hedge and give-up counters, latency percentiles and breaker states"""
+        with self._lock:
+            latencies = list(self._latencies)
+            breakers = dict(self._breakers)
+            counters = {
+                "calls": self.calls,
+                "retried": self.retried,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "gave_up": dict(self.gave_up),
+            }
+        delay = self.hedge_delay()
+        counters.update({
+            "latency_ms": {name: round(percentile(latencies, fraction) * 1000, 1) if latencies else None
+                           for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+            "hedge_after_ms": round(delay * 1000, 1) if delay is not None else None,
+            "deadline_s": self.deadline,
+            "breakers": {deployment: breaker.stats() for deployment, breaker in breakers.items()},
+        })
+        return counters
+
+
+class MoveMetrics:
+    """Counts where each played move came from (model, book, cache or a fallback and why)"""
+
+    def __init__(self):
+        self.sources = {}
+        self.fallbacks = {}
+        self.first_tries = {}  # player -> [first requests, legal on the first request]
+        self.candidates = {}  # index of the candidate that was played -> count
+        self.near_misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, source, reason=None):
+        with self._lock:
+            self.sources[source] = self.sources.get(source, 0) + 1
+            if reason:
+                self.fallbacks[reason] = self.fallbacks.get(reason, 0) + 1
+
+    def record_reply(self, player_name, legal, first_try=True, candidate=None, near_miss=False):
+        """A model reply: whether it named a legal move, which candidate did, and if it took reformatting"""
+        with self._lock:
+            if first_try:
+                counts = self.first_tries.setdefault(player_name, [0, 0])
+                counts[0] += 1
+                counts[1] += legal
+            if candidate is not None:
+                self.candidates[candidate] = self.candidates.get(candidate, 0) + 1
+            self.near_misses += near_miss
+
+    def stats(self):
+        with self._lock:
+            total = sum(self.sources.values())
+            return {
+                "moves": total,
+                "sources": dict(self.sources),
+                "fallback_reasons": dict(self.fallbacks),
+                "model_share": round(self.sources.get("model", 0) / total, 3) if total else None,
+                "candidate_played": dict(sorted(self.candidates.items())),
+                "near_misses": self.near_misses,
+                "legal_first_try": {player: {"requests": requests, "rate": round(legal / requests, 3)}
+                                    for player, (requests, legal) in sorted(self.first_tries.items())},
+            }
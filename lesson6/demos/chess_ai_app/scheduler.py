@@ -0,0 +1,115 @@
+"""
+Game Scheduler for Chess LLM Arena
+
+Runs every game as a coroutine on one asyncio event loop instead of one
+thread per game. Blocking LLM calls are handed to a small worker pool whose
+size caps the number of in-flight requests. Pending calls wait in a FIFO
+queue, and because each game has at most one call waiting at a time, games
+are served round-robin.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class GameScheduler:
+    def __init__(self, max_inflight=8):
+        self.max_inflight = max_inflight
+        self.loop = None
+        self._queue = None
+        self._executor = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        # Counters exposed through stats()
+        self.running_games = 0
+        self.finished_games = 0
+        self.in_flight = 0
+        self.calls_completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def start(self):
+        """Start the event loop thread (safe to call more than once)"""
+        with self._start_lock:
+            if self.loop is not None:
+                return
+            self.loop = asyncio.new_event_loop()
+            self._executor = ThreadPoolExecutor(max_workers=self.max_inflight,
+                                                thread_name_prefix="llm-call")
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run_loop, args=(ready,),
+                                            name="game-scheduler", daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def _run_loop(self, ready):
+        asyncio.set_event_loop(self.loop)
+        self._queue = asyncio.Queue()
+        for _ in range(self.max_inflight):
+            self.loop.create_task(self._worker())
+        self.loop.call_soon(ready.set)
+        self.loop.run_forever()
+
+    def submit(self, coro_fn, *args):
+        """Schedule a game coroutine from any thread"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._run_game(coro_fn, args), self.loop)
+
+    def spawn(self, coro):
+        """Run a coroutine that isn't a game itself (e.g. a tournament's round loop) on the event loop"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def _run_game(self, coro_fn, args):
+        self.running_games += 1
+        try:
+            await coro_fn(*args)
+        except Exception as e:
+            print(f"Scheduled game crashed: {e}")
+        finally:
+            self.running_games -= 1
+            self.finished_games += 1
+
+    async def call(self, fn, *args):
+        """Run a blocking call once an in-flight slot is free and return its result"""
+        future = self.loop.create_future()
+        await self._queue.put((fn, args, future, time.monotonic()))
+        return await future
+
+    async def _worker(self):
+        while True:
+            fn, args, future, queued_at = await self._queue.get()
+            if future.cancelled():
+                self._queue.task_done()
+                continue
+
+            wait = time.monotonic() - queued_at
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.in_flight += 1
+            try:
+                result = await self.loop.run_in_executor(self._executor, fn, *args)
+                if not future.cancelled():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            finally:
+                self.in_flight -= 1
+                self.calls_completed += 1
+                self._queue.task_done()
+
+    def stats(self):
+        """Snapshot of queue depth, in-flight calls and wait times"""
+        return {
+            'max_inflight': self.max_inflight,
+            'in_flight': self.in_flight,
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'running_games': self.running_games,
+            'finished_games': self.finished_games,
+            'calls_completed': self.calls_completed,
+            'avg_wait_ms': round(self.total_wait / self.calls_completed * 1000, 1) if self.calls_completed else 0.0,
+            'max_wait_ms': round(self.max_wait * 1000, 1),
+        }
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Headless Simulation for Chess LLM Arena
+
+Plays many games straight through ChessGame, with no Flask, no HTTP and no
+pauses between moves, spread over a pool of worker processes. Use it to
+compare prompts, personalities and players in bulk. Every finished game is
+written to PGN and/or JSONL as soon as it ends, and a score table is
+printed at the end.
+
+    python simulate.py --players llm:GPT-Aggressive llm:GPT-Defensive --games 200 --pgn out.pgn
+    python simulate.py --players random random --games 10000 --workers 8 --jsonl out.jsonl
+    python simulate.py --players llm:GPT-Balanced engine:50 --games 100
+
+Every ordered pair of players takes its turn, so with two players colours
+alternate. The opening book answers the first moves, as in the arena
+(--no-book turns it off). Model players share the CHESS_AOAI_RPM/TPM quota
+evenly between the worker processes.
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import chess
+import chess.pgn
+import dotenv
+from openai import AzureOpenAI
+
+from chess_game import ChessGame
+from opening_book import OpeningBook
+from move_stream import MoveStreamer
+from players import make_player
+from prompts import ENCODINGS, PromptBuilder
+from rate_limiter import RateLimiter
+
+OPENING_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+
+# Set in every worker process by init_worker
+worker = {}
+
+
+def init_worker(model, rpm, tpm, book_path, prompt_encoding="san", stream=False, candidates=1):
+    """Per-process state; the model client is only built once a model player needs it"""
+    worker.update(model=model, client=None, limiter=RateLimiter(rpm=rpm, tpm=tpm),
+                  book=OpeningBook(book_path) if book_path else None,
+                  prompts=PromptBuilder(encoding=prompt_encoding), streamer=MoveStreamer() if stream else None,
+                  candidates=candidates)
+
+
+def openai_client():
+    if worker["client"] is None:
+        dotenv.load_dotenv()
+        worker["client"] = AzureOpenAI(api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+                                       azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+                                       api_version="2024-05-01-preview",
+                                       max_retries=0)  # the limiter retries, so it sees every 429
+    return worker["client"]
+
+
+def play_game(number, white_spec, black_spec, seed):
+    """Play one game to the end; returns its record, PGN and where the moves came from"""
+    # Seeding per game (not per process) makes a run repeatable whichever process plays what
+    seed = None if seed is None else seed * 1000003 + number
+    if worker["book"] and seed is not None:
+        worker["book"].reseed(seed)
+    players = {colour: make_player(spec, seed=None if seed is None else seed + offset, client=openai_client,
+                                   model=worker["model"], limiter=worker["limiter"], prompts=worker["prompts"],
+                                   streamer=worker["streamer"], candidates=worker["candidates"])
+               for colour, spec, offset in (("white", white_spec, 0), ("black", black_spec, 1))}
+    game = ChessGame(f"sim-{number:06d}", white_spec, black_spec)
+    sources = {}
+    started = time.perf_counter()
+    while game.status == "active":
+        move = worker["book"].choose(game.board) if worker["book"] else None
+        source = "book"
+        if move is None:
+            move, source = players[game.current_turn].choose(game.board)
+        sources[source] = sources.get(source, 0) + 1
+        if not game.make_move(move):
+            game.finish("black" if game.current_turn == "white" else "white", "illegal_move")
+    record = game.to_record()
+    record.update(sources=sources, seconds=round(time.perf_counter() - started, 3),
+                  legal_first_try={colour: [player.first_tries, player.legal_first_tries]
+                                   for colour, player in players.items() if hasattr(player, "first_tries")})
+    return record, to_pgn(game, number)
+
+
+def to_pgn(game, number):
+    pgn = chess.pgn.Game.from_board(game.board)
+    pgn.headers.update({
+        "Event": "Chess LLM Arena simulation",
+        "Site": "simulate.py",
+        "Date": datetime.fromtimestamp(game.start_time).strftime("%Y.%m.%d"),
+        "Round": str(number + 1),
+        "White": game.white_player,
+        "Black": game.black_player,
+        "Result": {"white": "1-0", "black": "0-1", "draw": "1/2-1/2"}.get(game.result, "*"),
+        "Termination": game.termination or "unterminated",
+    })
+    return str(pgn) + "\n\n"
+
+
+def pairings(players, games):
+    """`games` (white, black) pairs cycling through every ordered pair of different players"""
+    ordered = [(white, black) for white, black in itertools.permutations(range(len(players)), 2)]
+    return [(players[white], players[black]) for white, black in itertools.islice(itertools.cycle(ordered), games)]
+
+
+def run(args):
+    schedule = pairings(args.players, args.games)
+    workers = args.workers or 1
+    init_args = (args.model, args.rpm // workers, args.tpm // workers,
+                 None if args.no_book or not os.path.exists(args.book) else args.book, args.prompt_encoding,
+                 args.stream, args.candidates)
+    pgn_file = open(args.pgn, 'w') if args.pgn else None
+    jsonl_file = open(args.jsonl, 'w') if args.jsonl else None
+    # Players with the same spec (e.g. random against random) share a row
+    scores = {player: {"games": 0, "points": 0.0, "wins": 0, "draws": 0, "losses": 0, "first_tries": 0,
+                       "legal_first_tries": 0} for player in args.players}
+    results = {}
+    sources = {}
+    plies = 0
+
+    def collect(record, pgn):
+        nonlocal plies
+        if pgn_file:
+            pgn_file.write(pgn)
+        if jsonl_file:
+            jsonl_file.write(json.dumps(record, separators=(',', ':')) + "\n")
+        points = {"white": 1.0, "black": 0.0}.get(record["result"], 0.5)
+        for player, score in ((record["white_player"], points), (record["black_player"], 1 - points)):
+            entry = scores[player]
+            entry["games"] += 1
+            entry["points"] += score
+            entry["wins" if score == 1 else "losses" if score == 0 else "draws"] += 1
+        for colour, (first_tries, legal) in record["legal_first_try"].items():
+            entry = scores[record[f"{colour}_player"]]
+            entry["first_tries"] += first_tries
+            entry["legal_first_tries"] += legal
+        results[record["termination"]] = results.get(record["termination"], 0) + 1
+        for source, count in record["sources"].items():
+            sources[source] = sources.get(source, 0) + count
+        plies += len(record["moves"])
+
+    started = time.perf_counter()
+    try:
+        if args.workers == 0:
+            init_worker(*init_args)
+            for number, (white, black) in enumerate(schedule):
+                collect(*play_game(number, white, black, args.seed))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=init_args) as pool:
+                futures = [pool.submit(play_game, number, white, black, args.seed)
+                           for number, (white, black) in enumerate(schedule)]
+                for done, future in enumerate(as_completed(futures), 1):
+                    collect(*future.result())
+                    if done % max(1, len(futures) // 10) == 0:
+                        print(f"   {done}/{len(futures)} games")
+    finally:
+        for out_file in (pgn_file, jsonl_file):
+            if out_file:
+                out_file.close()
+    elapsed = time.perf_counter() - started
+
+    print(f"\n🏁 {args.games} games in {elapsed:.1f} s ({args.games / elapsed:.1f} games/s, "
+          f"{plies / elapsed:.0f} plies/s) on {workers} process{'es' if workers > 1 else ''}")
+    for player, entry in sorted(scores.items(), key=lambda item: -item[1]["points"] / max(1, item[1]["games"])):
+        legal = f"  legal on first try {entry['legal_first_tries'] / entry['first_tries']:.1%}" \
+            if entry["first_tries"] else ""
+        print(f"   {player:<24} {entry['points']:>7} / {entry['games']:<6} "
+              f"+{entry['wins']} ={entry['draws']} -{entry['losses']}{legal}")
+    print(f"   Endings: {results}")
+    print(f"   Move sources: {sources}")
+    return {"games": args.games, "seconds": round(elapsed, 3), "plies": plies, "scores": scores,
+            "terminations": results, "sources": sources}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Play Chess LLM Arena games without the web server')
+    parser.add_argument('--players', nargs='+', default=['llm:GPT-Aggressive', 'llm:GPT-Defensive'],
+                        help='Player specs: random, engine[:<ms>] or llm:<name>')
+    parser.add_argument('--games', type=int, default=100, help='Number of games to play')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Worker processes (0 plays in this process)')
+    parser.add_argument('--pgn', help='Write every game to this PGN file')
+    parser.add_argument('--jsonl', help='Write every game record to this JSONL file')
+    parser.add_argument('--model', default='gpt-35-turbo', help='Model deployment for llm: players')
+    parser.add_argument('--rpm', type=int, default=int(os.getenv("CHESS_AOAI_RPM", "0")),
+                        help='Requests-per-minute quota shared by all processes (0 = no limit)')
+    parser.add_argument('--tpm', type=int, default=int(os.getenv("CHESS_AOAI_TPM", "0")),
+                        help='Tokens-per-minute quota shared by all processes (0 = no limit)')
+    parser.add_argument('--book', default=OPENING_BOOK_PATH, help='Polyglot opening book')
+    parser.add_argument('--no-book', action='store_true', help='Let the players choose every move')
+    parser.add_argument('--prompt-encoding', choices=ENCODINGS, default='san',
+                        help='How llm: players see the position (full = the original verbose prompt)')
+    parser.add_argument('--stream', action='store_true', help='Stream llm: replies and stop reading at the move')
+    parser.add_argument('--candidates', type=int, default=1,
+                        help='Replies per llm: request; the first legal one is played')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for reproducible random players')
+
+    args = parser.parse_args()
+    if len(args.players) < 2:
+        parser.error("--players needs at least two players")
+
+    print("🎲 Chess LLM Arena Simulation")
+    print("=" * 50)
+    run(args)
@@ -0,0 +1,46 @@
+// Chess boards drawn in the browser for the Chess LLM Arena.
+// With CHESS_BOARD_RENDER=client the server sends each board as
+// <div class="chess-board" data-fen="..." data-last-move="e2e4"></div>
+// and this script fills in the squares, using the same markup as
+// render_board() in main.py. It is served with a long cache lifetime, so
+// browsers download it once.
+const ArenaBoard = (function () {
+    const PIECES = {
+        'K': '♔', 'Q': '♕', 'R': '♖', 'B': '♗', 'N': '♘', 'P': '♙',
+        'k': '♚', 'q': '♛', 'r': '♜', 'b': '♝', 'n': '♞', 'p': '♟'
+    };
+    const FILES = 'abcdefgh';
+
+    function html(fen, lastMove) {
+        const highlight = lastMove ? [lastMove.slice(0, 2), lastMove.slice(2, 4)] : [];
+        const rows = [];
+        fen.split(' ')[0].split('/').forEach((row, index) => {
+            const rank = 7 - index;
+            const cells = [];
+            let file = 0;
+            for (const ch of row) {
+                const empty = parseInt(ch, 10);
+                for (let i = 0; i < (isNaN(empty) ? 1 : empty); i++, file++) {
+                    let squareClass = (file + rank) % 2 === 0 ? 'light' : 'dark';
+                    if (highlight.includes(FILES[file] + (rank + 1))) squareClass += ' last-move';
+                    cells.push(`<div class="board-cell ${squareClass}">${isNaN(empty) ? PIECES[ch] : '&nbsp;'}</div>`);
+                }
+            }
+            rows.push(`<div class="board-row">${cells.join('')}</div>`);
+        });
+        return rows.join('');
+    }
+
+    function draw(element, fen, lastMove) {
+        element.innerHTML = html(fen, lastMove);
+    }
+
+    function drawAll(root) {
+        (root || document).querySelectorAll('.chess-board[data-fen]').forEach(element => {
+            draw(element, element.dataset.fen, element.dataset.lastMove);
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', () => drawAll());
+    return { html, draw, drawAll };
+})();
@@ -0,0 +1,114 @@
+// Live updates for the Chess LLM Arena home page.
+// Listens to GET /events (Server-Sent Events) and patches only the game card
+// or leaderboard row that changed, instead of reloading the whole page.
+// Boards are redrawn with ArenaBoard from static/board.js.
+(function () {
+    const MOVES_SHOWN = 10;
+
+    function findCard(gameId) {
+        return document.querySelector(`.game-card[data-game-id="${gameId}"]`);
+    }
+
+    function setText(card, selector, text) {
+        const element = card.querySelector(selector);
+        if (element) element.textContent = text;
+    }
+
+    function onMove(data) {
+        const card = findCard(data.id);
+        if (!card) return;
+        setText(card, '.js-turn', data.turn.toUpperCase());
+        setText(card, '.js-ply', data.ply);
+
+        const moveList = card.querySelector('.move-list');
+        if (moveList) {
+            const line = document.createElement('div');
+            line.textContent = `${data.ply}. ${data.move}`;
+            moveList.appendChild(line);
+            while (moveList.children.length > MOVES_SHOWN) moveList.removeChild(moveList.firstElementChild);
+        }
+
+        const board = card.querySelector('.chess-board');
+        if (board) ArenaBoard.draw(board, data.fen, data.move);
+    }
+
+    function onGameFinished(data) {
+        const card = findCard(data.id);
+        if (!card) return;
+        card.dataset.status = 'finished';
+        const status = card.querySelector('.js-status');
+        if (status) {
+            status.className = 'js-status status-finished';
+            status.textContent = 'FINISHED';
+        }
+        const reason = data.termination ? ` (${data.termination.replace(/_/g, ' ')})` : '';
+        setText(card, '.js-result', `${(data.result || '').toUpperCase()}${reason}`);
+        const resultLine = card.querySelector('.js-result-line');
+        if (resultLine) resultLine.style.display = '';
+    }
+
+    function onGameStarted(data) {
+        // Later pages and the finished filter don't show new games
+        const grid = document.querySelector('.game-grid');
+        if (!grid || grid.dataset.insertNew === '0' || findCard(data.id)) return;
+        fetch(`/game/${data.id}/card`)
+            .then(response => response.ok ? response.text() : '')
+            .then(html => {
+                if (!html || findCard(data.id)) return;
+                const holder = document.createElement('div');
+                holder.innerHTML = html.trim();
+                // New games go in front of the finished ones
+                const firstFinished = grid.querySelector('.game-card[data-status="finished"]');
+                ArenaBoard.drawAll(holder);
+                grid.insertBefore(holder.firstElementChild, firstFinished);
+            });
+    }
+
+    function onLeaderboard(data) {
+        const table = document.querySelector('.leaderboard table');
+        if (!table) return;
+        const body = table.tBodies[0];
+        const fields = Array.from(table.querySelectorAll('thead th')).map(th => th.dataset.field);
+        Object.entries(data).forEach(([player, stats]) => {
+            let row = Array.from(body.rows).find(r => r.dataset.player === player);
+            if (!row) {
+                row = body.insertRow();
+                row.dataset.player = player;
+                fields.forEach(field => { row.insertCell().dataset.field = field; });
+                setText(row, 'td[data-field="player"]', player);
+            }
+            const winRate = stats.games > 0 ? stats.wins / stats.games * 100 : 0;
+            const values = Object.assign({}, stats, {
+                rating: Math.round(stats.rating), win_rate: `${winRate.toFixed(1)}%`
+            });
+            row.dataset.rating = stats.rating;
+            ['rating', 'games', 'wins', 'losses', 'draws', 'win_rate']
+                .forEach(field => setText(row, `td[data-field="${field}"]`, values[field]));
+        });
+
+        // Keep the table in rating order and no longer than the server's top list
+        if (!fields.includes('rating')) return;
+        const rows = Array.from(body.rows)
+            .sort((a, b) => parseFloat(b.dataset.rating) - parseFloat(a.dataset.rating));
+        const size = parseInt(table.dataset.size, 10) || rows.length;
+        rows.forEach((row, i) => {
+            if (i >= size) {
+                row.remove();
+                return;
+            }
+            body.appendChild(row);
+            setText(row, 'td[data-field="rank"]', i + 1);
+        });
+    }
+
+    function listen(source, kind, handler) {
+        source.addEventListener(kind, event => handler(JSON.parse(event.data)));
+    }
+
+    const source = new EventSource('/events');
+    listen(source, 'move', onMove);
+    listen(source, 'game_started', onGameStarted);
+    listen(source, 'game_finished', onGameFinished);
+    listen(source, 'leaderboard', onLeaderboard);
+    source.addEventListener('reload', () => location.reload());
+})();
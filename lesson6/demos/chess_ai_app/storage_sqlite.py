@@ -0,0 +1,435 @@
+"""
+SQLite Storage for Chess LLM Arena
+
+Keeps games, moves, tournaments and ratings in one SQLite file in WAL mode,
+so a restart picks up where the arena left off and several processes can
+read the same state. SQLiteStore answers the same calls as GameArchive
+(add, get, find, count, stats), so the routes read through it unchanged.
+
+Writes never block a game: they go on a queue, and one writer thread commits
+everything that arrived in the last `commit_interval_ms` as a single
+transaction (group commit). A move is a row in `moves` while its game runs.
+When the game ends, its moves are packed into the `games` row and the move
+rows are deleted. Games are indexed by player, status, tournament and start
+time. Recently written or read games stay hot in an LRU, so a game is never
+missing in the moment between being written and being committed.
+
+Two things can't wait for a batch and run as their own transactions: game
+leases (which worker process plays a game, see leases.py) and rating
+updates, which read and write the shared ratings table under the database
+write lock so workers never overwrite each other's results.
+"""
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+
+from chess_game import ChessGame
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id TEXT PRIMARY KEY,
+    white_player TEXT NOT NULL,
+    black_player TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    termination TEXT,
+    tournament_id TEXT,
+    start_time REAL NOT NULL,
+    end_time REAL,
+    day TEXT NOT NULL,
+    moves BLOB,
+    fen TEXT
+);
+CREATE INDEX IF NOT EXISTS games_white ON games (white_player, status, start_time);
+CREATE INDEX IF NOT EXISTS games_black ON games (black_player, status, start_time);
+CREATE INDEX IF NOT EXISTS games_status ON games (status, start_time);
+CREATE INDEX IF NOT EXISTS games_tournament ON games (tournament_id, start_time);
+CREATE INDEX IF NOT EXISTS games_day ON games (day, start_time);
+CREATE TABLE IF NOT EXISTS moves (
+    game_id TEXT NOT NULL,
+    ply INTEGER NOT NULL,
+    code INTEGER NOT NULL,
+    PRIMARY KEY (game_id, ply)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tournaments (
+    id TEXT PRIMARY KEY,
+    format TEXT NOT NULL,
+    status TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ratings (
+    player TEXT PRIMARY KEY,
+    rating REAL NOT NULL,
+    rd REAL NOT NULL,
+    volatility REAL NOT NULL,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    draws INTEGER NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ratings_version ON ratings (version);
+CREATE TABLE IF NOT EXISTS leases (
+    game_id TEXT PRIMARY KEY,
+    worker TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS leases_worker ON leases (worker);
+"""
+
+RATING_COLUMNS = "player, rating, rd, volatility, games, wins, losses, draws"
+
+FINISH_GAME = ("INSERT INTO games (id, white_player, black_player, status, result, termination, tournament_id, "
+               "start_time, end_time, day, moves, fen) VALUES (?, ?, ?, ?, ?, ?, NULL, ?, ?, ?, ?, ?) "
+               "ON CONFLICT (id) DO UPDATE SET status = excluded.status, result = excluded.result, "
+               "termination = excluded.termination, end_time = excluded.end_time, moves = excluded.moves, "
+               "fen = excluded.fen")
+
+
+# FINISH_GAME that only writes while `worker` holds the game's lease
+FINISH_LEASED_GAME = FINISH_GAME.replace(
+    "VALUES (?, ?, ?, ?, ?, ?, NULL, ?, ?, ?, ?, ?) ",
+    "SELECT ?, ?, ?, ?, ?, ?, NULL, ?, ?, ?, ?, ? "
+    "WHERE EXISTS (SELECT 1 FROM leases WHERE game_id = ? AND worker = ?) ")
+
+
+def day_of(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
+
+
+class SQLiteStore:
+    def __init__(self, path, commit_interval_ms=50, hot_size=100):
+        self.path = path
+        self.commit_interval = commit_interval_ms / 1000
+        self.hot_size = hot_size
+        self._hot = OrderedDict()  # game_id -> finished ChessGame, most recently used last
+        self._lock = threading.Lock()
+        self._local = threading.local()  # one read connection per thread
+        self._queue = queue.Queue()
+
+        self.hot_hits = 0
+        self.disk_reads = 0
+        self.commits = 0
+        self.statements = 0
+
+        writer = self._connect()
+        if writer.execute("SELECT 1 FROM sqlite_master WHERE name = 'ratings'").fetchone() and \
+                "version" not in [column[1] for column in writer.execute("PRAGMA table_info(ratings)")]:
+            # Ratings saved before they were versioned all count as version 1
+            writer.execute("ALTER TABLE ratings ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        writer.executescript(SCHEMA)
+        # Leases and rating updates commit straight away on their own connection
+        self._sync_db = self._connect()
+        self._sync_lock = threading.Lock()
+        self._writer_thread = threading.Thread(target=self._write_loop, args=(writer,),
+                                               name="sqlite-writer", daemon=True)
+        self._writer_thread.start()
+        atexit.register(self.close)  # don't drop the last batch on shutdown
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")  # WAL + NORMAL survives a process crash and only syncs on checkpoint
+        return db
+
+    def _reader(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = self._connect()
+        return db
+
+    # Writes
+
+    def _write(self, sql, params=()):
+        self._queue.put((sql, params))
+
+    def _write_loop(self, db):
+        while True:
+            batch = [self._queue.get()]
+            time.sleep(self.commit_interval)  # let the batch fill up
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            waiters = [item for item in batch if isinstance(item, threading.Event)]
+            statements = [item for item in batch if not isinstance(item, threading.Event)]
+            if statements:
+                try:
+                    db.execute("BEGIN")
+                    # Runs of the same statement go through executemany
+                    run_sql, run = None, []
+                    for sql, params in statements + [(None, None)]:
+                        if sql != run_sql and run:
+                            db.executemany(run_sql, run)
+                            run = []
+                        run_sql = sql
+                        run.append(params)
+                    db.execute("COMMIT")
+                    self.commits += 1
+                    self.statements += len(statements)
+                except sqlite3.Error as e:
+                    if db.in_transaction:
+                        db.execute("ROLLBACK")
+                    self._write_one_by_one(db, statements, e)
+            for waiter in waiters:
+                waiter.set()
+
+    def _write_one_by_one(self, db, statements, error):
+        """Retry a failed batch statement by statement, so only the failing ones are lost"""
+        print(f"SQLite batch of {len(statements)} statements failed ({error}), retrying one by one")
+        db.execute("BEGIN")
+        for sql, params in statements:
+            try:
+                db.execute(sql, params)
+                self.statements += 1
+            except sqlite3.Error as e:
+                print(f"SQLite write failed: {e} {params[:2]}")
+        db.execute("COMMIT")
+        self.commits += 1
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far is committed"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def start_game(self, game, tournament_id=None):
+        """Record a new game"""
+        self._write("INSERT OR IGNORE INTO games (id, white_player, black_player, status, tournament_id, "
+                    "start_time, day) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (game.id, game.white_player, game.black_player, game.status, tournament_id,
+                     game.start_time, day_of(game.start_time)))
+
+    def append_move(self, game_id, ply, code, worker=None):
+        """Record one packed move of a running game; with `worker`, only while that worker holds its lease"""
+        # Plain INSERT: a ply that is already stored means two workers played the game, and that must not pass
+        if worker is None:
+            self._write("INSERT INTO moves (game_id, ply, code) VALUES (?, ?, ?)", (game_id, ply, code))
+        else:
+            self._write("INSERT INTO moves (game_id, ply, code) SELECT ?, ?, ? "
+                        "WHERE EXISTS (SELECT 1 FROM leases WHERE game_id = ? AND worker = ?)",
+                        (game_id, ply, code, game_id, worker))
+
+    def add(self, game):
+        """Store a finished game: its moves become one packed blob in the games row"""
+        self._write(FINISH_GAME, self._finish_params(game))
+        self._write("DELETE FROM moves WHERE game_id = ?", (game.id,))
+        self._write("DELETE FROM leases WHERE game_id = ?", (game.id,))
+        with self._lock:
+            self._keep_hot(game)
+
+    def finish_game(self, game, worker, ratings, update):
+        """add() and update_ratings() in one transaction, only while `worker` holds the game's lease.
+        Returns (stored, update()'s result); nothing is written or rated if the lease is gone"""
+        self.flush()  # the game's last moves are queued; they must not land after the game is packed
+        with self._sync_lock:
+            db = self._sync_db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                if db.execute(FINISH_LEASED_GAME, self._finish_params(game) + (game.id, worker)).rowcount == 0:
+                    db.execute("ROLLBACK")
+                    return False, None
+                db.execute("DELETE FROM moves WHERE game_id = ?", (game.id,))
+                db.execute("DELETE FROM leases WHERE game_id = ?", (game.id,))
+                result = self._rate(db, ratings, update)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        with self._lock:
+            self._keep_hot(game)
+        return True, result
+
+    @staticmethod
+    def _finish_params(game):
+        return (game.id, game.white_player, game.black_player, game.status, game.result, game.termination,
+                game.start_time, game.end_time, day_of(game.start_time), game.packed_moves.tobytes(), game.get_fen())
+
+    def save_tournament(self, tournament):
+        self._write("INSERT OR REPLACE INTO tournaments (id, format, status, start_time, data) VALUES (?, ?, ?, ?, ?)",
+                    (tournament.id, tournament.format, tournament.status, tournament.start_time,
+                     json.dumps(tournament.to_dict(), separators=(',', ':'))))
+
+    def update_ratings(self, ratings, update):
+        """Run update() on the RatingEngine `ratings` under the database write lock, after pulling
+        changes other processes made, and save the players it changed. Returns update()'s result"""
+        with self._sync_lock:
+            db = self._sync_db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                result = self._rate(db, ratings, update)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return result
+
+    def _rate(self, db, ratings, update):
+        """The body of update_ratings(), inside a transaction the caller holds"""
+        self._pull_ratings(db, ratings)
+        before = ratings.version
+        result = update()
+        if ratings.version > before:
+            _, changed, _ = ratings.changed_since(before)
+            db.executemany(f"INSERT OR REPLACE INTO ratings ({RATING_COLUMNS}, version) "
+                           f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           [row + (ratings.version,) for row in ratings.rows(changed)])
+        return result
+
+    def pull_ratings(self, ratings):
+        """Load rating changes other processes saved; returns the players that changed"""
+        return self._pull_ratings(self._reader(), ratings)
+
+    def _pull_ratings(self, db, ratings):
+        version = db.execute("SELECT MAX(version) FROM ratings").fetchone()[0] or 0
+        if version <= ratings.version:
+            return []
+        rows = db.execute(f"SELECT {RATING_COLUMNS} FROM ratings WHERE version > ?", (ratings.version,)).fetchall()
+        ratings.load(rows, version)
+        return [row[0] for row in rows]
+
+    # Leases
+
+    def claim(self, game_id, worker, ttl):
+        """Take a game for `worker` if nobody else holds a live lease on it; True if it's ours"""
+        now = time.time()
+        with self._sync_lock:
+            cursor = self._sync_db.execute(
+                "INSERT INTO leases (game_id, worker, expires) VALUES (?, ?, ?) ON CONFLICT (game_id) "
+                "DO UPDATE SET worker = excluded.worker, expires = excluded.expires "
+                "WHERE leases.expires < ? OR leases.worker = excluded.worker",
+                (game_id, worker, now + ttl, now))
+            return cursor.rowcount == 1
+
+    def renew(self, worker, ttl):
+        """Extend every lease `worker` holds; returns the game ids it still holds"""
+        with self._sync_lock:
+            self._sync_db.execute("UPDATE leases SET expires = ? WHERE worker = ?", (time.time() + ttl, worker))
+            return {game_id for (game_id,) in self._sync_db.execute(
+                "SELECT game_id FROM leases WHERE worker = ?", (worker,))}
+
+    def release_all(self, worker):
+        with self._sync_lock:
+            self._sync_db.execute("DELETE FROM leases WHERE worker = ?", (worker,))
+
+    def orphans(self):
+        """Running games whose worker stopped renewing its lease (or never had one)"""
+        return [game_id for (game_id,) in self._reader().execute(
+            "SELECT games.id FROM games LEFT JOIN leases ON leases.game_id = games.id "
+            "WHERE games.status = 'active' AND (leases.expires IS NULL OR leases.expires < ?)", (time.time(),))]
+
+    # Reads
+
+    def get(self, game_id):
+        """Return a finished game from the LRU or the database, or None"""
+        with self._lock:
+            game = self._hot.get(game_id)
+            if game is not None:
+                self._hot.move_to_end(game_id)
+                self.hot_hits += 1
+                return game
+
+        row = self._reader().execute(
+            "SELECT id, white_player, black_player, status, result, termination, start_time, end_time, moves, fen "
+            "FROM games WHERE id = ? AND status != 'active'", (game_id,)).fetchone()
+        if row is None:
+            return None
+        game = ChessGame.from_record({
+            "id": row[0], "white_player": row[1], "black_player": row[2], "status": row[3],
+            "result": row[4], "termination": row[5], "start_time": row[6], "end_time": row[7],
+            "moves": array('H', row[8] or b''), "fen": row[9],
+        })
+        with self._lock:
+            self.disk_reads += 1
+            self._keep_hot(game)
+        return game
+
+    def _keep_hot(self, game):
+        self._hot[game.id] = game
+        self._hot.move_to_end(game.id)
+        while len(self._hot) > self.hot_size:
+            self._hot.popitem(last=False)
+
+    def find(self, player=None, date=None, status="finished", tournament=None, limit=50, offset=0):
+        """IDs of games, newest first, filtered by player, date (YYYY-MM-DD), status and/or tournament"""
+        where, params = [], []
+        if status is not None:
+            where.append("status = ?")
+            params.append(status)
+        if date is not None:
+            where.append("day = ?")
+            params.append(date)
+        if tournament is not None:
+            where.append("tournament_id = ?")
+            params.append(tournament)
+        clause = " AND ".join(where) or "1"
+        if player is None:
+            sql = f"SELECT id FROM games WHERE {clause} ORDER BY start_time DESC LIMIT ? OFFSET ?"
+            args = params + [limit, offset]
+        else:
+            # One indexed lookup per colour instead of an OR that can't use either index
+            sql = (f"SELECT id, start_time FROM games WHERE white_player = ? AND {clause} UNION ALL "
+                   f"SELECT id, start_time FROM games WHERE black_player = ? AND white_player != ? AND {clause} "
+                   f"ORDER BY start_time DESC LIMIT ? OFFSET ?")
+            args = [player] + params + [player, player] + params + [limit, offset]
+        return [row[0] for row in self._reader().execute(sql, args)]
+
+    def count(self, status="finished"):
+        return self._reader().execute("SELECT COUNT(*) FROM games WHERE status = ?", (status,)).fetchone()[0]
+
+    def __contains__(self, game_id):
+        with self._lock:
+            if game_id in self._hot:
+                return True
+        return self._reader().execute("SELECT 1 FROM games WHERE id = ? AND status != 'active'",
+                                      (game_id,)).fetchone() is not None
+
+    def get_live(self, game_id):
+        """A running game (possibly another process's), replayed from its saved moves, or None"""
+        db = self._reader()
+        row = db.execute("SELECT white_player, black_player, start_time FROM games WHERE id = ? AND status = 'active'",
+                         (game_id,)).fetchone()
+        if row is None:
+            return None
+        codes = [code for (code,) in db.execute("SELECT code FROM moves WHERE game_id = ? ORDER BY ply", (game_id,))]
+        return ChessGame.replay(game_id, row[0], row[1], row[2], codes)
+
+    def get_tournament(self, tournament_id):
+        row = self._reader().execute("SELECT data FROM tournaments WHERE id = ?", (tournament_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def stats(self):
+        """Row counts, file size and write batching counters"""
+        db = self._reader()
+        with self._lock:
+            hot = {"hot_games": len(self._hot), "hot_size": self.hot_size,
+                   "hot_hits": self.hot_hits, "disk_reads": self.disk_reads}
+        return dict(hot, **{
+            "path": self.path,
+            "backend": "sqlite",
+            "archived_games": self.count(),
+            "active_games": self.count("active"),
+            "pending_moves": db.execute("SELECT COUNT(*) FROM moves").fetchone()[0],
+            "tournaments": db.execute("SELECT COUNT(*) FROM tournaments").fetchone()[0],
+            "players": db.execute("SELECT COUNT(*) FROM ratings").fetchone()[0],
+            "leases": db.execute("SELECT COUNT(*) FROM leases").fetchone()[0],
+            "database_bytes": sum(os.path.getsize(self.path + suffix) for suffix in ("", "-wal")
+                                  if os.path.exists(self.path + suffix)),
+            "queued_writes": self._queue.qsize(),
+            "commits": self.commits,
+            "statements": self.statements,
+            "statements_per_commit": round(self.statements / self.commits, 1) if self.commits else 0.0,
+        })
+
+    def close(self):
+        self.flush(timeout=10)
@@ -0,0 +1,92 @@
+"""
+Game Termination for Chess LLM Arena
+
+Tracks everything needed to end a game that checkmate and stalemate don't
+cover: threefold repetition, the fifty-move rule, a max-plies cap and
+material adjudication. The position's Zobrist hash (Polyglot keys, the same
+as chess.polyglot.zobrist_hash) and the material balance are updated
+incrementally from the squares a move touches, so each ply costs a few XORs
+instead of a full board scan.
+"""
+import chess
+import chess.polyglot
+
+RANDOM_ARRAY = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+HASHER = chess.polyglot.ZobristHasher(RANDOM_ARRAY)
+PIECE_VALUES = {chess.PAWN: 1, chess.KNIGHT: 3, chess.BISHOP: 3, chess.ROOK: 5, chess.QUEEN: 9, chess.KING: 0}
+
+
+def piece_key(piece, square):
+    if piece is None:
+        return 0
+    return RANDOM_ARRAY[64 * ((piece.piece_type - 1) * 2 + int(piece.color)) + square]
+
+
+def piece_value(piece):
+    """Material from White's point of view"""
+    if piece is None:
+        return 0
+    value = PIECE_VALUES[piece.piece_type]
+    return value if piece.color == chess.WHITE else -value
+
+
+def material_balance(board):
+    return sum(piece_value(piece) for piece in board.piece_map().values())
+
+
+class TerminationTracker:
+    def __init__(self, board, max_plies=300, material_threshold=0, material_plies=10):
+        self.max_plies = max_plies
+        self.material_threshold = material_threshold  # pawns; 0 disables material adjudication
+        self.material_plies = material_plies
+        self.key = chess.polyglot.zobrist_hash(board)
+        self.material = material_balance(board)
+        self.plies = 0
+        self.lopsided_plies = 0
+        self.repetitions = {self.key: 1}
+
+    def push(self, board, move):
+        """Play move on board and update the hash, material and repetition table"""
+        touched = [move.from_square, move.to_square]
+        if board.is_castling(move):
+            rank = chess.square_rank(move.from_square)
+            if board.is_kingside_castling(move):
+                touched += [chess.square(7, rank), chess.square(5, rank)]
+            else:
+                touched += [chess.square(0, rank), chess.square(3, rank)]
+        elif board.is_en_passant(move):
+            touched.append(chess.square(chess.square_file(move.to_square), chess.square_rank(move.from_square)))
+
+        before = [board.piece_at(square) for square in touched]
+        key = self.key ^ HASHER.hash_castling(board) ^ HASHER.hash_ep_square(board)
+
+        board.push(move)
+
+        for square, old_piece in zip(touched, before):
+            new_piece = board.piece_at(square)
+            key ^= piece_key(old_piece, square) ^ piece_key(new_piece, square)
+            self.material += piece_value(new_piece) - piece_value(old_piece)
+        self.key = key ^ HASHER.hash_castling(board) ^ HASHER.hash_ep_square(board) ^ RANDOM_ARRAY[780]
+        self.plies += 1
+
+        # Captures and pawn moves can't be undone, so earlier positions can never repeat
+        if board.halfmove_clock == 0:
+            self.repetitions.clear()
+        self.repetitions[self.key] = self.repetitions.get(self.key, 0) + 1
+
+        if self.material_threshold and abs(self.material) >= self.material_threshold:
+            self.lopsided_plies += 1
+        else:
+            self.lopsided_plies = 0
+
+    def check(self, board):
+        """Return (result, reason) if the game should end now, otherwise None"""
+        if self.repetitions[self.key] >= 3:
+            return "draw", "threefold_repetition"
+        if board.halfmove_clock >= 100:
+            return "draw", "fifty_moves"
+        if self.material_threshold and self.lopsided_plies >= self.material_plies:
+            return ("white" if self.material > 0 else "black"), "material_adjudication"
+        if self.max_plies and self.plies >= self.max_plies:
+            return "draw", "max_plies"
+        return None
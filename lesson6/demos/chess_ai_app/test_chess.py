@@ -52,14 +52,31 @@ def test_tournament():
     
     return None
 
+# Last leaderboard seen, so a repeat fetch only downloads the players that changed
+leaderboard_cache = {"version": None, "players": {}}
+
 def get_leaderboard():
     """Get current leaderboard"""
     print("📊 Fetching leaderboard...")
     
-    response = requests.get(f"{BASE_URL}/leaderboard")
+    if leaderboard_cache["version"] is None:
+        response = requests.get(f"{BASE_URL}/leaderboard")
+        if response.status_code == 200:
+            leaderboard_cache["players"] = response.json()
+            # Servers without versioning leave this None, so every call is a full fetch
+            version = response.headers.get("X-Leaderboard-Version")
+            leaderboard_cache["version"] = int(version) if version else None
+    else:
+        response = requests.get(f"{BASE_URL}/leaderboard", params={"since": leaderboard_cache["version"]})
+        if response.status_code == 200:
+            delta = response.json()
+            if delta["full"]:
+                leaderboard_cache["players"] = {}
+            leaderboard_cache["players"].update(delta["players"])
+            leaderboard_cache["version"] = delta["version"]
     
     if response.status_code == 200:
-        leaderboard = response.json()
+        leaderboard = leaderboard_cache["players"]
         print("\n🏆 Current Leaderboard:")
         print("-" * 50)
         print(f"{'Player':<15} {'Games':<6} {'Wins':<5} {'Losses':<7} {'Draws':<6} {'Win Rate':<8}")
@@ -0,0 +1,67 @@
+"""
+Tests for the rating engine (run with: python -m pytest test_ratings.py)
+"""
+import pytest
+
+from ratings import RatingEngine, elo_update, glicko2_update
+
+
+def test_elo_update():
+    """Equal players: the winner gains half the K-factor"""
+    assert elo_update(1500, 1500, 1, 32) == 1516
+    assert elo_update(1500, 1500, 0.5, 32) == 1500
+
+
+def test_glicko2_known_values():
+    """One game rated as its own period, against values from a separate bisection solver"""
+    rating, rd, volatility = glicko2_update(1500, 200, 0.06, 1400, 30, 1, 0.5)
+    assert rating == pytest.approx(1563.564, abs=1e-3)
+    assert rd == pytest.approx(175.403, abs=1e-3)
+    assert volatility == pytest.approx(0.0599987, abs=1e-7)
+
+    # A big upset: delta^2 > phi^2 + v, so the volatility goes up
+    rating, rd, volatility = glicko2_update(1500, 50, 0.06, 2200, 50, 1, 0.5)
+    assert rating == pytest.approx(1514.537, abs=1e-3)
+    assert rd == pytest.approx(51.037, abs=1e-3)
+    assert volatility == pytest.approx(0.0600124, abs=1e-7)
+
+
+def test_glicko2_engine_is_symmetric():
+    """Two new players: the winner gains what the loser drops"""
+    engine = RatingEngine(system="glicko2")
+    engine.record_game("a", "b", 1)
+    a, b = engine.get("a"), engine.get("b")
+    assert a["rating"] - 1500 == pytest.approx(1500 - b["rating"], abs=0.1)
+    assert a["rd"] == b["rd"] < 350
+    assert [row["player"] for row in engine.top()] == ["a", "b"]
+
+
+def test_changed_since():
+    engine = RatingEngine()
+    engine.record_game("a", "b", 1)
+    engine.record_game("c", "d", 0.5)
+    engine.record_game("a", "c", 0)
+
+    # Up to date: nothing to send
+    assert engine.changed_since(3) == (3, {}, False)
+    # Only the players of the games after version 1
+    version, changed, full = engine.changed_since(1)
+    assert (version, sorted(changed), full) == (3, ["a", "c", "d"], False)
+    assert changed["c"] == engine.leaderboard()["c"]
+    # A version from before a restart (ahead of ours) gets everyone
+    version, changed, full = engine.changed_since(7)
+    assert (version, sorted(changed), full) == (3, ["a", "b", "c", "d"], True)
+
+
+def test_changed_since_past_the_log():
+    """A version older than the change log reaches gets everyone"""
+    engine = RatingEngine(change_log=2)
+    engine.record_game("a", "b", 1)
+    engine.record_game("c", "d", 1)
+    engine.record_game("e", "f", 1)
+
+    version, changed, full = engine.changed_since(0)
+    assert (version, full) == (3, True)
+    assert sorted(changed) == ["a", "b", "c", "d", "e", "f"]
+    version, changed, full = engine.changed_since(1)
+    assert (sorted(changed), full) == (["c", "d", "e", "f"], False)
@@ -0,0 +1,93 @@
+"""
+Tests for tournament pairings (run with: python -m pytest test_tournament.py)
+"""
+import random
+from collections import Counter
+
+import pytest
+
+from tournament import Tournament
+
+
+def play(tournament, result):
+    """Play every round the way main.run_tournament does; returns each round's (pairings, byes)"""
+    rounds = []
+    while True:
+        pairings = tournament.next_round()
+        if not pairings:
+            return rounds
+        rounds.append((pairings, list(tournament.byes)))
+        for white, black in pairings:
+            # A knockout draw is replayed once with colours reversed
+            while not tournament.record(white, black, result(white, black)):
+                white, black = black, white
+
+
+def assert_no_double_bookings(tournament, rounds):
+    for pairings, byes in rounds:
+        booked = [player for pairing in pairings for player in pairing] + byes
+        assert len(booked) == len(set(booked))
+        assert set(booked) <= set(tournament.players)
+        assert all(white != black for white, black in pairings)
+
+
+def players(n):
+    return [f"P{i}" for i in range(1, n + 1)]
+
+
+@pytest.mark.parametrize("n", [2, 7, 8, 13, 32])
+def test_swiss(n):
+    tournament = Tournament("t", players(n), format="swiss")
+    rng = random.Random(n)
+    rounds = play(tournament, lambda white, black: rng.choice(["white", "black", "draw"]))
+
+    assert len(rounds) == tournament.rounds
+    assert_no_double_bookings(tournament, rounds)
+    for pairings, byes in rounds:
+        # Everyone plays except one odd player out
+        assert len(byes) == n % 2
+    games = Counter(frozenset(pairing) for pairings, _ in rounds for pairing in pairings)
+    assert max(games.values()) == 1  # no rematches while there is anyone new to play
+    assert sum(tournament.scores.values()) == len(games) + n % 2 * len(rounds)
+    assert tournament.status == "finished"
+
+
+@pytest.mark.parametrize("format", ["single_elimination", "double_elimination"])
+@pytest.mark.parametrize("n", [2, 5, 8, 11])
+def test_knockout_leaves_one_survivor(format, n):
+    tournament = Tournament("t", players(n), format=format)
+    rng = random.Random(n)
+    rounds = play(tournament, lambda white, black: rng.choice(["white", "black", "draw"]))
+
+    assert_no_double_bookings(tournament, rounds)
+    assert len(tournament.alive) == 1
+    assert tournament.to_dict()["winner"] == tournament.alive[0]
+    # Everyone else went out on exactly their last life
+    survivor = tournament.alive[0]
+    assert tournament.losses[survivor] < tournament.lives
+    assert all(losses == tournament.lives for player, losses in tournament.losses.items() if player != survivor)
+
+
+def test_knockout_favourite_wins():
+    """With the better seed always winning, seed 1 wins and meets seed 2 in the final"""
+    tournament = Tournament("t", players(8), format="single_elimination")
+    seed = {player: i for i, player in enumerate(players(8))}
+    rounds = play(tournament, lambda white, black: "white" if seed[white] < seed[black] else "black")
+
+    assert len(rounds) == 3
+    assert set(rounds[-1][0][0]) == {"P1", "P2"}
+    assert tournament.alive == ["P1"]
+
+
+@pytest.mark.parametrize("n", [2, 5, 6])
+def test_round_robin_plays_every_pairing_once(n):
+    tournament = Tournament("t", players(n), format="round_robin")
+    rounds = play(tournament, lambda white, black: "draw")
+
+    assert len(rounds) == tournament.rounds
+    assert_no_double_bookings(tournament, rounds)
+    games = Counter(pairing for pairings, _ in rounds for pairing in pairings)
+    # Everyone meets everyone once with each colour
+    assert set(games) == {(a, b) for a in tournament.players for b in tournament.players if a != b}
+    assert set(games.values()) == {1}
+    assert set(tournament.scores.values()) == {n - 1}
@@ -0,0 +1,242 @@
+"""
+Tournaments for Chess LLM Arena
+
+A Tournament only decides who plays whom; main.run_tournament plays each
+round's games on the scheduler. Rounds run one after another: each starts as
+soon as the last game of the previous one ends, with at most
+`max_concurrent_games` games running at once. Supported formats:
+
+- swiss: ceil(log2 n) rounds; players meet someone with the same score they
+  haven't played yet, colours are balanced, an odd player out gets a bye
+- single_elimination / double_elimination: a seeded bracket where players
+  leave after one / two losses
+- round_robin: everyone plays everyone with both colours, one game per
+  player per round (the old /tournament behaviour, but paced by rounds)
+
+Swiss and knockouts finish a large field in O(log n) rounds instead of
+O(n^2) games.
+"""
+import math
+import time
+
+FORMATS = ("swiss", "single_elimination", "double_elimination", "round_robin")
+
+
+def bracket_order(size):
+    """Seed numbers (1-based) in bracket order so that 1 and 2 can only meet in the final"""
+    order = [1]
+    while len(order) < size:
+        total = len(order) * 2 + 1
+        order = [seed for top in order for seed in (top, total - top)]
+    return order
+
+
+class Tournament:
+    def __init__(self, tournament_id, players, format="swiss", rounds=None, max_concurrent_games=16):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown tournament format: {format}")
+        if len(players) < 2 or len(set(players)) != len(players):
+            raise ValueError("A tournament needs at least two different players")
+        self.id = tournament_id
+        self.format = format
+        self.players = list(players)  # seed order, best first (knockouts switch to bracket order)
+        self.seed = {player: i for i, player in enumerate(self.players)}
+        self.max_concurrent_games = max_concurrent_games
+        self.status = "pending"
+        self.start_time = time.time()
+        self.end_time = None
+
+        n = len(self.players)
+        if format == "swiss":
+            self.rounds = min(rounds or math.ceil(math.log2(n)), n - 1 if n % 2 == 0 else n)
+        elif format == "round_robin":
+            self.rounds = 2 * (n - 1 if n % 2 == 0 else n)
+        else:
+            self.rounds = None  # knockouts run until one player is left
+
+        self.round = 0
+        self.pairings = []  # current round's (white, black)
+        self.byes = []  # current round's players without a game
+        self.games = []  # every game id, in the order played
+        self.scores = {player: 0.0 for player in self.players}
+        self.losses = {player: 0 for player in self.players}
+        self.colour_balance = {player: 0 for player in self.players}  # whites minus blacks
+        self.last_colour = {}
+        self.opponents = {player: set() for player in self.players}
+        self.had_bye = set()
+        self.replayed = set()  # knockout pairings already replayed after a draw
+
+    @property
+    def lives(self):
+        return 2 if self.format == "double_elimination" else 1
+
+    @property
+    def alive(self):
+        return [player for player in self.players if self.losses[player] < self.lives]
+
+    @property
+    def finished(self):
+        if self.status == "finished":
+            return True
+        if self.rounds is None:
+            return len(self.alive) <= 1
+        return self.round >= self.rounds
+
+    def next_round(self):
+        """Pairings for the next round, or [] when the tournament is over"""
+        if self.finished:
+            self.status = "finished"
+            self.end_time = self.end_time or time.time()
+            self.pairings, self.byes = [], []
+            return []
+        self.status = "running"
+        self.round += 1
+        if self.format == "swiss":
+            self.pairings, self.byes = self._swiss_round()
+        elif self.format == "round_robin":
+            self.pairings, self.byes = self._round_robin_round()
+        else:
+            self.pairings, self.byes = self._knockout_round()
+        for player in self.byes:
+            self.had_bye.add(player)
+            if self.format == "swiss":
+                self.scores[player] += 1
+        return list(self.pairings)
+
+    def record(self, white, black, result):
+        """Score one game; result is "white", "black" or "draw". Returns False if a knockout
+        game was drawn and should be replayed with colours reversed"""
+        self.opponents[white].add(black)
+        self.opponents[black].add(white)
+        self.colour_balance[white] += 1
+        self.colour_balance[black] -= 1
+        self.last_colour[white] = "white"
+        self.last_colour[black] = "black"
+
+        if self.format in ("swiss", "round_robin"):
+            points = {"white": 1.0, "black": 0.0}.get(result, 0.5)
+            self.scores[white] += points
+            self.scores[black] += 1 - points
+            return True
+
+        if result not in ("white", "black"):
+            pairing = frozenset((white, black))
+            if pairing not in self.replayed:
+                self.replayed.add(pairing)
+                return False
+            # Still level after the rematch: the higher seed goes through
+            result = "white" if self.seed[white] < self.seed[black] else "black"
+        winner, loser = (white, black) if result == "white" else (black, white)
+        self.scores[winner] += 1
+        self.losses[loser] += 1
+        return True
+
+    def _colours(self, a, b):
+        """Order a pair as (white, black), giving white to whoever has had it less"""
+        if self.colour_balance[a] != self.colour_balance[b]:
+            return (a, b) if self.colour_balance[a] < self.colour_balance[b] else (b, a)
+        if self.last_colour.get(a) != self.last_colour.get(b):
+            return (a, b) if self.last_colour.get(a) != "white" else (b, a)
+        return a, b
+
+    def _swiss_round(self):
+        ranked = sorted(self.players, key=lambda player: (-self.scores[player], self.seed[player]))
+        byes = []
+        if len(ranked) % 2:
+            # Lowest-ranked player who hasn't had a bye yet sits out
+            bye = next((player for player in reversed(ranked) if player not in self.had_bye), ranked[-1])
+            ranked.remove(bye)
+            byes.append(bye)
+
+        pairs = self._swiss_pairs(ranked, allow_repeats=False, budget=[10000])
+        if pairs is None:
+            # Everyone left has met: allow a rematch rather than search forever
+            pairs = self._swiss_pairs(ranked, allow_repeats=True, budget=[len(ranked)])
+        return [self._colours(a, b) for a, b in pairs], byes
+
+    def _swiss_pairs(self, ranked, allow_repeats, budget):
+        # Pair the top unpaired player with the nearest-ranked opponent they haven't met,
+        # backtracking when that leaves the rest unpairable (up to `budget` tries)
+        if not ranked:
+            return []
+        top, rest = ranked[0], ranked[1:]
+        for i, opponent in enumerate(rest):
+            if not allow_repeats and opponent in self.opponents[top]:
+                continue
+            budget[0] -= 1
+            if budget[0] < 0:
+                return None
+            pairs = self._swiss_pairs(rest[:i] + rest[i + 1:], allow_repeats, budget)
+            if pairs is not None:
+                return [(top, opponent)] + pairs
+        return None
+
+    def _round_robin_round(self):
+        # Circle method: the first player stays put and everyone else rotates one seat
+        seats = self.players + ([None] if len(self.players) % 2 else [])
+        n = len(seats)
+        index = (self.round - 1) % (n - 1)
+        rotated = [seats[0]] + seats[1:][-index:] + seats[1:][:-index] if index else list(seats)
+        pairings, byes = [], []
+        for i in range(n // 2):
+            a, b = rotated[i], rotated[n - 1 - i]
+            if a is None or b is None:
+                byes.append(a or b)
+                continue
+            if (index + i) % 2:
+                a, b = b, a
+            # Second half of the event repeats the first with colours reversed
+            pairings.append((a, b) if self.round <= n - 1 else (b, a))
+        return pairings, byes
+
+    def _knockout_round(self):
+        if self.round == 1:
+            # Seeded bracket; missing seeds are byes for the top seeds
+            size = 1 << (len(self.players) - 1).bit_length()
+            slots = [self.players[seed - 1] if seed <= len(self.players) else None
+                     for seed in bracket_order(size)]
+            self.players = [player for player in slots if player is not None]  # bracket order from now on
+            pairings, byes = [], []
+            for a, b in zip(slots[::2], slots[1::2]):
+                if a and b:
+                    pairings.append((a, b))
+                else:
+                    byes.append(a or b)
+            return pairings, byes
+
+        # Later rounds: pair neighbours in the bracket, keeping winners (fewer losses) apart from losers
+        pairings, leftovers = [], []
+        for losses in range(self.lives):
+            group = [player for player in self.players if self.losses[player] == losses]
+            if len(group) % 2:
+                leftovers.append(group.pop(0))
+            pairings += [self._colours(a, b) for a, b in zip(group[::2], group[1::2])]
+        # Odd players out meet each other (e.g. a double-elimination grand final)
+        pairings += [self._colours(a, b) for a, b in zip(leftovers[::2], leftovers[1::2])]
+        return pairings, leftovers[len(leftovers) // 2 * 2:]
+
+    def standings(self):
+        """Players best first, with score and losses"""
+        knockout = self.rounds is None
+        ranked = sorted(self.players, key=lambda player: (knockout and self.losses[player],
+                                                           -self.scores[player], self.seed[player]))
+        return [{"player": player, "score": self.scores[player], "losses": self.losses[player]}
+                for player in ranked]
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "format": self.format,
+            "status": self.status,
+            "round": self.round,
+            "rounds": self.rounds,
+            "max_concurrent_games": self.max_concurrent_games,
+            "pairings": [{"white": white, "black": black} for white, black in self.pairings],
+            "byes": self.byes,
+            "games": len(self.games),
+            "game_ids": self.games,
+            "standings": self.standings(),
+            "winner": self.standings()[0]["player"] if self.status == "finished" else None,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+        }
@@ -45,34 +45,85 @@ def create_tournament(players, rounds=1):
     
     return all_games
 
+def start_server_tournament(players, format, rounds=None, max_concurrent_games=None):
+    """Let the server run a Swiss, knockout or round-robin tournament round by round"""
+    print(f"🏆 Starting a {format.replace('_', ' ')} tournament with {len(players)} players...")
+    
+    payload = {"players": players, "format": format}
+    if rounds:
+        payload["rounds"] = rounds
+    if max_concurrent_games:
+        payload["max_concurrent_games"] = max_concurrent_games
+    response = requests.post(f"{BASE_URL}/tournament", json=payload)
+    
+    if response.status_code == 200:
+        data = response.json()
+        if data['success']:
+            print(f"✅ Tournament started: {data['tournament_id'][:8]}")
+            return data['tournament_id']
+        print(f"❌ Error: {data['error']}")
+    else:
+        print(f"❌ HTTP Error: {response.status_code}")
+    return None
+
+def follow_tournament(tournament_id, duration=600):
+    """Print each round's pairings until the tournament finishes"""
+    start_time = time.time()
+    last_round = 0
+    
+    while time.time() - start_time < duration:
+        response = requests.get(f"{BASE_URL}/tournament/{tournament_id}")
+        if response.status_code != 200:
+            print(f"❌ HTTP Error: {response.status_code}")
+            return
+        
+        tournament = response.json()
+        if tournament['round'] != last_round and tournament['pairings']:
+            last_round = tournament['round']
+            print(f"\n🎯 Round {last_round}" + (f"/{tournament['rounds']}" if tournament['rounds'] else ""))
+            for pairing in tournament['pairings']:
+                print(f"⚔️  {pairing['white']} vs {pairing['black']}")
+            for player in tournament['byes']:
+                print(f"💤 {player} has a bye")
+        
+        if tournament['status'] == 'finished':
+            print(f"\n🏁 {tournament['winner']} wins after {tournament['round']} rounds and {tournament['games']} games!")
+            for rank, standing in enumerate(tournament['standings'], 1):
+                print(f"{rank:<5} {standing['player']:<20} {standing['score']:<6} {standing['losses']} losses")
+            return
+        
+        time.sleep(5)
+
 def monitor_tournament(duration=60):
     """Monitor tournament progress"""
     print(f"👀 Monitoring tournament for {duration} seconds...")
     
     start_time = time.time()
+    etag = None
     
     while time.time() - start_time < duration:
-        response = requests.get(f"{BASE_URL}/leaderboard")
+        # The server keeps players in rating order, so just ask for the top of the list;
+        # If-None-Match makes the poll an empty 304 while no game has finished
+        headers = {"If-None-Match": etag} if etag else {}
+        response = requests.get(f"{BASE_URL}/leaderboard/top", params={"n": 20}, headers=headers)
         
-        if response.status_code == 200:
-            leaderboard = response.json()
+        if response.status_code == 304:
+            print("📊 Leaderboard unchanged")
+        elif response.status_code == 200:
+            etag = response.headers.get("ETag")
+            leaderboard = response.json()['players']
             
-            print("\n" + "="*60)
+            print("\n" + "="*68)
             print("📊 LIVE LEADERBOARD")
-            print("="*60)
+            print("="*68)
             
             if leaderboard:
-                # Sort by win rate
-                sorted_players = sorted(leaderboard.items(), 
-                                       key=lambda x: (x[1]['wins']/max(x[1]['games'], 1), x[1]['wins']), 
-                                       reverse=True)
+                print(f"{'Rank':<5} {'Player':<20} {'Rating':<7} {'Games':<6} {'W':<4} {'L':<4} {'D':<4} {'Win%':<8}")
+                print("-" * 68)
                 
-                print(f"{'Rank':<5} {'Player':<20} {'Games':<6} {'W':<4} {'L':<4} {'D':<4} {'Win%':<8}")
-                print("-" * 60)
-                
-                for rank, (player, stats) in enumerate(sorted_players, 1):
+                for stats in leaderboard:
                     win_rate = (stats['wins'] / stats['games'] * 100) if stats['games'] > 0 else 0
-                    print(f"{rank:<5} {player:<20} {stats['games']:<6} {stats['wins']:<4} {stats['losses']:<4} {stats['draws']:<4} {win_rate:<8.1f}")
+                    print(f"{stats['rank']:<5} {stats['player']:<20} {stats['rating']:<7.0f} {stats['games']:<6} {stats['wins']:<4} {stats['losses']:<4} {stats['draws']:<4} {win_rate:<8.1f}")
             else:
                 print("No games completed yet...")
         
@@ -133,7 +184,10 @@ if __name__ == "__main__":
     parser.add_argument('--players', nargs='+', 
                        default=['GPT-Magnus', 'GPT-Kasparov', 'GPT-Fischer', 'GPT-Tal'],
                        help='List of player names')
-    parser.add_argument('--rounds', type=int, default=1, help='Number of rounds')
+    parser.add_argument('--rounds', type=int, default=None, help='Number of rounds (default: 1, or log2(players) for swiss)')
+    parser.add_argument('--format', choices=['swiss', 'single_elimination', 'double_elimination', 'round_robin'],
+                       help='Let the server run the tournament in this format')
+    parser.add_argument('--max-games', type=int, default=None, help='Most games the server runs at once')
     parser.add_argument('--duration', type=int, default=60, help='Monitoring duration')
     parser.add_argument('--player1', default='GPT-Alpha', help='First player for battle')
     parser.add_argument('--player2', default='GPT-Beta', help='Second player for battle')
@@ -143,8 +197,13 @@ if __name__ == "__main__":
     print("🔥 Chess LLM Tournament Manager")
     print("=" * 50)
     
-    if args.mode == 'tournament':
-        games = create_tournament(args.players, args.rounds)
+    if args.mode == 'tournament' and args.format:
+        tournament_id = start_server_tournament(args.players, args.format, args.rounds, args.max_games)
+        if tournament_id:
+            follow_tournament(tournament_id, args.duration)
+        
+    elif args.mode == 'tournament':
+        games = create_tournament(args.players, args.rounds or 1)
         print(f"\n🎮 Tournament created with {len(games)} games!")
         print("⏳ Waiting for games to start...")
         time.sleep(10)
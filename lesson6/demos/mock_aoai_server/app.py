@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Mock Azure OpenAI Server
+
+A local stand-in for the Azure OpenAI endpoints the demo apps use:
+chat completions (including streaming), image generation and text to speech.
+Latency, errors and 429s can be injected so we can measure our own
+throughput and tail latency without the real service. Prompts that contain
+a chess FEN are answered with a legal move, so the Chess LLM Arena can play
+full games offline.
+
+Point any app at it:
+    AZURE_OPENAI_ENDPOINT=http://localhost:8000 AZURE_OPENAI_API_KEY=mock python app.py
+"""
+from flask import Flask, request, jsonify, Response
+import argparse
+import json
+import random
+import re
+import struct
+import threading
+import time
+import uuid
+import zlib
+from collections import deque
+
+import chess
+
+app = Flask(__name__)
+
+# Default behaviour, overridden from the command line
+config = {
+    "latency": "fixed:0",       # fixed:S, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA (seconds)
+    "token_latency": 0.0,       # extra seconds per completion token (spread over stream chunks)
+    "error_rate": 0.0,          # chance of a 500 response
+    "throttle_rate": 0.0,       # chance of a 429 response
+    "retry_after": 1,           # Retry-After header sent with 429s
+    "rpm": 0,                   # requests per minute before every request gets a 429 (0 = unlimited)
+    "illegal_rate": 0.0,        # chance a chess answer is an illegal move
+    "ramble_rate": 0.0,         # chance a chess answer is followed by an explanation
+}
+
+FEN_RE = re.compile(r"([pnbrqkPNBRQK1-8]+(?:/[pnbrqkPNBRQK1-8]+){7} [wb] (?:[KQkq]+|-) (?:[a-h][36]|-) \d+ \d+)")
+
+stats_lock = threading.Lock()
+stats = {"requests": 0, "errors_injected": 0, "throttled": 0, "by_endpoint": {}}
+injected_latencies = deque(maxlen=10000)
+recent_requests = deque()
+
+
+def sample_latency():
+    """Draw a response delay from the configured distribution"""
+    kind, _, params = config["latency"].partition(":")
+    values = [float(v) for v in params.split(",") if v]
+    if kind == "uniform":
+        return random.uniform(values[0], values[1])
+    if kind == "lognormal":
+        median, sigma = values
+        return random.lognormvariate(0, sigma) * median
+    return values[0] if values else 0.0
+
+
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def admit(endpoint):
+    """Apply rate limits and fault injection; returns an error response or None"""
+    now = time.time()
+    with stats_lock:
+        stats["requests"] += 1
+        stats["by_endpoint"][endpoint] = stats["by_endpoint"].get(endpoint, 0) + 1
+
+        while recent_requests and now - recent_requests[0] > 60:
+            recent_requests.popleft()
+        over_quota = config["rpm"] and len(recent_requests) >= config["rpm"]
+        if not over_quota:
+            recent_requests.append(now)
+
+        if over_quota or random.random() < config["throttle_rate"]:
+            stats["throttled"] += 1
+            response = jsonify({"error": {"code": "429", "message": "Rate limit exceeded (mock)"}})
+            response.status_code = 429
+            response.headers["Retry-After"] = str(config["retry_after"])
+            return response
+
+        if random.random() < config["error_rate"]:
+            stats["errors_injected"] += 1
+            response = jsonify({"error": {"code": "500", "message": "Injected server error (mock)"}})
+            response.status_code = 500
+            return response
+
+    return None
+
+
+def chess_reply(prompt):
+    """Answer every FEN in the prompt with a legal move, or None if there is no FEN"""
+    fens = FEN_RE.findall(prompt)
+    if not fens:
+        return None
+
+    moves = []
+    for fen in fens:
+        board = chess.Board(fen)
+        legal_moves = list(board.legal_moves)
+        if not legal_moves:
+            moves.append("0000")
+        elif random.random() < config["illegal_rate"]:
+            moves.append("a1a1")
+        else:
+            # Prefer captures so mock games finish
+            captures = [move for move in legal_moves if board.is_capture(move)]
+            moves.append(random.choice(captures or legal_moves).uci())
+
+    if len(moves) == 1:
+        reply = moves[0]
+    else:
+        reply = "\n".join(f"{number}: {move}" for number, move in enumerate(moves, 1))
+
+    if random.random() < config["ramble_rate"]:
+        reply += " because it improves my position and keeps the initiative in the centre."
+    return reply
+
+
+def completion_text(messages):
+    prompt = messages[-1]["content"] if messages else ""
+    reply = chess_reply(prompt)
+    if reply is None:
+        reply = f"This is a mock response to: {prompt[:60]}"
+    return reply
+
+
+@app.route('/openai/deployments/<deployment>/chat/completions', methods=['POST'])
+def chat_completions(deployment):
+    error = admit("chat.completions")
+    if error:
+        return error
+
+    data = request.get_json()
+    messages = data.get("messages", [])
+    n = data.get("n") or 1
+    prompt_tokens = sum(estimate_tokens(message.get("content") or "") for message in messages)
+
+    replies = [completion_text(messages) for _ in range(n)]
+    completion_tokens = sum(estimate_tokens(reply) for reply in replies)
+
+    delay = sample_latency()
+    with stats_lock:
+        injected_latencies.append(delay + completion_tokens * config["token_latency"])
+
+    completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+    created = int(time.time())
+
+    if data.get("stream"):
+        def generate():
+            time.sleep(delay)
+            for index, reply in enumerate(replies):
+                pieces = [reply[i:i + 2] for i in range(0, len(reply), 2)]
+                for number, piece in enumerate(pieces):
+                    delta = {"content": piece}
+                    if number == 0:
+                        delta["role"] = "assistant"
+                    chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                             "model": deployment,
+                             "choices": [{"index": index, "delta": delta, "finish_reason": None}]}
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    time.sleep(config["token_latency"] / 2)
+                done = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                        "model": deployment, "choices": [{"index": index, "delta": {}, "finish_reason": "stop"}]}
+                yield f"data: {json.dumps(done)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return Response(generate(), mimetype="text/event-stream")
+
+    time.sleep(delay + completion_tokens * config["token_latency"])
+    return jsonify({
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": deployment,
+        "choices": [{"index": index, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": reply}}
+                    for index, reply in enumerate(replies)],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                  "total_tokens": prompt_tokens + completion_tokens},
+    })
+
+
+def placeholder_png(width=64, height=64):
+    """Build a small solid-colour PNG without any imaging library"""
+    def chunk(kind, body):
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body) & 0xffffffff)
+
+    row = b"\x00" + bytes((118, 75, 162)) * width
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(row * height)) + chunk(b"IEND", b""))
+
+
+def silent_mp3(frames=40):
+    """A second or so of silent MPEG-1 Layer III frames (128 kbps, 44.1 kHz)"""
+    frame = b"\xff\xfb\x90\x64" + b"\x00" * 413
+    return frame * frames
+
+
+@app.route('/openai/deployments/<deployment>/images/generations', methods=['POST'])
+def images_generations(deployment):
+    error = admit("images.generate")
+    if error:
+        return error
+
+    data = request.get_json()
+    delay = sample_latency()
+    with stats_lock:
+        injected_latencies.append(delay)
+    time.sleep(delay)
+
+    return jsonify({
+        "created": int(time.time()),
+        "data": [{"url": f"{request.host_url}mock/image.png",
+                  "revised_prompt": data.get("prompt", "")}
+                 for _ in range(data.get("n") or 1)],
+    })
+
+
+@app.route('/openai/deployments/<deployment>/audio/speech', methods=['POST'])
+def audio_speech(deployment):
+    error = admit("audio.speech")
+    if error:
+        return error
+
+    delay = sample_latency()
+    with stats_lock:
+        injected_latencies.append(delay)
+    time.sleep(delay)
+    return Response(silent_mp3(), mimetype="audio/mpeg")
+
+
+@app.route('/mock/image.png')
+def mock_image():
+    return Response(placeholder_png(), mimetype="image/png")
+
+
+@app.route('/mock/stats')
+def mock_stats():
+    """Request counts, injected faults and injected latency percentiles"""
+    with stats_lock:
+        latencies = list(injected_latencies)
+        snapshot = dict(stats, by_endpoint=dict(stats["by_endpoint"]))
+    snapshot["injected_latency_ms"] = {
+        "p50": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99": round(percentile(latencies, 0.99) * 1000, 1),
+    }
+    snapshot["config"] = config
+    return jsonify(snapshot)
+
+
+@app.route('/mock/config', methods=['POST'])
+def mock_config():
+    """Change fault injection settings while the server is running"""
+    data = request.get_json()
+    for key, value in data.items():
+        if key in config:
+            config[key] = value
+    return jsonify(config)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mock Azure OpenAI server for offline load testing')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+    parser.add_argument('--latency', default=config["latency"],
+                        help='Response delay: fixed:S, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA (seconds)')
+    parser.add_argument('--token-latency', type=float, default=config["token_latency"],
+                        help='Extra seconds per completion token')
+    parser.add_argument('--error-rate', type=float, default=config["error_rate"], help='Chance of a 500 error')
+    parser.add_argument('--throttle-rate', type=float, default=config["throttle_rate"], help='Chance of a 429')
+    parser.add_argument('--retry-after', type=int, default=config["retry_after"], help='Retry-After seconds on 429')
+    parser.add_argument('--rpm', type=int, default=config["rpm"], help='Requests per minute quota (0 = unlimited)')
+    parser.add_argument('--illegal-rate', type=float, default=config["illegal_rate"],
+                        help='Chance a chess answer is an illegal move')
+    parser.add_argument('--ramble-rate', type=float, default=config["ramble_rate"],
+                        help='Chance a chess answer is followed by an explanation')
+
+    args = parser.parse_args()
+    for key in config:
+        config[key] = getattr(args, key)
+
+    print("🧪 Mock Azure OpenAI server starting...")
+    print(f"🌐 Endpoint: http://localhost:{args.port}")
+    print(f"⏱️  Latency: {config['latency']} | 500s: {config['error_rate']:.0%} | 429s: {config['throttle_rate']:.0%}")
+    app.run(host='0.0.0.0', port=args.port, threaded=True)